@@ -27,7 +27,7 @@ CREATE OR REPLACE TABLE CUSTOMERS (
     STATE               VARCHAR(50),
     POSTAL_CODE         VARCHAR(20),
     COUNTRY             VARCHAR(50) DEFAULT 'Fiji',
-    ACCOUNT_STATUS      VARCHAR(20),
+    ACCOUNT_STATUS      VARCHAR(20),           -- ACTIVE, DORMANT, MERGED (folded into a golden record)
     ACCOUNT_TYPE        VARCHAR(50),
     CREATED_DATE        TIMESTAMP_NTZ,
     LAST_ACTIVITY_DATE  TIMESTAMP_NTZ,
@@ -41,17 +41,26 @@ CREATE OR REPLACE TABLE CUSTOMERS (
 -- ============================================================================
 CREATE OR REPLACE TABLE DUPLICATE_CANDIDATES (
     CANDIDATE_ID        VARCHAR(36) PRIMARY KEY,
-    CUSTOMER_ID_1       VARCHAR(20) NOT NULL,
-    CUSTOMER_ID_2       VARCHAR(20) NOT NULL,
+    CUSTOMER_ID_1       VARCHAR(20) NOT NULL,  -- Pairs are stored in canonical order:
+    CUSTOMER_ID_2       VARCHAR(20) NOT NULL,  -- CUSTOMER_ID_1 < CUSTOMER_ID_2
     MATCH_SCORE         NUMBER(5,2),           -- Algorithm confidence score (0-100)
     MATCH_REASON        VARCHAR(500),          -- Why algorithm flagged as potential match
-    STATUS              VARCHAR(20) DEFAULT 'PENDING',  -- PENDING, MATCHED, NOT_MATCHED, SKIPPED
+    STATUS              VARCHAR(20) DEFAULT 'PENDING',  -- PENDING, MATCHED, NOT_MATCHED, SKIPPED, MERGED (closed by matching.merge)
     PRIORITY            VARCHAR(10) DEFAULT 'MEDIUM',   -- HIGH, MEDIUM, LOW
     CREATED_DATE        TIMESTAMP_NTZ DEFAULT CURRENT_TIMESTAMP(),
-    ASSIGNED_TO         VARCHAR(100),
+    ASSIGNED_TO         VARCHAR(100),          -- Lease holder while PENDING, decider afterwards
+    HOUSEHOLD_MATCH     BOOLEAN DEFAULT FALSE, -- Same household, different person (matching.households); always LOW
+    LEASED_AT           TIMESTAMP_NTZ,         -- Set by LEASE_CANDIDATES
+    LEASE_EXPIRES_AT    TIMESTAMP_NTZ,         -- LEASED_AT + DECISION_TIMEOUT_HOURS
+    -- One row per pair. Snowflake does not enforce UNIQUE; the matching MERGEs
+    -- key on the ordered pair, and decided pairs are never regenerated (matching.decided)
+    UNIQUE (CUSTOMER_ID_1, CUSTOMER_ID_2),
     FOREIGN KEY (CUSTOMER_ID_1) REFERENCES CUSTOMERS(CUSTOMER_ID),
     FOREIGN KEY (CUSTOMER_ID_2) REFERENCES CUSTOMERS(CUSTOMER_ID)
-);
+)
+-- Queues read STATUS = 'PENDING' (by PRIORITY) in MATCH_SCORE order, so
+-- decided pairs live in their own micro-partitions and are pruned
+CLUSTER BY (STATUS, PRIORITY, MATCH_SCORE);
 
 -- ============================================================================
 -- TABLE 3: AGENT_DECISIONS - Audit trail of all decisions made
@@ -66,10 +75,15 @@ CREATE OR REPLACE TABLE AGENT_DECISIONS (
     DECISION_TIMESTAMP  TIMESTAMP_NTZ DEFAULT CURRENT_TIMESTAMP(),
     SESSION_ID          VARCHAR(100),
     FOREIGN KEY (CANDIDATE_ID) REFERENCES DUPLICATE_CANDIDATES(CANDIDATE_ID)
-);
+)
+-- History and the rollups read decisions by date range
+CLUSTER BY (TO_DATE(DECISION_TIMESTAMP));
 
 -- ============================================================================
 -- TABLE 4: MERGE_ACTIONS - Track what happens after a match is confirmed
+-- Written by `python -m matching.merge`: one row per record folded into a
+-- cluster's surviving (master) record; the merged CUSTOMERS row is kept with
+-- ACCOUNT_STATUS = 'MERGED'.
 -- ============================================================================
 CREATE OR REPLACE TABLE MERGE_ACTIONS (
     MERGE_ID            VARCHAR(36) PRIMARY KEY,
@@ -96,9 +110,449 @@ CREATE OR REPLACE TABLE WORKFLOW_CONFIG (
 INSERT INTO WORKFLOW_CONFIG (CONFIG_KEY, CONFIG_VALUE, DESCRIPTION) VALUES
     ('AUTO_ASSIGN_THRESHOLD', '85', 'Match score above which records are auto-assigned for review'),
     ('HIGH_PRIORITY_THRESHOLD', '90', 'Match score above which records are marked high priority'),
+    ('MEDIUM_PRIORITY_THRESHOLD', '70', 'Match score above which records are marked medium priority'),
+    ('AUTO_MATCH_THRESHOLD', '98', 'Match score at or above which pairs are matched automatically by the SYSTEM agent'),
+    ('AUTO_REJECT_HOUSEHOLDS', '0', '1 = the SYSTEM agent decides same-household, different-person pairs NOT_MATCHED'),
     ('MAX_DAILY_ASSIGNMENTS', '50', 'Maximum number of records assigned to single agent per day'),
     ('DECISION_TIMEOUT_HOURS', '48', 'Hours before pending decision is reassigned');
 
+-- ============================================================================
+-- TABLE 6: DAILY_DECISION_ROLLUP - Pre-aggregated decision counts
+-- One row per day / agent / decision / country, maintained by RECORD_DECISION
+-- so the dashboard never scans the full AGENT_DECISIONS audit log.
+-- ============================================================================
+CREATE OR REPLACE TABLE DAILY_DECISION_ROLLUP (
+    DECISION_DATE       DATE NOT NULL,
+    AGENT_NAME          VARCHAR(100) NOT NULL,
+    DECISION            VARCHAR(20) NOT NULL,
+    COUNTRY             VARCHAR(50) NOT NULL,   -- COUNTRY_CODES code of the first customer, or 'Unknown'
+    DECISION_COUNT      NUMBER(10,0) NOT NULL,
+    PRIMARY KEY (DECISION_DATE, AGENT_NAME, DECISION, COUNTRY)
+)
+CLUSTER BY (DECISION_DATE);
+
+-- ============================================================================
+-- TABLE 7: CANDIDATE_STATUS_SUMMARY - Candidate counts per status/priority
+-- ============================================================================
+CREATE OR REPLACE TABLE CANDIDATE_STATUS_SUMMARY (
+    STATUS              VARCHAR(20) NOT NULL,
+    PRIORITY            VARCHAR(10) NOT NULL,
+    CANDIDATE_COUNT     NUMBER(10,0) NOT NULL,
+    MATCH_SCORE_SUM     NUMBER(18,2) NOT NULL,  -- For average score without a scan
+    PRIMARY KEY (STATUS, PRIORITY)
+);
+
+-- ============================================================================
+-- TABLE 8: CUSTOMER_NORMALIZED - Normalized matching keys, one row per customer
+-- Written by `python -m matching.normalize`: E.164 phones, folded case and
+-- diacritics, street suffixes spelled out, nicknames mapped to a given name.
+-- Column names mirror CUSTOMERS; used by matching and the compare indicators.
+-- COUNTRY_CODE maps CUSTOMERS.COUNTRY (any spelling) to one code per country
+-- through COUNTRY_CODES; SQL that must also see new customers joins that table.
+-- ============================================================================
+CREATE OR REPLACE TABLE CUSTOMER_NORMALIZED (
+    CUSTOMER_ID         VARCHAR(20) PRIMARY KEY,
+    FIRST_NAME          VARCHAR(100),
+    LAST_NAME           VARCHAR(100),
+    EMAIL               VARCHAR(255),
+    PHONE               VARCHAR(20),            -- E.164, e.g. +6799234567
+    DATE_OF_BIRTH       DATE,
+    ADDRESS_LINE1       VARCHAR(255),
+    ADDRESS_LINE2       VARCHAR(255),
+    CITY                VARCHAR(100),
+    POSTAL_CODE         VARCHAR(20),
+    COUNTRY_CODE        VARCHAR(10) NOT NULL,   -- FJ, NZ, ... or 'Unknown'; country filters key on this
+    HOUSEHOLD_ID        VARCHAR(16),            -- Hash of address, postcode and phone (matching.households)
+    NORMALIZED_AT       TIMESTAMP_NTZ DEFAULT CURRENT_TIMESTAMP()
+);
+
+-- ============================================================================
+-- TABLE 9: MATCHING_WATERMARK - High-water marks for incremental matching
+-- HIGH_WATER_MARK is the newest CUSTOMERS CREATED_DATE / LAST_ACTIVITY_DATE
+-- already matched; the next run only matches customers changed after it.
+-- ============================================================================
+CREATE OR REPLACE TABLE MATCHING_WATERMARK (
+    JOB_NAME            VARCHAR(50) PRIMARY KEY,
+    HIGH_WATER_MARK     TIMESTAMP_NTZ NOT NULL,
+    UPDATED_AT          TIMESTAMP_NTZ DEFAULT CURRENT_TIMESTAMP()
+);
+
+-- ============================================================================
+-- TABLE 10: CUSTOMER_CLUSTERS - Groups of customers linked by candidate pairs
+-- Rebuilt by `python -m matching.clusters` (union-find over PENDING and
+-- MATCHED pairs). A pair belongs to a cluster when both customers are members.
+-- ============================================================================
+CREATE OR REPLACE TABLE CUSTOMER_CLUSTERS (
+    CLUSTER_ID          VARCHAR(40) PRIMARY KEY,  -- 'CL-' + smallest member CUSTOMER_ID
+    COUNTRY_CODE        VARCHAR(10),              -- COUNTRY_CODES code of the first member
+    MEMBER_COUNT        NUMBER(10,0) NOT NULL,
+    PAIR_COUNT          NUMBER(10,0) NOT NULL,
+    MAX_MATCH_SCORE     NUMBER(5,2),
+    BUILT_AT            TIMESTAMP_NTZ DEFAULT CURRENT_TIMESTAMP()
+);
+
+-- ============================================================================
+-- TABLE 11: CLUSTER_MEMBERS - Customer -> cluster membership
+-- ============================================================================
+CREATE OR REPLACE TABLE CLUSTER_MEMBERS (
+    CUSTOMER_ID         VARCHAR(20) PRIMARY KEY,
+    CLUSTER_ID          VARCHAR(40) NOT NULL
+);
+
+-- ============================================================================
+-- TABLE 12: AGENT_ASSIGNMENTS - Which country's candidates each agent works
+-- Set from the v2 admin view. COUNTRY_CODE is a COUNTRY_CODES code (or
+-- 'Unknown'); NULL means the agent takes any country.
+-- ============================================================================
+CREATE OR REPLACE TABLE AGENT_ASSIGNMENTS (
+    AGENT_NAME          VARCHAR(100) PRIMARY KEY,
+    COUNTRY_CODE        VARCHAR(10),
+    UPDATED_AT          TIMESTAMP_NTZ DEFAULT CURRENT_TIMESTAMP()
+);
+
+-- ============================================================================
+-- TABLE 13: COUNTRY_CODES - CUSTOMERS.COUNTRY spellings -> country code
+-- COUNTRY_NAME is folded like matching.normalize.fold(): lower case, runs of
+-- punctuation and spaces as one space, trimmed. Join it on
+--   TRIM(REGEXP_REPLACE(LOWER(c.COUNTRY), '[^a-z0-9]+', ' '))
+-- and COALESCE a miss to 'Unknown'. Must list the same names as
+-- matching.normalize.COUNTRY_NAMES; the normalize job checks it does.
+-- ============================================================================
+CREATE OR REPLACE TABLE COUNTRY_CODES (
+    COUNTRY_NAME        VARCHAR(50) PRIMARY KEY,
+    COUNTRY_CODE        VARCHAR(10) NOT NULL
+);
+
+INSERT INTO COUNTRY_CODES (COUNTRY_NAME, COUNTRY_CODE) VALUES
+    ('fiji', 'FJ'),
+    ('new zealand', 'NZ'),
+    ('american samoa', 'AS'),
+    ('cook islands', 'CK'),
+    ('solomon islands', 'SB'),
+    ('tonga', 'TO'),
+    ('vanuatu', 'VU'),
+    ('samoa', 'WS'),
+    ('western samoa', 'WS');
+
+-- ============================================================================
+-- PROCEDURE: REFRESH_DASHBOARD_ROLLUPS - Rebuild both rollups from scratch
+-- Run after bulk loads into DUPLICATE_CANDIDATES / AGENT_DECISIONS; day-to-day
+-- decisions keep the rollups current incrementally via RECORD_DECISION.
+-- ============================================================================
+CREATE OR REPLACE PROCEDURE REFRESH_DASHBOARD_ROLLUPS()
+RETURNS VARCHAR
+LANGUAGE SQL
+EXECUTE AS OWNER
+AS
+$$
+BEGIN
+    BEGIN TRANSACTION;
+
+    DELETE FROM CANDIDATE_STATUS_SUMMARY;
+    INSERT INTO CANDIDATE_STATUS_SUMMARY (STATUS, PRIORITY, CANDIDATE_COUNT, MATCH_SCORE_SUM)
+    SELECT COALESCE(STATUS, 'PENDING'), COALESCE(PRIORITY, 'MEDIUM'), COUNT(*), COALESCE(SUM(MATCH_SCORE), 0)
+    FROM DUPLICATE_CANDIDATES
+    GROUP BY 1, 2;
+
+    DELETE FROM DAILY_DECISION_ROLLUP;
+    INSERT INTO DAILY_DECISION_ROLLUP (DECISION_DATE, AGENT_NAME, DECISION, COUNTRY, DECISION_COUNT)
+    SELECT DATE(ad.DECISION_TIMESTAMP), ad.AGENT_NAME, ad.DECISION, COALESCE(cc.COUNTRY_CODE, 'Unknown'), COUNT(*)
+    FROM AGENT_DECISIONS ad
+    JOIN DUPLICATE_CANDIDATES dc ON ad.CANDIDATE_ID = dc.CANDIDATE_ID
+    LEFT JOIN CUSTOMERS c ON dc.CUSTOMER_ID_1 = c.CUSTOMER_ID
+    LEFT JOIN COUNTRY_CODES cc ON cc.COUNTRY_NAME = TRIM(REGEXP_REPLACE(LOWER(c.COUNTRY), '[^a-z0-9]+', ' '))
+    GROUP BY 1, 2, 3, 4;
+
+    COMMIT;
+    RETURN 'REFRESHED';
+END;
+$$;
+
+-- ============================================================================
+-- PROCEDURE: RECORD_DECISION - Atomic decision write (one round trip)
+-- Flips the candidate out of PENDING and logs the audit row in one
+-- transaction. The STATUS = 'PENDING' guard makes it optimistic: if another
+-- agent decided the candidate first, nothing is written and CONFLICT is
+-- returned so the app can tell the agent instead of double-deciding. A
+-- candidate under someone else's live lease is a CONFLICT too; deciding it
+-- ends the lease (LEASED_AT is kept for the daily cap).
+-- The dashboard rollups are adjusted in the same transaction.
+-- ============================================================================
+CREATE OR REPLACE PROCEDURE RECORD_DECISION(
+    P_DECISION_ID       VARCHAR,
+    P_CANDIDATE_ID      VARCHAR,
+    P_AGENT_NAME        VARCHAR,
+    P_DECISION          VARCHAR,
+    P_DECISION_REASON   VARCHAR,
+    P_NOTES             VARCHAR,
+    P_SESSION_ID        VARCHAR
+)
+RETURNS VARCHAR
+LANGUAGE SQL
+EXECUTE AS OWNER
+AS
+$$
+DECLARE
+    v_priority  VARCHAR;
+    v_score     NUMBER(5,2);
+    v_country   VARCHAR;
+BEGIN
+    BEGIN TRANSACTION;
+
+    UPDATE DUPLICATE_CANDIDATES
+    SET STATUS = :P_DECISION, ASSIGNED_TO = :P_AGENT_NAME, LEASE_EXPIRES_AT = NULL
+    WHERE CANDIDATE_ID = :P_CANDIDATE_ID
+      AND STATUS = 'PENDING'
+      AND (LEASE_EXPIRES_AT IS NULL OR LEASE_EXPIRES_AT <= CURRENT_TIMESTAMP() OR ASSIGNED_TO = :P_AGENT_NAME);
+
+    IF (SQLROWCOUNT = 0) THEN
+        ROLLBACK;
+        RETURN 'CONFLICT';
+    END IF;
+
+    INSERT INTO AGENT_DECISIONS
+        (DECISION_ID, CANDIDATE_ID, AGENT_NAME, DECISION, DECISION_REASON, NOTES, SESSION_ID)
+    VALUES
+        (:P_DECISION_ID, :P_CANDIDATE_ID, :P_AGENT_NAME, :P_DECISION, :P_DECISION_REASON, :P_NOTES, :P_SESSION_ID);
+
+    -- Keep the dashboard rollups in step with the decision
+    SELECT COALESCE(dc.PRIORITY, 'MEDIUM'), COALESCE(dc.MATCH_SCORE, 0), COALESCE(cc.COUNTRY_CODE, 'Unknown')
+    INTO :v_priority, :v_score, :v_country
+    FROM DUPLICATE_CANDIDATES dc
+    LEFT JOIN CUSTOMERS c ON dc.CUSTOMER_ID_1 = c.CUSTOMER_ID
+    LEFT JOIN COUNTRY_CODES cc ON cc.COUNTRY_NAME = TRIM(REGEXP_REPLACE(LOWER(c.COUNTRY), '[^a-z0-9]+', ' '))
+    WHERE dc.CANDIDATE_ID = :P_CANDIDATE_ID;
+
+    UPDATE CANDIDATE_STATUS_SUMMARY
+    SET CANDIDATE_COUNT = CANDIDATE_COUNT - 1, MATCH_SCORE_SUM = MATCH_SCORE_SUM - :v_score
+    WHERE STATUS = 'PENDING' AND PRIORITY = :v_priority;
+
+    MERGE INTO CANDIDATE_STATUS_SUMMARY s
+    USING (SELECT :P_DECISION AS STATUS, :v_priority AS PRIORITY) d
+    ON s.STATUS = d.STATUS AND s.PRIORITY = d.PRIORITY
+    WHEN MATCHED THEN UPDATE SET CANDIDATE_COUNT = s.CANDIDATE_COUNT + 1, MATCH_SCORE_SUM = s.MATCH_SCORE_SUM + :v_score
+    WHEN NOT MATCHED THEN INSERT (STATUS, PRIORITY, CANDIDATE_COUNT, MATCH_SCORE_SUM)
+        VALUES (d.STATUS, d.PRIORITY, 1, :v_score);
+
+    MERGE INTO DAILY_DECISION_ROLLUP r
+    USING (SELECT CURRENT_DATE() AS DECISION_DATE, :P_AGENT_NAME AS AGENT_NAME,
+                  :P_DECISION AS DECISION, :v_country AS COUNTRY) d
+    ON r.DECISION_DATE = d.DECISION_DATE AND r.AGENT_NAME = d.AGENT_NAME
+       AND r.DECISION = d.DECISION AND r.COUNTRY = d.COUNTRY
+    WHEN MATCHED THEN UPDATE SET DECISION_COUNT = r.DECISION_COUNT + 1
+    WHEN NOT MATCHED THEN INSERT (DECISION_DATE, AGENT_NAME, DECISION, COUNTRY, DECISION_COUNT)
+        VALUES (d.DECISION_DATE, d.AGENT_NAME, d.DECISION, d.COUNTRY, 1);
+
+    COMMIT;
+    RETURN 'RECORDED';
+EXCEPTION
+    WHEN OTHER THEN
+        ROLLBACK;
+        RAISE;
+END;
+$$;
+
+-- ============================================================================
+-- PROCEDURE: RECORD_DECISIONS_BULK - One decision for many candidates
+-- Same contract as RECORD_DECISION for a list of CANDIDATE_IDs (comma-
+-- separated): one set-based UPDATE, one batched INSERT into AGENT_DECISIONS
+-- and set-based rollup adjustments, all in one transaction. Candidates
+-- already decided, or leased to another agent, are skipped. Returns how many
+-- were recorded.
+-- ============================================================================
+CREATE OR REPLACE PROCEDURE RECORD_DECISIONS_BULK(
+    P_CANDIDATE_IDS     VARCHAR,
+    P_AGENT_NAME        VARCHAR,
+    P_DECISION          VARCHAR,
+    P_DECISION_REASON   VARCHAR,
+    P_NOTES             VARCHAR,
+    P_SESSION_ID        VARCHAR
+)
+RETURNS NUMBER
+LANGUAGE SQL
+EXECUTE AS OWNER
+AS
+$$
+DECLARE
+    v_requested ARRAY;
+    v_claimed   ARRAY;
+BEGIN
+    v_requested := SPLIT(:P_CANDIDATE_IDS, ',');
+
+    FOR attempt IN 1 TO 3 DO
+        BEGIN TRANSACTION;
+
+        SELECT ARRAY_AGG(CANDIDATE_ID) INTO :v_claimed
+        FROM DUPLICATE_CANDIDATES
+        WHERE STATUS = 'PENDING' AND ARRAY_CONTAINS(CANDIDATE_ID::VARIANT, :v_requested)
+          AND (LEASE_EXPIRES_AT IS NULL OR LEASE_EXPIRES_AT <= CURRENT_TIMESTAMP() OR ASSIGNED_TO = :P_AGENT_NAME);
+
+        IF (ARRAY_SIZE(v_claimed) = 0) THEN
+            ROLLBACK;
+            RETURN 0;
+        END IF;
+
+        UPDATE DUPLICATE_CANDIDATES
+        SET STATUS = :P_DECISION, ASSIGNED_TO = :P_AGENT_NAME, LEASE_EXPIRES_AT = NULL
+        WHERE STATUS = 'PENDING' AND ARRAY_CONTAINS(CANDIDATE_ID::VARIANT, :v_claimed)
+          AND (LEASE_EXPIRES_AT IS NULL OR LEASE_EXPIRES_AT <= CURRENT_TIMESTAMP() OR ASSIGNED_TO = :P_AGENT_NAME);
+
+        -- The UPDATE now holds the lock; if every claimed row flipped, nobody
+        -- else can have decided them and the claim is exact.
+        IF (SQLROWCOUNT = ARRAY_SIZE(v_claimed)) THEN
+            INSERT INTO AGENT_DECISIONS
+                (DECISION_ID, CANDIDATE_ID, AGENT_NAME, DECISION, DECISION_REASON, NOTES, SESSION_ID)
+            SELECT UUID_STRING(), CANDIDATE_ID, :P_AGENT_NAME, :P_DECISION, :P_DECISION_REASON, :P_NOTES, :P_SESSION_ID
+            FROM DUPLICATE_CANDIDATES
+            WHERE ARRAY_CONTAINS(CANDIDATE_ID::VARIANT, :v_claimed);
+
+            UPDATE CANDIDATE_STATUS_SUMMARY s
+            SET CANDIDATE_COUNT = s.CANDIDATE_COUNT - b.CANDIDATE_COUNT,
+                MATCH_SCORE_SUM = s.MATCH_SCORE_SUM - b.MATCH_SCORE_SUM
+            FROM (
+                SELECT COALESCE(PRIORITY, 'MEDIUM') AS PRIORITY, COUNT(*) AS CANDIDATE_COUNT,
+                       COALESCE(SUM(MATCH_SCORE), 0) AS MATCH_SCORE_SUM
+                FROM DUPLICATE_CANDIDATES
+                WHERE ARRAY_CONTAINS(CANDIDATE_ID::VARIANT, :v_claimed)
+                GROUP BY 1
+            ) b
+            WHERE s.STATUS = 'PENDING' AND s.PRIORITY = b.PRIORITY;
+
+            MERGE INTO CANDIDATE_STATUS_SUMMARY s
+            USING (
+                SELECT :P_DECISION AS STATUS, COALESCE(PRIORITY, 'MEDIUM') AS PRIORITY,
+                       COUNT(*) AS CANDIDATE_COUNT, COALESCE(SUM(MATCH_SCORE), 0) AS MATCH_SCORE_SUM
+                FROM DUPLICATE_CANDIDATES
+                WHERE ARRAY_CONTAINS(CANDIDATE_ID::VARIANT, :v_claimed)
+                GROUP BY 2
+            ) d
+            ON s.STATUS = d.STATUS AND s.PRIORITY = d.PRIORITY
+            WHEN MATCHED THEN UPDATE SET CANDIDATE_COUNT = s.CANDIDATE_COUNT + d.CANDIDATE_COUNT,
+                                         MATCH_SCORE_SUM = s.MATCH_SCORE_SUM + d.MATCH_SCORE_SUM
+            WHEN NOT MATCHED THEN INSERT (STATUS, PRIORITY, CANDIDATE_COUNT, MATCH_SCORE_SUM)
+                VALUES (d.STATUS, d.PRIORITY, d.CANDIDATE_COUNT, d.MATCH_SCORE_SUM);
+
+            MERGE INTO DAILY_DECISION_ROLLUP r
+            USING (
+                SELECT CURRENT_DATE() AS DECISION_DATE, :P_AGENT_NAME AS AGENT_NAME, :P_DECISION AS DECISION,
+                       COALESCE(cc.COUNTRY_CODE, 'Unknown') AS COUNTRY, COUNT(*) AS DECISION_COUNT
+                FROM DUPLICATE_CANDIDATES dc
+                LEFT JOIN CUSTOMERS c ON dc.CUSTOMER_ID_1 = c.CUSTOMER_ID
+                LEFT JOIN COUNTRY_CODES cc ON cc.COUNTRY_NAME = TRIM(REGEXP_REPLACE(LOWER(c.COUNTRY), '[^a-z0-9]+', ' '))
+                WHERE ARRAY_CONTAINS(dc.CANDIDATE_ID::VARIANT, :v_claimed)
+                GROUP BY 4
+            ) d
+            ON r.DECISION_DATE = d.DECISION_DATE AND r.AGENT_NAME = d.AGENT_NAME
+               AND r.DECISION = d.DECISION AND r.COUNTRY = d.COUNTRY
+            WHEN MATCHED THEN UPDATE SET DECISION_COUNT = r.DECISION_COUNT + d.DECISION_COUNT
+            WHEN NOT MATCHED THEN INSERT (DECISION_DATE, AGENT_NAME, DECISION, COUNTRY, DECISION_COUNT)
+                VALUES (d.DECISION_DATE, d.AGENT_NAME, d.DECISION, d.COUNTRY, d.DECISION_COUNT);
+
+            COMMIT;
+            RETURN ARRAY_SIZE(v_claimed);
+        END IF;
+
+        -- Another agent decided one of the claimed candidates in between;
+        -- undo and claim again from the current state.
+        ROLLBACK;
+    END FOR;
+    RETURN 0;
+EXCEPTION
+    WHEN OTHER THEN
+        ROLLBACK;
+        RAISE;
+END;
+$$;
+
+-- ============================================================================
+-- PROCEDURE: LEASE_CANDIDATES - Hand an agent their own batch of work
+-- Tops the agent's lease up to P_BATCH_SIZE pending candidates, best score
+-- first, from their AGENT_ASSIGNMENTS country. Leases run for
+-- DECISION_TIMEOUT_HOURS; expired ones go back to the pool on the next call.
+-- No agent is leased more than MAX_DAILY_ASSIGNMENTS candidates a day.
+-- Returns how many candidates were newly leased, or -1 once the agent has
+-- reached today's cap (callers can stop asking until tomorrow).
+-- ============================================================================
+CREATE OR REPLACE PROCEDURE LEASE_CANDIDATES(
+    P_AGENT_NAME        VARCHAR,
+    P_BATCH_SIZE        NUMBER
+)
+RETURNS NUMBER
+LANGUAGE SQL
+EXECUTE AS OWNER
+AS
+$$
+DECLARE
+    v_max_daily     NUMBER;
+    v_timeout_hours NUMBER;
+    v_country       VARCHAR;
+    v_held          NUMBER;
+    v_leased_today  NUMBER;
+    v_wanted        NUMBER;
+    v_leased        NUMBER;
+BEGIN
+    SELECT COALESCE(MAX(IFF(CONFIG_KEY = 'MAX_DAILY_ASSIGNMENTS', TRY_TO_NUMBER(CONFIG_VALUE), NULL)), 50),
+           COALESCE(MAX(IFF(CONFIG_KEY = 'DECISION_TIMEOUT_HOURS', TRY_TO_NUMBER(CONFIG_VALUE), NULL)), 48)
+    INTO :v_max_daily, :v_timeout_hours
+    FROM WORKFLOW_CONFIG;
+
+    SELECT MAX(COUNTRY_CODE) INTO :v_country
+    FROM AGENT_ASSIGNMENTS
+    WHERE AGENT_NAME = :P_AGENT_NAME;
+
+    BEGIN TRANSACTION;
+
+    -- Expired leases go back to the pool
+    UPDATE DUPLICATE_CANDIDATES
+    SET ASSIGNED_TO = NULL, LEASED_AT = NULL, LEASE_EXPIRES_AT = NULL
+    WHERE STATUS = 'PENDING' AND LEASE_EXPIRES_AT <= CURRENT_TIMESTAMP();
+
+    -- Decided candidates keep LEASED_AT, so they still count towards today
+    SELECT COUNT_IF(STATUS = 'PENDING' AND LEASE_EXPIRES_AT IS NOT NULL),
+           COUNT_IF(LEASED_AT >= CURRENT_DATE())
+    INTO :v_held, :v_leased_today
+    FROM DUPLICATE_CANDIDATES
+    WHERE ASSIGNED_TO = :P_AGENT_NAME;
+
+    IF (v_leased_today >= v_max_daily) THEN
+        COMMIT;
+        RETURN -1;
+    END IF;
+
+    v_wanted := LEAST(:P_BATCH_SIZE - v_held, v_max_daily - v_leased_today);
+    IF (v_wanted <= 0) THEN
+        COMMIT;
+        RETURN 0;
+    END IF;
+
+    UPDATE DUPLICATE_CANDIDATES dc
+    SET ASSIGNED_TO = :P_AGENT_NAME,
+        LEASED_AT = CURRENT_TIMESTAMP(),
+        LEASE_EXPIRES_AT = DATEADD(HOUR, :v_timeout_hours, CURRENT_TIMESTAMP())
+    FROM (
+        SELECT d.CANDIDATE_ID
+        FROM DUPLICATE_CANDIDATES d
+        JOIN CUSTOMERS c ON d.CUSTOMER_ID_1 = c.CUSTOMER_ID
+        LEFT JOIN COUNTRY_CODES cc ON cc.COUNTRY_NAME = TRIM(REGEXP_REPLACE(LOWER(c.COUNTRY), '[^a-z0-9]+', ' '))
+        WHERE d.STATUS = 'PENDING' AND d.LEASE_EXPIRES_AT IS NULL
+          AND (:v_country IS NULL OR COALESCE(cc.COUNTRY_CODE, 'Unknown') = :v_country)
+        -- Same-household pairs (matching.households) are leased last
+        QUALIFY ROW_NUMBER() OVER (ORDER BY COALESCE(d.HOUSEHOLD_MATCH, FALSE), d.MATCH_SCORE DESC,
+                                            d.CREATED_DATE, d.CANDIDATE_ID) <= :v_wanted
+    ) pick
+    WHERE dc.CANDIDATE_ID = pick.CANDIDATE_ID
+      AND dc.STATUS = 'PENDING' AND dc.LEASE_EXPIRES_AT IS NULL;
+    v_leased := SQLROWCOUNT;
+
+    COMMIT;
+    RETURN v_leased;
+EXCEPTION
+    WHEN OTHER THEN
+        ROLLBACK;
+        RAISE;
+END;
+$$;
+
 -- ============================================================================
 -- Verify tables created
 -- ============================================================================
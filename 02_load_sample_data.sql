@@ -9,6 +9,8 @@ USE SCHEMA DEDUPE_SCHEMA;
 -- ============================================================================
 -- Clear existing data (for re-runs)
 -- ============================================================================
+TRUNCATE TABLE CLUSTER_MEMBERS;
+TRUNCATE TABLE CUSTOMER_CLUSTERS;
 TRUNCATE TABLE MERGE_ACTIONS;
 TRUNCATE TABLE AGENT_DECISIONS;
 TRUNCATE TABLE DUPLICATE_CANDIDATES;
@@ -88,6 +90,31 @@ INSERT INTO AGENT_DECISIONS (DECISION_ID, CANDIDATE_ID, AGENT_NAME, DECISION, DE
 ('DEC-001', 'DC-009', 'Maria Santos', 'NOT_MATCHED', 'Different customers', 'Names are completely different, only coincidental email pattern match', '2024-01-10 14:30:00', 'SESSION-001'),
 ('DEC-002', 'DC-010', 'John Smith', 'NOT_MATCHED', 'Different customers', 'Different DOB, different names, just happen to be in same region', '2024-01-10 15:45:00', 'SESSION-002');
 
+-- ============================================================================
+-- SEED CLUSTERS - What `python -m matching.clusters` builds from these pairs
+-- The sample pairs share no customers, so each open pair is a two-record
+-- cluster named after its lower CUSTOMER_ID. Rerun the cluster job once the
+-- candidate job has linked more customers.
+-- ============================================================================
+
+INSERT INTO CLUSTER_MEMBERS (CLUSTER_ID, CUSTOMER_ID)
+SELECT 'CL-' || CUSTOMER_ID_1, CUSTOMER_ID_1 FROM DUPLICATE_CANDIDATES WHERE STATUS IN ('PENDING', 'MATCHED')
+UNION ALL
+SELECT 'CL-' || CUSTOMER_ID_1, CUSTOMER_ID_2 FROM DUPLICATE_CANDIDATES WHERE STATUS IN ('PENDING', 'MATCHED');
+
+INSERT INTO CUSTOMER_CLUSTERS (CLUSTER_ID, COUNTRY_CODE, MEMBER_COUNT, PAIR_COUNT, MAX_MATCH_SCORE, BUILT_AT)
+SELECT 'CL-' || dc.CUSTOMER_ID_1, COALESCE(cc.COUNTRY_CODE, 'Unknown'), 2, 1, dc.MATCH_SCORE, CURRENT_TIMESTAMP()
+FROM DUPLICATE_CANDIDATES dc
+JOIN CUSTOMERS c ON c.CUSTOMER_ID = dc.CUSTOMER_ID_1
+LEFT JOIN COUNTRY_CODES cc ON cc.COUNTRY_NAME = TRIM(REGEXP_REPLACE(LOWER(c.COUNTRY), '[^a-z0-9]+', ' '))
+WHERE dc.STATUS IN ('PENDING', 'MATCHED');
+
+-- ============================================================================
+-- Rebuild dashboard rollups from the freshly loaded data
+-- ============================================================================
+
+CALL REFRESH_DASHBOARD_ROLLUPS();
+
 -- ============================================================================
 -- Verify data loaded
 -- ============================================================================
@@ -96,6 +123,8 @@ SELECT 'CUSTOMERS' AS TABLE_NAME, COUNT(*) AS ROW_COUNT FROM CUSTOMERS
 UNION ALL
 SELECT 'DUPLICATE_CANDIDATES', COUNT(*) FROM DUPLICATE_CANDIDATES
 UNION ALL
-SELECT 'AGENT_DECISIONS', COUNT(*) FROM AGENT_DECISIONS;
+SELECT 'AGENT_DECISIONS', COUNT(*) FROM AGENT_DECISIONS
+UNION ALL
+SELECT 'CUSTOMER_CLUSTERS', COUNT(*) FROM CUSTOMER_CLUSTERS;
 
 SELECT 'Sample data loaded successfully!' AS STATUS;
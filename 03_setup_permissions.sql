@@ -23,6 +23,13 @@ GRANT INSERT ON TABLE DEDUPE_WORKFLOW_DB.DEDUPE_SCHEMA.AGENT_DECISIONS TO ROLE D
 GRANT UPDATE ON TABLE DEDUPE_WORKFLOW_DB.DEDUPE_SCHEMA.DUPLICATE_CANDIDATES TO ROLE DEDUPE_WORKFLOW_USER;
 GRANT INSERT ON TABLE DEDUPE_WORKFLOW_DB.DEDUPE_SCHEMA.MERGE_ACTIONS TO ROLE DEDUPE_WORKFLOW_USER;
 
+-- Decisions are written through the RECORD_DECISION procedure (runs as owner)
+GRANT USAGE ON PROCEDURE DEDUPE_WORKFLOW_DB.DEDUPE_SCHEMA.RECORD_DECISION(VARCHAR, VARCHAR, VARCHAR, VARCHAR, VARCHAR, VARCHAR, VARCHAR) TO ROLE DEDUPE_WORKFLOW_USER;
+GRANT USAGE ON PROCEDURE DEDUPE_WORKFLOW_DB.DEDUPE_SCHEMA.RECORD_DECISIONS_BULK(VARCHAR, VARCHAR, VARCHAR, VARCHAR, VARCHAR, VARCHAR) TO ROLE DEDUPE_WORKFLOW_USER;
+
+-- Agents fetch their own work through LEASE_CANDIDATES (runs as owner)
+GRANT USAGE ON PROCEDURE DEDUPE_WORKFLOW_DB.DEDUPE_SCHEMA.LEASE_CANDIDATES(VARCHAR, NUMBER) TO ROLE DEDUPE_WORKFLOW_USER;
+
 -- Grant future table permissions
 GRANT SELECT ON FUTURE TABLES IN SCHEMA DEDUPE_WORKFLOW_DB.DEDUPE_SCHEMA TO ROLE DEDUPE_WORKFLOW_USER;
 
@@ -43,6 +50,9 @@ GRANT INSERT, UPDATE, DELETE ON FUTURE TABLES IN SCHEMA DEDUPE_WORKFLOW_DB.DEDUP
 GRANT CREATE TABLE ON SCHEMA DEDUPE_WORKFLOW_DB.DEDUPE_SCHEMA TO ROLE DEDUPE_WORKFLOW_ADMIN;
 GRANT CREATE VIEW ON SCHEMA DEDUPE_WORKFLOW_DB.DEDUPE_SCHEMA TO ROLE DEDUPE_WORKFLOW_ADMIN;
 
+-- Admin can rebuild the dashboard rollups after bulk loads
+GRANT USAGE ON PROCEDURE DEDUPE_WORKFLOW_DB.DEDUPE_SCHEMA.REFRESH_DASHBOARD_ROLLUPS() TO ROLE DEDUPE_WORKFLOW_ADMIN;
+
 -- ============================================================================
 -- Streamlit App Permissions
 -- ============================================================================
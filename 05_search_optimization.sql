@@ -0,0 +1,24 @@
+-- ============================================================================
+-- DEDUPE WORKFLOW DEMO - Search Optimization (optional)
+-- Requires Enterprise Edition or higher; skip this script on Standard Edition.
+-- Run after 01_setup_database.sql, which recreates these tables.
+-- ============================================================================
+
+USE DATABASE DEDUPE_WORKFLOW_DB;
+USE SCHEMA DEDUPE_SCHEMA;
+
+-- ============================================================================
+-- SEARCH OPTIMIZATION - Id filters in the apps
+-- The filter boxes run LIKE '%...%' on candidate, customer and cluster ids,
+-- which clustering cannot prune; the SUBSTRING search access path can (for
+-- search strings of 5+ characters). EQUALITY serves the single-candidate
+-- lookups behind the compare views.
+-- ============================================================================
+ALTER TABLE DUPLICATE_CANDIDATES ADD SEARCH OPTIMIZATION
+    ON EQUALITY(CANDIDATE_ID), SUBSTRING(CANDIDATE_ID), SUBSTRING(CUSTOMER_ID_1), SUBSTRING(CUSTOMER_ID_2);
+ALTER TABLE CLUSTER_MEMBERS ADD SEARCH OPTIMIZATION ON SUBSTRING(CUSTOMER_ID);
+ALTER TABLE CUSTOMER_CLUSTERS ADD SEARCH OPTIMIZATION ON SUBSTRING(CLUSTER_ID);
+
+SHOW TABLES;
+
+SELECT 'Search optimization added!' AS STATUS;
@@ -0,0 +1,87 @@
+"""
+Parallel scoring speedup against core count.
+
+Generates --customers synthetic customers (see benchmarks.synthetic_customers),
+normalizes and blocks them once, then scores the same blocked pairs serially
+and on process pools of increasing size (see matching.parallel). Reports the
+elapsed time, the speedup over serial scoring and the parallel efficiency
+(speedup / workers), and checks every pool returns the serial scores.
+
+Scoring is only part of a matching run, so it then times generate_candidates
+end to end (blocking, scoring, household tagging and priorities) serially
+and with each worker count above one. That is the speedup the candidate job
+actually gets from --workers.
+
+Usage:
+    python -m benchmarks.bench_parallel
+    python -m benchmarks.bench_parallel --customers 200000 --workers 1 2 4 8 16
+"""
+
+import argparse
+import os
+import time
+
+import numpy as np
+
+from benchmarks.synthetic_customers import generate
+from matching.blocking import blocking_keys, candidate_pairs
+from matching.candidates import generate_candidates
+from matching.normalize import normalize_customers
+from matching.parallel import SHARD_SIZE, score_pairs_parallel
+from matching.scoring import score_pairs
+
+PAIR_KEY = ['CUSTOMER_ID_1', 'CUSTOMER_ID_2']
+
+
+def default_workers():
+    cores = os.cpu_count() or 1
+    counts = [1]
+    while counts[-1] * 2 <= cores:
+        counts.append(counts[-1] * 2)
+    return counts + ([cores] if counts[-1] != cores else [])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--customers', type=int, default=50_000)
+    parser.add_argument('--workers', type=int, nargs='+', default=default_workers())
+    parser.add_argument('--shard-size', type=int, default=SHARD_SIZE)
+    args = parser.parse_args()
+
+    customers = normalize_customers(generate(args.customers)[0])
+    start = time.perf_counter()
+    pairs = candidate_pairs(blocking_keys(customers))
+    print(f"block  {args.customers:>10,} customers -> {len(pairs):,} pairs: {time.perf_counter() - start:8.2f}s")
+    print(f"cores  {os.cpu_count()}")
+
+    start = time.perf_counter()
+    serial = score_pairs(customers, pairs).sort_values(PAIR_KEY)['MATCH_SCORE'].to_numpy()
+    baseline = time.perf_counter() - start
+    print(f"serial             {baseline:8.2f}s  {len(pairs) / baseline:>12,.0f} pairs/s")
+
+    for workers in args.workers:
+        start = time.perf_counter()
+        scored = score_pairs_parallel(customers, pairs, workers, args.shard_size)
+        elapsed = time.perf_counter() - start
+        same = np.array_equal(scored.sort_values(PAIR_KEY)['MATCH_SCORE'].to_numpy(), serial)
+        print(f"{workers:>3} workers        {elapsed:8.2f}s  {len(pairs) / elapsed:>12,.0f} pairs/s"
+              f"  speedup {baseline / elapsed:5.2f}x  efficiency {baseline / elapsed / workers:6.1%}"
+              f"{'' if same else '  SCORES DIFFER'}")
+
+    start = time.perf_counter()
+    serial = generate_candidates(customers).sort_values(PAIR_KEY)[[*PAIR_KEY, 'MATCH_SCORE', 'PRIORITY']]
+    baseline = time.perf_counter() - start
+    print(f"end to end serial      {baseline:8.2f}s  {len(serial):>12,} candidates")
+
+    for workers in [count for count in args.workers if count > 1]:
+        start = time.perf_counter()
+        candidates = generate_candidates(customers, workers=workers)
+        elapsed = time.perf_counter() - start
+        same = candidates.sort_values(PAIR_KEY)[serial.columns].reset_index(drop=True).equals(
+            serial.reset_index(drop=True))
+        print(f"end to end {workers:>3} workers {elapsed:8.2f}s  speedup {baseline / elapsed:5.2f}x"
+              f"{'' if same else '  CANDIDATES DIFFER'}")
+
+
+if __name__ == '__main__':
+    main()
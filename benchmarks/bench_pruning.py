@@ -0,0 +1,167 @@
+"""
+Partition pruning benchmark for the DUPLICATE_CANDIDATES and AGENT_DECISIONS
+clustering keys.
+
+Generates a synthetic candidate table of --rows rows into two scratch tables.
+Most rows are decided and a thin slice is PENDING, as in a long-running
+deployment. One table uses the setup script's CLUSTER BY (STATUS, PRIORITY,
+MATCH_SCORE), loaded in key order so it starts fully clustered. The other
+has no key. The work queue queries run against both, and the benchmark
+reports the micro-partitions scanned out of the total, taken from the query
+profile, along with the elapsed time.
+
+AGENT_DECISIONS gets the same treatment: --decision-rows decisions spread
+over --days days, loaded in random order or clustered by
+TO_DATE(DECISION_TIMESTAMP), queried for the last week's decisions.
+
+Connects with the [snowflake] settings in .streamlit/secrets.toml, like the
+matching jobs. Run from the repository root:
+
+Usage:
+    python -m benchmarks.bench_pruning
+    python -m benchmarks.bench_pruning --rows 500000000 --pending-percent 2 --keep
+    python -m benchmarks.bench_pruning --decision-rows 200000000 --days 1095
+"""
+
+import argparse
+import time
+
+from matching.warehouse import connect
+from query_builder import QUEUE_ORDER, table
+
+SCRATCH_TABLES = {
+    'unclustered': 'BENCH_CANDIDATES_UNCLUSTERED',
+    'clustered': 'BENCH_CANDIDATES_CLUSTERED',
+}
+
+CLUSTER_KEY = "STATUS, PRIORITY, MATCH_SCORE"
+
+DECISION_SCRATCH_TABLES = {
+    'unclustered': 'BENCH_DECISIONS_UNCLUSTERED',
+    'clustered': 'BENCH_DECISIONS_CLUSTERED',
+}
+
+DECISION_CLUSTER_KEY = "TO_DATE(DECISION_TIMESTAMP)"
+
+# The apps' queue count and first queue page (see streamlit_app.py)
+QUEUE_QUERIES = {
+    'pending count': "SELECT COUNT(*) FROM {table} dc WHERE dc.STATUS = 'PENDING'",
+    'HIGH page': (
+        "SELECT dc.CANDIDATE_ID, dc.MATCH_SCORE FROM {table} dc"
+        " WHERE dc.STATUS = 'PENDING' AND dc.PRIORITY = 'HIGH'"
+        f" ORDER BY {', '.join(QUEUE_ORDER)} LIMIT 26"
+    ),
+}
+
+# A date range over the audit log, as the decision history and rollup refresh read it
+DECISION_QUERIES = {
+    'last 7 days': (
+        "SELECT ad.DECISION, COUNT(*) FROM {table} ad"
+        " WHERE ad.DECISION_TIMESTAMP >= DATEADD(DAY, -7, CURRENT_DATE())"
+        " GROUP BY ad.DECISION"
+    ),
+}
+
+
+def synthetic_candidates_sql(rows, pending_percent):
+    """SELECT producing `rows` DUPLICATE_CANDIDATES-shaped rows."""
+    return f"""
+    SELECT
+        UUID_STRING() AS CANDIDATE_ID,
+        'CUST-' || LPAD(UNIFORM(1, 99999999, RANDOM())::VARCHAR, 8, '0') AS CUSTOMER_ID_1,
+        'CUST-' || LPAD(UNIFORM(1, 99999999, RANDOM())::VARCHAR, 8, '0') AS CUSTOMER_ID_2,
+        MATCH_SCORE,
+        'synthetic' AS MATCH_REASON,
+        CASE WHEN UNIFORM(0::FLOAT, 100::FLOAT, RANDOM()) < {float(pending_percent)} THEN 'PENDING'
+             WHEN UNIFORM(0, 1, RANDOM()) = 0 THEN 'MATCHED'
+             ELSE 'NOT_MATCHED' END AS STATUS,
+        CASE WHEN MATCH_SCORE >= 90 THEN 'HIGH' WHEN MATCH_SCORE >= 70 THEN 'MEDIUM' ELSE 'LOW' END AS PRIORITY,
+        DATEADD(SECOND, -SEQ8(), CURRENT_TIMESTAMP())::TIMESTAMP_NTZ AS CREATED_DATE
+    FROM (
+        SELECT UNIFORM(5000, 10000, RANDOM()) / 100 AS MATCH_SCORE
+        FROM TABLE(GENERATOR(ROWCOUNT => {int(rows)}))
+    )
+    """
+
+
+def synthetic_decisions_sql(rows, days):
+    """SELECT producing `rows` AGENT_DECISIONS-shaped rows over the last `days` days, in random order."""
+    return f"""
+    SELECT
+        UUID_STRING() AS DECISION_ID,
+        UUID_STRING() AS CANDIDATE_ID,
+        'Agent ' || UNIFORM(1, 50, RANDOM()) AS AGENT_NAME,
+        IFF(UNIFORM(0, 1, RANDOM()) = 0, 'MATCHED', 'NOT_MATCHED') AS DECISION,
+        'synthetic' AS DECISION_REASON,
+        DATEADD(SECOND, -UNIFORM(0, {int(days) * 86400}, RANDOM()), CURRENT_TIMESTAMP())::TIMESTAMP_NTZ
+            AS DECISION_TIMESTAMP
+    FROM TABLE(GENERATOR(ROWCOUNT => {int(rows)}))
+    """
+
+
+def create_scratch_tables(session, names, source, cluster_key):
+    session.sql(f"CREATE OR REPLACE TRANSIENT TABLE {table(names['unclustered'])} AS {source}").collect()
+    session.sql(f"""
+    CREATE OR REPLACE TRANSIENT TABLE {table(names['clustered'])}
+    CLUSTER BY ({cluster_key})
+    AS SELECT * FROM {table(names['unclustered'])} ORDER BY {cluster_key}
+    """).collect()
+
+
+def pruning(session, query_id):
+    """(partitions scanned, partitions total) for the table scans of a query."""
+    row = session.sql("""
+    SELECT SUM(OPERATOR_STATISTICS:pruning:partitions_scanned::NUMBER),
+           SUM(OPERATOR_STATISTICS:pruning:partitions_total::NUMBER)
+    FROM TABLE(GET_QUERY_OPERATOR_STATS(?))
+    WHERE OPERATOR_TYPE = 'TableScan'
+    """, params=[query_id]).collect()[0]
+    return int(row[0] or 0), int(row[1] or 0)
+
+
+def run_queries(session, queries, names):
+    for label, sql in queries.items():
+        for layout, name in names.items():
+            start = time.perf_counter()
+            job = session.sql(sql.format(table=table(name))).collect_nowait()
+            job.result()
+            elapsed = time.perf_counter() - start
+            scanned, total = pruning(session, job.query_id)
+            print(f"{label:<14} {layout:<12} {scanned:>8,} / {total:>8,} partitions"
+                  f"  ({scanned / max(total, 1):6.1%})  {elapsed:8.2f}s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--rows', type=int, default=100_000_000)
+    parser.add_argument('--pending-percent', type=float, default=5.0)
+    parser.add_argument('--decision-rows', type=int, default=100_000_000)
+    parser.add_argument('--days', type=int, default=730, help="days of decision history to spread them over")
+    parser.add_argument('--keep', action='store_true', help="leave the scratch tables in place")
+    args = parser.parse_args()
+
+    session = connect()
+    session.sql("ALTER SESSION SET USE_CACHED_RESULT = FALSE").collect()
+    try:
+        start = time.perf_counter()
+        create_scratch_tables(
+            session, SCRATCH_TABLES, synthetic_candidates_sql(args.rows, args.pending_percent), CLUSTER_KEY
+        )
+        print(f"load {args.rows:>14,} synthetic candidates: {time.perf_counter() - start:8.2f}s")
+        run_queries(session, QUEUE_QUERIES, SCRATCH_TABLES)
+
+        start = time.perf_counter()
+        create_scratch_tables(
+            session, DECISION_SCRATCH_TABLES, synthetic_decisions_sql(args.decision_rows, args.days),
+            DECISION_CLUSTER_KEY
+        )
+        print(f"load {args.decision_rows:>14,} synthetic decisions:  {time.perf_counter() - start:8.2f}s")
+        run_queries(session, DECISION_QUERIES, DECISION_SCRATCH_TABLES)
+    finally:
+        if not args.keep:
+            for name in [*SCRATCH_TABLES.values(), *DECISION_SCRATCH_TABLES.values()]:
+                session.sql(f"DROP TABLE IF EXISTS {table(name)}").collect()
+
+
+if __name__ == '__main__':
+    main()
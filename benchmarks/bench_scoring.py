@@ -0,0 +1,78 @@
+"""
+Pair scoring throughput benchmark.
+
+Builds random customers with realistic-length names, phones, emails and
+addresses, encodes them once, then times scoring (score + MATCH_REASON) on
+increasing numbers of random pairs and reports pairs per second.
+
+Usage:
+    python -m benchmarks.bench_scoring
+    python -m benchmarks.bench_scoring --customers 200000 --pairs 100000 1000000
+"""
+
+import argparse
+import random
+import string
+import time
+
+import numpy as np
+import pandas as pd
+
+from matching.scoring import customer_features, match_reasons, score_feature_pairs
+
+STREETS = ['Victoria Pde', 'Queens Rd', 'Ratu Sukuna Rd', 'Main St', 'Beach Rd', 'Harbour View', 'Marine Dr']
+
+
+def random_name(rng):
+    return rng.choice(string.ascii_uppercase) + ''.join(rng.choices(string.ascii_lowercase, k=rng.randint(3, 9)))
+
+
+def random_customers(count, seed=0):
+    rng = random.Random(seed)
+    # Small vocabularies so pairs agree on some fields some of the time
+    first_names = [random_name(rng) for _ in range(max(count // 50, 10))]
+    last_names = [random_name(rng) for _ in range(max(count // 20, 10))]
+    rows = []
+    for number in range(count):
+        first, last = rng.choice(first_names), rng.choice(last_names)
+        rows.append({
+            'CUSTOMER_ID': f'CUST-{number:08d}',
+            'FIRST_NAME': first,
+            'LAST_NAME': last,
+            'EMAIL': f'{first}.{last}{rng.randint(0, 99)}@example.com'.lower(),
+            'PHONE': f'+679-{rng.randint(0, 99999):07d}',
+            'DATE_OF_BIRTH': f'{rng.randint(1950, 2005)}-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}',
+            'ADDRESS_LINE1': f'{rng.randint(1, 300)} {rng.choice(STREETS)}',
+            'POSTAL_CODE': str(rng.randint(1000, 1100)),
+        })
+    return pd.DataFrame(rows)
+
+
+def random_pairs(customer_count, count, seed=0):
+    """Row indexes of both sides of `count` random pairs."""
+    rng = np.random.default_rng(seed)
+    return rng.integers(0, customer_count, count), rng.integers(0, customer_count, count)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--customers', type=int, default=100_000)
+    parser.add_argument('--pairs', type=int, nargs='+', default=[10_000, 100_000, 1_000_000])
+    args = parser.parse_args()
+
+    customers = random_customers(args.customers)
+    start = time.perf_counter()
+    features = customer_features(customers)
+    print(f"encode {args.customers:>10,} customers: {time.perf_counter() - start:8.2f}s")
+
+    for count in args.pairs:
+        index1, index2 = random_pairs(args.customers, count)
+        start = time.perf_counter()
+        _, similarities = score_feature_pairs(features, index1, index2)
+        match_reasons(similarities)
+        elapsed = time.perf_counter() - start
+        print(f"score  {count:>10,} pairs:     {elapsed:8.2f}s  {count / elapsed:>12,.0f} pairs/s")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,518 @@
+"""
+Synthetic Pacific-region CUSTOMERS at production scale, with ground truth.
+
+Generates --customers rows shaped like CUSTOMERS. Most are distinct people.
+The rest repeat the duplicate scenarios of 02_load_sample_data.sql on top of
+them:
+
+    migration    same person re-entered: reformatted phone, abbreviated street
+    typo         one-letter slip in the first or last name
+    nickname     'Josefa' / 'Joe', 'Sarah' / 'Sera', ...
+    married      same phone, DOB and address under a new last name
+    business     Business vs Personal account: new email, address, next phone
+    household    a different person: same last name, address and landline
+    namesake     a different person: same name and city, DOB in another year
+
+Every record gets a PERSON_ID in ground_truth.parquet, so two records are
+duplicates exactly when their PERSON_IDs agree. truth_pairs.parquet lists the
+injected pairs by scenario, including the household and namesake traps
+(IS_DUPLICATE false). Customers are written as customers_NNN.parquet, split
+for a parallel COPY INTO (see README). With --candidates the matching engine
+is run locally on the result, duplicate_candidates.parquet is written for
+loading into DUPLICATE_CANDIDATES, and recall and precision are reported
+against the ground truth. Parquet output needs pyarrow.
+
+Usage:
+    python -m benchmarks.synthetic_customers --customers 1000000
+    python -m benchmarks.synthetic_customers --customers 5000000 --out synthetic_data --seed 7
+    python -m benchmarks.synthetic_customers --customers 200000 --candidates
+"""
+
+import argparse
+import math
+import random
+import string
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from matching.candidates import generate_candidates
+from matching.normalize import CALLING_CODES, NICKNAMES, STREET_SUFFIXES, normalize_customers
+from query_builder import CUSTOMER_COLUMNS
+
+# Country code -> (CUSTOMERS.COUNTRY, share of customers, common last names,
+#                  (CITY, STATE, first POSTAL_CODE or None where there are none))
+COUNTRY_PROFILES = {
+    'FJ': ('Fiji', 0.55, [
+        'Naiqama', 'Koroi', 'Tuisawau', 'Rabukawaqa', 'Cama', 'Vakacegu', 'Vuniwaqa', 'Bogi',
+        'Delai', 'Nayacalevu', 'Waqanisau', 'Caucau', 'Tabua', 'Baleilevuka', 'Ratuvou',
+        'Khan', 'Prasad', 'Singh', 'Kumar', 'Naidu', 'Lal', 'Chand', 'Ali', 'Sharma',
+    ], [
+        ('Suva', 'Central', '99999'), ('Nausori', 'Central', '99997'), ('Lautoka', 'Western', '99995'),
+        ('Nadi', 'Western', '99994'), ('Ba', 'Western', '99996'), ('Sigatoka', 'Western', '99988'),
+        ('Labasa', 'Northern', '99980'), ('Savusavu', 'Northern', '99981'),
+    ]),
+    'NZ': ('New Zealand', 0.20, [
+        'Smith', 'Williams', 'Brown', 'Wilson', 'Taylor', 'Walker', 'Thompson', 'Clarke',
+        'Ngata', 'Parata', 'Tipene', 'Henare', 'Te Rangi', 'Pomare',
+    ], [
+        ('Auckland', 'Auckland', '1010'), ('Manukau', 'Auckland', '2104'), ('Wellington', 'Wellington', '6011'),
+        ('Christchurch', 'Canterbury', '8011'), ('Hamilton', 'Waikato', '3204'),
+    ]),
+    'WS': ('Samoa', 0.07, [
+        'Tuilagi', 'Faleolo', 'Leota', 'Sapolu', 'Aiono', 'Fuimaono', 'Lauina', 'Schmidt',
+    ], [('Apia', 'Tuamasaga', 'WS1111'), ('Salelologa', 'Savaii', 'WS1361')]),
+    'TO': ('Tonga', 0.06, [
+        'Tupou', 'Fifita', 'Taufa', 'Vaipulu', 'Lolohea', 'Fonua', 'Havili', 'Mahe',
+    ], [("Nuku'alofa", 'Tongatapu', None), ('Neiafu', "Vava'u", None)]),
+    'SB': ('Solomon Islands', 0.05, [
+        'Sogavare', 'Kuata', 'Rini', 'Maelasi', 'Tega', 'Houenipwela',
+    ], [('Honiara', 'Guadalcanal', None), ('Auki', 'Malaita', None)]),
+    'VU': ('Vanuatu', 0.03, [
+        'Kalsakau', 'Natuman', 'Tabi', 'Molisa', 'Sope', 'Lini',
+    ], [('Port Vila', 'Shefa', None), ('Luganville', 'Sanma', None)]),
+    'AS': ('American Samoa', 0.02, [
+        'Tuiasosopo', 'Faleomavaega', 'Moliga', 'Lutu', 'Sunia',
+    ], [('Pago Pago', 'Tutuila', '96799'), ('Tafuna', 'Tutuila', '96799')]),
+    'CK': ('Cook Islands', 0.02, [
+        'Tangaroa', 'Marsters', 'Tuara', 'Pareanga', 'Tupa',
+    ], [('Avarua', 'Rarotonga', None), ('Arutanga', 'Aitutaki', None)]),
+}
+
+# Given names the NICKNAMES dictionary maps to are common, so the nickname scenario has sources
+FEMALE_NAMES = [
+    'Sarah', 'Mary', 'Lavenia', 'Mereoni', 'Ana', 'Kelera', 'Adi', 'Losana', 'Salote', 'Litia',
+    'Priya', 'Sunita', 'Emma', 'Olivia', 'Sina', 'Talia', 'Ofa', 'Grace',
+]
+MALE_NAMES = [
+    'Josefa', 'Peter', 'David', 'John', 'William', 'Mohammed', 'Apisai', 'Peni', 'Samisoni',
+    'Timoci', 'Rupeni', 'Ravi', 'Rajesh', 'James', 'Liam', 'Sefo', 'Tomasi', 'Manu',
+]
+
+# Syllables for coining the long tail of last names, so blocks keep realistic sizes
+NAME_SYLLABLES = ['ba', 'ca', 'da', 'ka', 'la', 'ma', 'na', 'qa', 'ra', 'sa', 'ta', 'va', 'wa', 'le', 'ni',
+                  'ko', 'ro', 'tu', 'vu', 'mu', 'fo', 'fi', 'he', 'lo', 'pe', 'so', 'u', 'i', 'o', 'a']
+COMMON_NAME_SHARE = 0.3
+PEOPLE_PER_SURNAME = 40
+ZIPF_EXPONENT = 0.5
+POSTCODES_PER_CITY = 10
+
+STREET_NAMES = [
+    'Victoria', 'Waimanu', 'Ratu Mara', 'Kings', 'Vitogo', 'Sunset', 'Rodwell', 'Domain',
+    'Grantham', 'Marine', 'Queens', 'Fletcher', 'Princes', 'Beach', 'Harbour View', 'Mission',
+    'Church', 'Hibiscus', 'Coral', 'Lagoon',
+]
+STREET_TYPES = ['Road', 'Street', 'Parade', 'Drive', 'Avenue', 'Highway', 'Lane', 'Place', 'Terrace', 'Crescent']
+UNIT_PREFIXES = ['Unit', 'Apt', 'Suite', 'Floor', 'Flat']
+
+EMAIL_DOMAINS = ['gmail.com', 'yahoo.com', 'hotmail.com', 'outlook.com', 'connect.com.fj', 'xtra.co.nz']
+BUSINESS_DOMAINS = ['company.com.fj', 'fijitrading.com.fj', 'pacificgroup.co.nz', 'islandservices.ws']
+
+ACCOUNT_TYPES = (['Standard', 'Premium', 'Business', 'Personal', 'Student'], [0.50, 0.20, 0.10, 0.12, 0.08])
+SOURCE_SYSTEMS = ['BRANCH', 'ONLINE', 'MOBILE']
+
+# Full street type -> the abbreviation normalize.STREET_SUFFIXES expands
+ABBREVIATIONS = {full: short for short, full in STREET_SUFFIXES.items()}
+
+# Canonical given name -> its nicknames
+NICKNAMES_FOR = {}
+for nickname, given in NICKNAMES.items():
+    NICKNAMES_FOR.setdefault(given, []).append(nickname.capitalize())
+
+# Share of records that are extra copies of an existing person, by scenario
+DUPLICATE_SCENARIOS = {'migration': 0.30, 'typo': 0.25, 'nickname': 0.15, 'married': 0.15, 'business': 0.15}
+DUPLICATE_RATE = 0.10
+# Share of records that are a different person built to look like an existing one
+TRAP_RATES = {'household': 0.03, 'namesake': 0.01}
+
+ROWS_PER_FILE = 1_000_000
+
+EPOCH = np.datetime64('1940-01-01')
+MIDPOINT_BIRTH = np.datetime64('1975-01-01')
+CREATED_FROM = np.datetime64('2010-01-01T00:00:00')
+NOW = np.datetime64('2024-06-30T00:00:00')
+
+
+# =============================================================================
+# Distinct people
+# =============================================================================
+
+def pick(rng, values, size, p=None):
+    return np.asarray(values, dtype=object)[rng.choice(len(values), size=size, p=p)]
+
+
+def coined_names(count, rng):
+    lengths = rng.integers(2, 5, count)
+    return [''.join(rng.choice(NAME_SYLLABLES, size=length)).capitalize() for length in lengths]
+
+
+def last_names(common, count, rng):
+    """`count` last names: the common ones, then a Zipf-weighted tail of coined ones."""
+    tail = coined_names(max(count // PEOPLE_PER_SURNAME, 1), rng)
+    weights = 1 / np.arange(1, len(tail) + 1) ** ZIPF_EXPONENT
+    names = pick(rng, tail, count, weights / weights.sum())
+    use_common = rng.random(count) < COMMON_NAME_SHARE
+    names[use_common] = pick(rng, common, int(use_common.sum()))
+    return names
+
+
+def postcodes(first, count, rng):
+    if first is None:
+        return np.full(count, None, dtype=object)
+    prefix, number = first.rstrip('0123456789'), first[len(first.rstrip('0123456789')):]
+    offsets = rng.integers(0, POSTCODES_PER_CITY, count)
+    return np.array([f'{prefix}{int(number) - offset:0{len(number)}d}' for offset in offsets], dtype=object)
+
+
+def base_customers(count, rng):
+    """`count` distinct people as CUSTOMERS rows, plus FEMALE and COUNTRY_CODE helper columns."""
+    codes = list(COUNTRY_PROFILES)
+    shares = np.array([COUNTRY_PROFILES[code][1] for code in codes])
+    country_codes = pick(rng, codes, count, shares / shares.sum())
+    female = rng.random(count) < 0.5
+
+    people = pd.DataFrame({'COUNTRY_CODE': country_codes, 'FEMALE': female})
+    people['FIRST_NAME'] = np.where(female, pick(rng, FEMALE_NAMES, count), pick(rng, MALE_NAMES, count))
+    people['LAST_NAME'] = None
+    for column in ['COUNTRY', 'CITY', 'STATE', 'POSTAL_CODE']:
+        people[column] = None
+    for code, (country, _, common, cities) in COUNTRY_PROFILES.items():
+        rows = np.flatnonzero(country_codes == code)
+        people.loc[rows, 'COUNTRY'] = country
+        people.loc[rows, 'LAST_NAME'] = last_names(common, len(rows), rng)
+        city = rng.choice(len(cities), size=len(rows))
+        for number, (name, state, first_postcode) in enumerate(cities):
+            in_city = rows[city == number]
+            people.loc[in_city, 'CITY'] = name
+            people.loc[in_city, 'STATE'] = state
+            people.loc[in_city, 'POSTAL_CODE'] = postcodes(first_postcode, len(in_city), rng)
+
+    calling_codes = people['COUNTRY_CODE'].map(CALLING_CODES)
+    people['PHONE'] = '+' + calling_codes + '-' + pd.Series(rng.integers(1_000_000, 9_999_999, count)).astype(str)
+    people['EMAIL'] = (
+        people['FIRST_NAME'].str.lower() + '.' + people['LAST_NAME'].str.lower().str.replace(' ', '')
+        + pd.Series(rng.integers(0, 100, count)).astype(str).where(rng.random(count) < 0.4, '')
+        + '@' + pick(rng, EMAIL_DOMAINS, count)
+    )
+    people['DATE_OF_BIRTH'] = EPOCH + rng.integers(0, 66 * 365, count).astype('timedelta64[D]')
+    people['ADDRESS_LINE1'] = (
+        pd.Series(rng.integers(1, 400, count)).astype(str) + ' '
+        + pick(rng, STREET_NAMES, count) + ' ' + pick(rng, STREET_TYPES, count)
+    )
+    people['ADDRESS_LINE2'] = pd.Series(
+        pick(rng, UNIT_PREFIXES, count) + ' ' + pd.Series(rng.integers(1, 30, count)).astype(str)
+    ).where(rng.random(count) < 0.25, None)
+
+    span = int((NOW - CREATED_FROM) / np.timedelta64(1, 's'))
+    created = rng.integers(0, span, count)
+    people['CREATED_DATE'] = CREATED_FROM + created.astype('timedelta64[s]')
+    people['LAST_ACTIVITY_DATE'] = people['CREATED_DATE'] + (rng.random(count) * (span - created)).astype('timedelta64[s]')
+    people['ACCOUNT_STATUS'] = np.where(rng.random(count) < 0.9, 'ACTIVE', 'DORMANT')
+    people['ACCOUNT_TYPE'] = pick(rng, ACCOUNT_TYPES[0], count, ACCOUNT_TYPES[1])
+    people['TOTAL_TRANSACTIONS'] = rng.geometric(1 / 150, count)
+    people['ACCOUNT_BALANCE'] = np.round(rng.lognormal(8.5, 1.5, count), 2)
+    people['SOURCE_SYSTEM'] = pick(rng, SOURCE_SYSTEMS, count)
+    return people
+
+
+# =============================================================================
+# Scenario variants (one row per source row)
+# =============================================================================
+
+def typo(value, rnd):
+    """One keying slip: drop, double, swap or replace a letter."""
+    if len(value) < 3:
+        return value + value[-1]
+    at = rnd.randrange(1, len(value) - 1)
+    kind = rnd.randrange(4)
+    if kind == 0:
+        return value[:at] + value[at + 1:]
+    if kind == 1:
+        return value[:at] + value[at] + value[at:]
+    if kind == 2:
+        return value[:at - 1] + value[at] + value[at - 1] + value[at + 1:]
+    return value[:at] + rnd.choice(string.ascii_lowercase) + value[at + 1:]
+
+
+def reformat_phone(phone, rnd):
+    """'+679-9234567' as '+679 923 4567', '+6799234567' or the national '9234567'."""
+    code, number = phone[1:].split('-')
+    return rnd.choice([
+        f'+{code} {number[:3]} {number[3:]}',
+        f'+{code}{number}',
+        number,
+    ])
+
+
+def next_phone(phone):
+    """The neighbouring line: last digit moved on by one."""
+    return phone[:-1] + str((int(phone[-1]) + 1) % 10)
+
+
+def abbreviate(address):
+    words = address.split(' ')
+    return ' '.join(words[:-1] + [ABBREVIATIONS.get(words[-1].lower(), words[-1].lower()).capitalize()])
+
+
+def neighbour_address(address, rnd):
+    number, rest = address.split(' ', 1)
+    return f'{int(number) + rnd.choice([2, 4])} {rest}'
+
+
+def email_for(first, last, domain, rnd):
+    mailbox = rnd.choice([f'{first}.{last}', f'{first[0]}.{last}', f'{first}{last}', f'{first}.{last[0]}'])
+    return f'{mailbox}@{domain}'.lower().replace(' ', '')
+
+
+def later(timestamps, rng):
+    """Timestamps moved up to two years later, capped at NOW."""
+    moved = timestamps + rng.integers(0, 2 * 365 * 86400, len(timestamps)).astype('timedelta64[s]')
+    return moved.where(moved < NOW, NOW)
+
+
+def older_or_younger(sources):
+    """+1 where a relative can be born later than the source, -1 where earlier."""
+    return np.where(sources['DATE_OF_BIRTH'] < MIDPOINT_BIRTH, 1, -1)
+
+
+def vary(sources, scenario, rng, rnd):
+    """Records for `scenario` derived from the `sources` rows."""
+    rows = sources.copy()
+    count = len(rows)
+    rows['CREATED_DATE'] = later(rows['CREATED_DATE'], rng)
+    rows['LAST_ACTIVITY_DATE'] = later(rows['CREATED_DATE'], rng)
+    rows['TOTAL_TRANSACTIONS'] = rng.geometric(1 / 50, count)
+    rows['ACCOUNT_BALANCE'] = np.round(rng.lognormal(7.5, 1.5, count), 2)
+    rows['SOURCE_SYSTEM'] = pick(rng, SOURCE_SYSTEMS, count)
+
+    if scenario in ('migration', 'typo'):
+        rows['PHONE'] = [reformat_phone(phone, rnd) for phone in rows['PHONE']]
+        rows['ADDRESS_LINE1'] = [abbreviate(line) if rnd.random() < 0.6 else line for line in rows['ADDRESS_LINE1']]
+        rows['ADDRESS_LINE2'] = rows['ADDRESS_LINE2'].where(rng.random(count) < 0.5, None)
+        if scenario == 'typo':
+            in_first = rng.random(count) < 0.5
+            rows['FIRST_NAME'] = [typo(name, rnd) if flag else name for name, flag in zip(rows['FIRST_NAME'], in_first)]
+            rows['LAST_NAME'] = [name if flag else typo(name, rnd) for name, flag in zip(rows['LAST_NAME'], in_first)]
+        else:
+            rows['EMAIL'] = [
+                email if rnd.random() < 0.5 else email_for(first, last, email.split('@')[1], rnd)
+                for email, first, last in zip(rows['EMAIL'], rows['FIRST_NAME'], rows['LAST_NAME'])
+            ]
+    elif scenario == 'nickname':
+        rows['FIRST_NAME'] = [rnd.choice(NICKNAMES_FOR[name.lower()]) for name in rows['FIRST_NAME']]
+        rows['EMAIL'] = [
+            email_for(first, last, rnd.choice(EMAIL_DOMAINS + BUSINESS_DOMAINS), rnd)
+            for first, last in zip(rows['FIRST_NAME'], rows['LAST_NAME'])
+        ]
+        rows['PHONE'] = [next_phone(phone) if rnd.random() < 0.5 else phone for phone in rows['PHONE']]
+    elif scenario == 'married':
+        rows['LAST_NAME'] = [rnd.choice(COUNTRY_PROFILES[code][2]) for code in rows['COUNTRY_CODE']]
+        rows['EMAIL'] = [
+            email_for(first, last, rnd.choice(EMAIL_DOMAINS), rnd)
+            for first, last in zip(rows['FIRST_NAME'], rows['LAST_NAME'])
+        ]
+    elif scenario == 'business':
+        rows['ACCOUNT_TYPE'] = np.where(sources['ACCOUNT_TYPE'] == 'Business', 'Personal', 'Business')
+        rows['EMAIL'] = [
+            email_for(first, last, rnd.choice(BUSINESS_DOMAINS), rnd)
+            for first, last in zip(rows['FIRST_NAME'], rows['LAST_NAME'])
+        ]
+        rows['PHONE'] = rows['PHONE'].map(next_phone)
+        rows['ADDRESS_LINE1'] = (
+            pd.Series(rng.integers(1, 400, count), index=rows.index).astype(str) + ' '
+            + pick(rng, STREET_NAMES, count) + ' ' + pick(rng, STREET_TYPES, count)
+        )
+        rows['ADDRESS_LINE2'] = [f'Floor {rnd.randint(1, 9)}' if rnd.random() < 0.5 else None for _ in range(count)]
+    elif scenario == 'household':
+        rows['FEMALE'] = ~sources['FEMALE']
+        rows['FIRST_NAME'] = np.where(rows['FEMALE'], pick(rng, FEMALE_NAMES, count), pick(rng, MALE_NAMES, count))
+        # A spouse a few years apart, or a grown child (parent for younger sources)
+        generation = rng.integers(20 * 365, 35 * 365, count) * older_or_younger(sources)
+        offset = np.where(rng.random(count) < 0.6, rng.integers(-8 * 365, 8 * 365, count), generation)
+        rows['DATE_OF_BIRTH'] = sources['DATE_OF_BIRTH'] + offset.astype('timedelta64[D]')
+        rows['EMAIL'] = [
+            email_for(first, last, email.split('@')[1], rnd)
+            for email, first, last in zip(sources['EMAIL'], rows['FIRST_NAME'], rows['LAST_NAME'])
+        ]
+    elif scenario == 'namesake':
+        # Same birthday in another year, a few doors down
+        years = rng.integers(3, 12, count) * older_or_younger(sources)
+        rows['DATE_OF_BIRTH'] = [born + pd.DateOffset(years=int(shift)) for born, shift in zip(sources['DATE_OF_BIRTH'], years)]
+        rows['ADDRESS_LINE1'] = [neighbour_address(line, rnd) for line in rows['ADDRESS_LINE1']]
+        rows['PHONE'] = rows['PHONE'].map(next_phone)
+        rows['EMAIL'] = [
+            email_for(first, last, rnd.choice(EMAIL_DOMAINS), rnd) for first, last in zip(rows['FIRST_NAME'], rows['LAST_NAME'])
+        ]
+    return rows
+
+
+def scenario_sources(people, scenario, count, rng):
+    """Row positions of the people a scenario's records are derived from."""
+    if scenario == 'nickname':
+        eligible = np.flatnonzero(people['FIRST_NAME'].str.lower().isin(NICKNAMES_FOR))
+    elif scenario == 'married':
+        eligible = np.flatnonzero(people['FEMALE'])
+    else:
+        eligible = np.arange(len(people))
+    return rng.choice(eligible, size=min(count, len(eligible)), replace=False)
+
+
+# =============================================================================
+# Assembly
+# =============================================================================
+
+def scenario_counts(total, duplicate_rate=DUPLICATE_RATE):
+    counts = {name: int(total * duplicate_rate * share) for name, share in DUPLICATE_SCENARIOS.items()}
+    counts.update({name: int(total * rate) for name, rate in TRAP_RATES.items()})
+    return counts
+
+
+def generate(total, seed=0, duplicate_rate=DUPLICATE_RATE):
+    """(customers, ground_truth, truth_pairs) for `total` customer records.
+
+    customers has the CUSTOMER_COLUMNS. ground_truth maps each CUSTOMER_ID to
+    a PERSON_ID and the SCENARIO that produced it ('original' for the first
+    record of a person). truth_pairs has one row per injected record:
+    CUSTOMER_ID_1 (the record it was derived from), CUSTOMER_ID_2, SCENARIO
+    and IS_DUPLICATE.
+    """
+    rng = np.random.default_rng(seed)
+    rnd = random.Random(seed)
+    counts = scenario_counts(total, duplicate_rate)
+    people = base_customers(total - sum(counts.values()), rng)
+    people['PERSON'] = np.arange(len(people))
+    people['SCENARIO'] = 'original'
+
+    parts, next_person = [people], len(people)
+    for scenario, count in counts.items():
+        sources = people.iloc[scenario_sources(people, scenario, count, rng)]
+        rows = vary(sources, scenario, rng, rnd)
+        rows['SOURCE'] = sources['PERSON'].to_numpy()
+        rows['SCENARIO'] = scenario
+        if scenario in TRAP_RATES:
+            rows['PERSON'] = np.arange(next_person, next_person + len(rows))
+            next_person += len(rows)
+        parts.append(rows)
+    customers = pd.concat(parts, ignore_index=True)
+
+    # Shuffled ids, so a person's records are not neighbours in id order
+    position = rng.permutation(len(customers))
+    customers['CUSTOMER_ID'] = pd.Series(position).map('CUST-{:09d}'.format)
+    customers['DATE_OF_BIRTH'] = customers['DATE_OF_BIRTH'].dt.date
+    first_record = customers['CUSTOMER_ID'].iloc[:len(people)].to_numpy()
+
+    injected = customers.iloc[len(people):]
+    truth_pairs = pd.DataFrame({
+        'CUSTOMER_ID_1': first_record[injected['SOURCE'].astype(int)],
+        'CUSTOMER_ID_2': injected['CUSTOMER_ID'].to_numpy(),
+        'SCENARIO': injected['SCENARIO'].to_numpy(),
+        'IS_DUPLICATE': ~injected['SCENARIO'].isin(list(TRAP_RATES)).to_numpy(),
+    })
+    customers = customers.sort_values('CUSTOMER_ID', ignore_index=True)
+    ground_truth = pd.DataFrame({
+        'CUSTOMER_ID': customers['CUSTOMER_ID'],
+        'PERSON_ID': customers['PERSON'].map('P-{:09d}'.format),
+        'SCENARIO': customers['SCENARIO'],
+    })
+    return customers[list(CUSTOMER_COLUMNS)], ground_truth, truth_pairs
+
+
+# =============================================================================
+# Matching quality
+# =============================================================================
+
+def pair_keys(pairs):
+    """'id1|id2' with the smaller id first, whatever the column order."""
+    first, second = pairs['CUSTOMER_ID_1'], pairs['CUSTOMER_ID_2']
+    swap = first > second
+    return first.where(~swap, second) + '|' + second.where(~swap, first)
+
+
+def evaluate(candidates, ground_truth, truth_pairs):
+    """Recall per scenario and overall precision of candidate pairs against the ground truth.
+
+    For the household and namesake traps, the 'found' share is how many of
+    them reached the queue, and by priority. When candidates carry
+    HOUSEHOLD_MATCH (see matching.households), also reports how many pairs
+    were flagged, how many of those really are different people, and the
+    review queue left if AUTO_REJECT_HOUSEHOLDS is on.
+    """
+    person = ground_truth.set_index('CUSTOMER_ID')['PERSON_ID']
+    same_person = (
+        candidates['CUSTOMER_ID_1'].map(person).to_numpy() == candidates['CUSTOMER_ID_2'].map(person).to_numpy()
+    )
+    sizes = ground_truth['PERSON_ID'].value_counts()
+    true_pairs = int((sizes * (sizes - 1) // 2).sum())
+
+    priorities = pd.Series(candidates['PRIORITY'].to_numpy(), index=pair_keys(candidates))
+    found = truth_pairs.assign(PRIORITY=pair_keys(truth_pairs).map(priorities).fillna('-').to_numpy())
+
+    lines = [
+        f"candidates {len(candidates):>10,}  precision {same_person.mean() if len(candidates) else 0:6.1%}"
+        f"  recall {same_person.sum() / max(true_pairs, 1):6.1%} of {true_pairs:,} duplicate pairs"
+    ]
+    for scenario, rows in found.groupby('SCENARIO', sort=False):
+        bands = rows['PRIORITY'].value_counts()
+        lines.append(
+            f"{scenario:<10} {len(rows):>10,}  found {(rows['PRIORITY'] != '-').mean():6.1%}"
+            + ''.join(f"  {band} {bands.get(band, 0) / len(rows):6.1%}" for band in ['HIGH', 'MEDIUM', 'LOW'])
+        )
+    if 'HOUSEHOLD_MATCH' in candidates:
+        household = candidates['HOUSEHOLD_MATCH'].to_numpy(dtype=bool)
+        lines.append(
+            f"flagged    {household.sum():>10,}  of queue {household.mean() if len(candidates) else 0:6.1%}"
+            f"  different people {(~same_person[household]).mean() if household.any() else 0:6.1%}"
+            f"  queue with auto-reject {len(candidates) - household.sum():,}"
+        )
+    return '\n'.join(lines)
+
+
+# =============================================================================
+# Output
+# =============================================================================
+
+def write_parquet(frame, out, name, rows_per_file=None):
+    """Write `frame` as out/name.parquet, or as name_NNN.parquet files of rows_per_file rows."""
+    if not rows_per_file:
+        frame.to_parquet(out / f'{name}.parquet', index=False)
+        return
+    for number in range(max(math.ceil(len(frame) / rows_per_file), 1)):
+        part = frame.iloc[number * rows_per_file:(number + 1) * rows_per_file]
+        part.to_parquet(out / f'{name}_{number:03d}.parquet', index=False)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--customers', type=int, default=1_000_000)
+    parser.add_argument('--duplicate-rate', type=float, default=DUPLICATE_RATE)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--out', default='synthetic_data')
+    parser.add_argument('--rows-per-file', type=int, default=ROWS_PER_FILE)
+    parser.add_argument('--candidates', action='store_true', help="also run the matching engine and report quality")
+    args = parser.parse_args()
+
+    out = Path(args.out)
+    out.mkdir(parents=True, exist_ok=True)
+    start = time.perf_counter()
+    customers, ground_truth, truth_pairs = generate(args.customers, args.seed, args.duplicate_rate)
+    print(f"generate {len(customers):>10,} customers: {time.perf_counter() - start:8.2f}s")
+    print(truth_pairs['SCENARIO'].value_counts().to_string())
+
+    write_parquet(customers, out, 'customers', args.rows_per_file)
+    write_parquet(ground_truth, out, 'ground_truth')
+    write_parquet(truth_pairs, out, 'truth_pairs')
+
+    if args.candidates:
+        start = time.perf_counter()
+        candidates = generate_candidates(normalize_customers(customers))
+        print(f"match    {len(customers):>10,} customers: {time.perf_counter() - start:8.2f}s")
+        candidates = candidates.assign(STATUS='PENDING', CREATED_DATE=pd.Timestamp.now().floor('s'))
+        write_parquet(candidates, out, 'duplicate_candidates')
+        print(evaluate(candidates, ground_truth, truth_pairs))
+    print(f"written to {out}/")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,20 @@
+"""
+Batch matching engine for the Dedupe Workflow.
+
+Reads CUSTOMERS, normalizes them into CUSTOMER_NORMALIZED, finds likely
+duplicate pairs with blocking keys, scores them and loads them into
+DUPLICATE_CANDIDATES, auto-decides the certain ones, then groups linked pairs
+into clusters for agents to review in the Streamlit apps. Confirmed matches
+are then merged into golden records (``python -m matching.merge``). Run the
+jobs from the repository root, e.g. ``python -m matching.candidates``.
+"""
+
+from matching.auto_decisions import resolve_candidates
+from matching.blocking import BLOCKING_PASSES, blocking_keys, candidate_pairs, hub_blocks
+from matching.candidates import generate_candidates, write_candidates
+from matching.clusters import build_clusters
+from matching.households import tag_households
+from matching.merge import plan_merges
+from matching.normalize import normalize_customers
+from matching.parallel import score_pairs_parallel
+from matching.scoring import score_pairs
@@ -0,0 +1,126 @@
+"""
+Auto-decision job: settle the certain pairs so agents only see ambiguous ones.
+
+Thresholds come from WORKFLOW_CONFIG (see matching.config):
+    AUTO_MATCH_THRESHOLD       PENDING pairs scoring at or above this are
+                               MATCHED by SYSTEM_AGENT
+    HIGH_PRIORITY_THRESHOLD    remaining PENDING pairs at or above this are HIGH
+    MEDIUM_PRIORITY_THRESHOLD  ... at or above this MEDIUM, otherwise LOW
+    AUTO_REJECT_HOUSEHOLDS     1 = PENDING same-household, different-person
+                               pairs (matching.households) are NOT_MATCHED
+                               by SYSTEM_AGENT; they are always LOW either way
+
+Auto-decisions go through RECORD_DECISIONS_BULK, so they are audited in
+AGENT_DECISIONS and counted in the dashboard rollups like any agent decision.
+
+Usage:
+    python -m matching.auto_decisions
+    python -m matching.auto_decisions --dry-run  # count what would change
+"""
+
+import argparse
+
+from matching.config import threshold
+from matching.warehouse import connect
+from query_builder import Query, call, table
+
+SYSTEM_AGENT = 'SYSTEM'
+SYSTEM_SESSION = 'auto-decisions'
+
+# Candidate ids per RECORD_DECISIONS_BULK call
+DECISION_BATCH_SIZE = 1000
+
+PRIORITY_CASE = (
+    "CASE WHEN HOUSEHOLD_MATCH THEN 'LOW' "
+    "WHEN MATCH_SCORE >= ? THEN 'HIGH' WHEN MATCH_SCORE >= ? THEN 'MEDIUM' ELSE 'LOW' END"
+)
+
+HOUSEHOLD_REJECT_REASON = 'Auto-rejected: same household, different person'
+
+
+def auto_match_ids(session, auto_match_threshold):
+    query = Query(f"SELECT CANDIDATE_ID FROM {table('DUPLICATE_CANDIDATES')} WHERE STATUS = 'PENDING'")
+    query.where("MATCH_SCORE >= ?", auto_match_threshold)
+    return [row['CANDIDATE_ID'] for row in query.execute(session).collect()]
+
+
+def household_ids(session):
+    query = Query(f"SELECT CANDIDATE_ID FROM {table('DUPLICATE_CANDIDATES')} WHERE STATUS = 'PENDING'")
+    query.where("HOUSEHOLD_MATCH")
+    return [row['CANDIDATE_ID'] for row in query.execute(session).collect()]
+
+
+def record_system_decisions(session, candidate_ids, decision, reason):
+    """Record one decision for every id as SYSTEM_AGENT, in batches. Returns pairs recorded."""
+    recorded = 0
+    for start in range(0, len(candidate_ids), DECISION_BATCH_SIZE):
+        batch = candidate_ids[start:start + DECISION_BATCH_SIZE]
+        result = call(
+            'RECORD_DECISIONS_BULK', ','.join(batch), SYSTEM_AGENT, decision, reason, '', SYSTEM_SESSION
+        ).execute(session).collect()
+        recorded += int(result[0][0])
+    return recorded
+
+
+def auto_match(session, auto_match_threshold):
+    """MATCH every PENDING pair at or above the threshold as SYSTEM_AGENT. Returns pairs recorded."""
+    reason = f"Auto-matched: score >= {auto_match_threshold:g}"
+    return record_system_decisions(session, auto_match_ids(session, auto_match_threshold), 'MATCHED', reason)
+
+
+def auto_reject_households(session):
+    """NOT_MATCH every PENDING same-household pair as SYSTEM_AGENT. Returns pairs recorded."""
+    return record_system_decisions(session, household_ids(session), 'NOT_MATCHED', HOUSEHOLD_REJECT_REASON)
+
+
+def recompute_priorities(session, high_priority, medium_priority):
+    """Re-band PRIORITY for every PENDING pair in one UPDATE. Returns rows changed."""
+    result = Query(f"""
+    UPDATE {table('DUPLICATE_CANDIDATES')}
+    SET PRIORITY = {PRIORITY_CASE}
+    WHERE STATUS = 'PENDING'
+      AND PRIORITY IS DISTINCT FROM {PRIORITY_CASE}
+    """, [high_priority, medium_priority, high_priority, medium_priority]).execute(session).collect()
+    return int(result[0][0])
+
+
+def resolve_candidates(session):
+    """Auto-match, auto-reject households if enabled, then re-band priorities.
+
+    Returns (auto_matched, auto_rejected, reprioritized).
+    """
+    auto_matched = auto_match(session, threshold(session, 'AUTO_MATCH_THRESHOLD'))
+    auto_rejected = auto_reject_households(session) if threshold(session, 'AUTO_REJECT_HOUSEHOLDS') else 0
+    reprioritized = recompute_priorities(
+        session,
+        threshold(session, 'HIGH_PRIORITY_THRESHOLD'),
+        threshold(session, 'MEDIUM_PRIORITY_THRESHOLD'),
+    )
+    if reprioritized:
+        # The status summary is kept per priority, so rebuild it after re-banding
+        session.sql(f"CALL {table('REFRESH_DASHBOARD_ROLLUPS')}()").collect()
+    return auto_matched, auto_rejected, reprioritized
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--dry-run', action='store_true', help="count pairs that would be auto-decided")
+    args = parser.parse_args()
+
+    session = connect()
+    if args.dry_run:
+        auto_match_threshold = threshold(session, 'AUTO_MATCH_THRESHOLD')
+        count = len(auto_match_ids(session, auto_match_threshold))
+        print(f"{count} pending pairs score >= {auto_match_threshold:g} and would be auto-matched")
+        households = len(household_ids(session))
+        enabled = threshold(session, 'AUTO_REJECT_HOUSEHOLDS')
+        print(f"{households} pending same-household pairs"
+              f"{' would be auto-rejected' if enabled else ' (AUTO_REJECT_HOUSEHOLDS is off)'}")
+        return
+    auto_matched, auto_rejected, reprioritized = resolve_candidates(session)
+    print(f"{auto_matched} pairs auto-matched and {auto_rejected} household pairs auto-rejected as "
+          f"{SYSTEM_AGENT}, {reprioritized} priorities updated")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,221 @@
+"""
+Blocking keys for candidate generation.
+
+Comparing every customer with every other customer is O(n²). Instead each
+customer gets a handful of cheap keys, and only customers that share a key
+value (a "block") are compared. A true duplicate only has to agree on one key
+to be found, so several independent passes keep recall high while the number
+of comparisons stays close to linear in the size of CUSTOMERS.
+
+That breaks down when a shared value turns a block into a hub. A company
+switchboard phone, a placeholder postcode such as 99999 or a default date of
+birth can put thousands of customers in one block, and a block of n
+customers is n²/2 pairs. Block sizes are profiled before any pairs are
+built. A block of more than MAX_BLOCK_SIZE customers is split by a secondary
+key (SUB_BLOCK_KEYS), and a sub-block still that big is skipped. Every hub
+is logged.
+"""
+
+import logging
+import re
+
+import numpy as np
+import pandas as pd
+
+log = logging.getLogger(__name__)
+
+SOUNDEX_CODES = {
+    **dict.fromkeys('BFPV', '1'),
+    **dict.fromkeys('CGJKQSXZ', '2'),
+    **dict.fromkeys('DT', '3'),
+    'L': '4',
+    **dict.fromkeys('MN', '5'),
+    'R': '6',
+}
+
+
+def text(value):
+    """String form of a CUSTOMERS value, with NULL/NaN as ''."""
+    if value is None or (not isinstance(value, str) and pd.isna(value)):
+        return ''
+    return str(value)
+
+
+def soundex(name):
+    """American Soundex code (e.g. 'Naiqama' -> 'N250'), or None if no letters."""
+    letters = re.sub(r'[^A-Z]', '', text(name).upper())
+    if not letters:
+        return None
+    code = letters[0]
+    previous = SOUNDEX_CODES.get(letters[0])
+    for letter in letters[1:]:
+        digit = SOUNDEX_CODES.get(letter)
+        if digit and digit != previous:
+            code += digit
+            if len(code) == 4:
+                break
+        # H and W do not separate letters with the same code; vowels do
+        if letter not in 'HW':
+            previous = digit
+    return code.ljust(4, '0')
+
+
+def phone_digits(phone):
+    """Digits only, so '+679-9234567' and '+679 923 4567' agree."""
+    digits = re.sub(r'\D', '', text(phone))
+    return digits or None
+
+
+def email_local_part(email):
+    """Lower-cased mailbox name with dots and +tags removed."""
+    local = text(email).strip().lower().split('@')[0]
+    local = local.split('+')[0].replace('.', '')
+    return local or None
+
+
+def postcode(value):
+    code = re.sub(r'\s', '', text(value)).upper()
+    return code or None
+
+
+def first_initial(name):
+    initial = text(name).strip()[:1].lower()
+    return initial or None
+
+
+def date_key(value):
+    if not text(value):
+        return None
+    return pd.Timestamp(value).strftime('%Y-%m-%d')
+
+
+# Blocking pass name -> (CUSTOMERS column, key function)
+BLOCKING_PASSES = {
+    'DOB': ('DATE_OF_BIRTH', date_key),
+    'LAST_NAME': ('LAST_NAME', soundex),
+    'PHONE': ('PHONE', phone_digits),
+    'EMAIL': ('EMAIL', email_local_part),
+    'POSTCODE': ('POSTAL_CODE', postcode),
+}
+
+
+# Customers sharing one key value above which a block is a hub
+MAX_BLOCK_SIZE = 1000
+
+# Blocking pass -> (CUSTOMERS column, key function) splitting its hub blocks
+SUB_BLOCK_KEYS = {
+    'DOB': ('LAST_NAME', soundex),
+    'LAST_NAME': ('FIRST_NAME', first_initial),
+    'PHONE': ('FIRST_NAME', first_initial),
+    'EMAIL': ('FIRST_NAME', first_initial),
+    'POSTCODE': ('LAST_NAME', soundex),
+}
+
+# hub_blocks() columns
+HUB_COLUMNS = ['PASS', 'VALUE', 'CUSTOMERS', 'SUB_BLOCKS', 'LARGEST_SUB_BLOCK', 'SKIPPED']
+
+
+def blocking_keys(customers, passes=None):
+    """One row per customer with a key column per blocking pass (None = no key).
+
+    Each pass also gets a <pass>_SUB column with its SUB_BLOCK_KEYS key.
+    """
+    passes = passes or list(BLOCKING_PASSES)
+    keys = pd.DataFrame({'CUSTOMER_ID': customers['CUSTOMER_ID'].astype(str)})
+    secondary = {}
+    for name in passes:
+        column, key_function = BLOCKING_PASSES[name]
+        keys[name] = customers[column].map(key_function)
+        sub_key = SUB_BLOCK_KEYS[name]
+        if sub_key not in secondary:
+            secondary[sub_key] = customers[sub_key[0]].map(sub_key[1])
+        keys[f'{name}_SUB'] = secondary[sub_key]
+    return keys
+
+
+# =============================================================================
+# Hub blocks
+# =============================================================================
+
+def hub_blocks(keys, passes=None, max_block_size=MAX_BLOCK_SIZE):
+    """One HUB_COLUMNS row per key value shared by more than max_block_size customers.
+
+    SKIPPED counts the hub's customers left uncompared in that pass: those
+    without a secondary key or in a sub-block still over the limit.
+    """
+    passes = passes or [name for name in BLOCKING_PASSES if name in keys.columns]
+    hubs = []
+    for name in passes:
+        sizes = keys[name].value_counts()
+        for value, size in sizes[sizes > max_block_size].items():
+            sub_sizes = keys.loc[keys[name] == value, f'{name}_SUB'].value_counts()
+            hubs.append({
+                'PASS': name, 'VALUE': value, 'CUSTOMERS': int(size), 'SUB_BLOCKS': len(sub_sizes),
+                'LARGEST_SUB_BLOCK': int(sub_sizes.max()) if len(sub_sizes) else 0,
+                'SKIPPED': int(size - sub_sizes[sub_sizes <= max_block_size].sum()),
+            })
+    return pd.DataFrame(hubs, columns=HUB_COLUMNS).sort_values('CUSTOMERS', ascending=False, ignore_index=True)
+
+
+def log_hubs(hubs, max_block_size=MAX_BLOCK_SIZE):
+    for hub in hubs.itertuples():
+        log.warning(
+            "%s block %r has %d customers (> %d): split into %d sub-blocks, largest %d, %d customers skipped",
+            hub.PASS, hub.VALUE, hub.CUSTOMERS, max_block_size, hub.SUB_BLOCKS, hub.LARGEST_SUB_BLOCK, hub.SKIPPED,
+        )
+
+
+def block_column(keys, name, max_block_size=MAX_BLOCK_SIZE):
+    """Each customer's block in pass `name`, with hubs split by <name>_SUB (NaN = not compared)."""
+    key = keys[name]
+    hub = key.map(key.value_counts()) > max_block_size
+    sub_key = keys[f'{name}_SUB']
+    block = key.where(~hub, key.astype(str) + '|' + sub_key.fillna('')).mask(hub & sub_key.isna())
+    return block.mask(block.map(block.value_counts()) > max_block_size)
+
+
+def candidate_pairs(keys, passes=None, changed_ids=None, max_block_size=MAX_BLOCK_SIZE):
+    """Every pair of customers that shares at least one blocking key.
+
+    Pairs are ordered so CUSTOMER_ID_1 < CUSTOMER_ID_2 and appear once, with
+    BLOCKED_ON listing the passes that brought them together. With
+    changed_ids, only pairs involving at least one of those customers are
+    returned: each changed customer is joined to its blocks instead of every
+    block being expanded. Hub blocks are logged and split (see block_column).
+
+    Customers and blocks are joined as integer codes. Each pass sets one bit
+    of a pair's mask, and a mask is turned into pass names once, not per pair.
+    """
+    passes = passes or [name for name in BLOCKING_PASSES if name in keys.columns]
+    log_hubs(hub_blocks(keys, passes, max_block_size), max_block_size)
+    # Codes in CUSTOMER_ID order, so comparing codes compares the ids
+    ids = pd.Index(keys['CUSTOMER_ID'].astype(str).unique()).sort_values()
+    customers = ids.get_indexer(keys['CUSTOMER_ID'].astype(str))
+    changed = None if changed_ids is None else keys['CUSTOMER_ID'].astype(str).isin(changed_ids).to_numpy()
+    found, flags = [], []
+    for bit, name in enumerate(passes):
+        block_codes, _ = pd.factorize(block_column(keys, name, max_block_size))
+        keep = block_codes >= 0
+        block = pd.DataFrame({'CUSTOMER': customers[keep], 'BLOCK': block_codes[keep]})
+        left = block if changed is None else block[changed[keep]]
+        pairs = left.merge(block, on='BLOCK', suffixes=('_1', '_2'))
+        first, second = pairs['CUSTOMER_1'].to_numpy(), pairs['CUSTOMER_2'].to_numpy()
+        if changed is None:
+            first, second = first[first < second], second[first < second]
+        else:
+            first, second = np.minimum(first, second)[first != second], np.maximum(first, second)[first != second]
+        found.append(np.unique(first.astype(np.int64) * len(ids) + second))
+        flags.append(np.full(len(found[-1]), 1 << bit, dtype=np.int64))
+
+    if not found:
+        return pd.DataFrame(columns=['CUSTOMER_ID_1', 'CUSTOMER_ID_2', 'BLOCKED_ON'])
+    masks = pd.Series(np.concatenate(flags)).groupby(np.concatenate(found)).sum()
+    pair_ids = masks.index.to_numpy()
+    mask_codes, distinct = pd.factorize(masks.to_numpy())
+    names = np.array([','.join(name for bit, name in enumerate(passes) if mask & (1 << bit)) for mask in distinct],
+                     dtype=object)
+    return pd.DataFrame({
+        'CUSTOMER_ID_1': ids.to_numpy()[pair_ids // len(ids)],
+        'CUSTOMER_ID_2': ids.to_numpy()[pair_ids % len(ids)],
+        'BLOCKED_ON': names[mask_codes],
+    })
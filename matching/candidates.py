@@ -0,0 +1,218 @@
+"""
+Candidate generation job: CUSTOMERS -> scored pairs in DUPLICATE_CANDIDATES.
+
+Runs incrementally: MATCHING_WATERMARK records the newest customer change
+(CREATED_DATE / LAST_ACTIVITY_DATE) already matched, and the next run only
+compares customers changed since then against their blocks. The first run,
+or --full, matches everyone. Changed customers are renormalized into
+CUSTOMER_NORMALIZED (see matching.normalize) and blocked and scored on those
+values. Customers already merged into a golden record (see matching.merge)
+are left out, and pairs already decided in AGENT_DECISIONS are dropped
+before scoring (see matching.decided). Afterwards the obvious pairs are
+auto-decided (see matching.auto_decisions) and the clusters are rebuilt (see
+matching.clusters).
+
+Usage:
+    python -m matching.candidates            # match customers changed since the last run
+    python -m matching.candidates --full     # rematch every customer
+    python -m matching.candidates --dry-run  # print the pairs instead of loading them
+    python -m matching.candidates --full --workers 8  # score on 8 processes (see matching.parallel)
+    python -m matching.candidates --max-block-size 500  # split blocks of more than 500 customers
+"""
+
+import argparse
+import logging
+import os
+import uuid
+
+import pandas as pd
+
+from matching.blocking import MAX_BLOCK_SIZE, blocking_keys, candidate_pairs
+from matching.auto_decisions import resolve_candidates
+from matching.clusters import refresh_clusters
+from matching.merge import merged_customer_ids
+from matching.config import DEFAULTS, priority_for, threshold
+from matching.decided import drop_decided, load_decided_pairs
+from matching.households import tag_households
+from matching.normalize import load_normalized, normalize_customers, write_normalized
+from matching.parallel import score_pairs_parallel
+from matching.scoring import score_pairs
+from matching.warehouse import connect, stage_frame
+from query_builder import Query, table
+
+# Pairs scoring below this never reach the review queue
+MIN_CANDIDATE_SCORE = 50.0
+
+CANDIDATE_STAGE = 'CANDIDATE_STAGE'
+
+# DUPLICATE_CANDIDATES columns the job fills in
+CANDIDATE_FIELDS = [
+    'CANDIDATE_ID', 'CUSTOMER_ID_1', 'CUSTOMER_ID_2', 'MATCH_SCORE', 'MATCH_REASON', 'PRIORITY', 'HOUSEHOLD_MATCH',
+]
+
+WATERMARK_JOB = 'CANDIDATES'
+
+# MERGE condition: a PENDING pair is refreshed when anything the job writes changed
+CANDIDATE_CHANGED = (
+    "(dc.MATCH_SCORE IS DISTINCT FROM s.MATCH_SCORE OR dc.MATCH_REASON IS DISTINCT FROM s.MATCH_REASON"
+    " OR dc.PRIORITY IS DISTINCT FROM s.PRIORITY OR dc.HOUSEHOLD_MATCH IS DISTINCT FROM s.HOUSEHOLD_MATCH)"
+)
+
+# When a customer last changed, for the high-water mark
+CHANGED_AT = "GREATEST(c.CREATED_DATE, COALESCE(c.LAST_ACTIVITY_DATE, c.CREATED_DATE))"
+
+
+def generate_candidates(customers, passes=None, min_score=MIN_CANDIDATE_SCORE, changed_ids=None,
+                        high_priority=DEFAULTS['HIGH_PRIORITY_THRESHOLD'],
+                        medium_priority=DEFAULTS['MEDIUM_PRIORITY_THRESHOLD'], workers=1, decided=None,
+                        max_block_size=MAX_BLOCK_SIZE):
+    """Block, score and filter customer pairs.
+
+    `customers` is normally CUSTOMER_NORMALIZED (or normalize_customers()
+    output); raw CUSTOMERS rows also work, just with fewer matches. With
+    changed_ids, only pairs involving those customers are scored. Blocks of
+    more than max_block_size customers are split (see matching.blocking), and
+    pairs in `decided` (see matching.decided) are dropped before scoring. PRIORITY
+    uses the HIGH/MEDIUM_PRIORITY_THRESHOLD bands, except that same-household,
+    different-person pairs (see matching.households) are always LOW. With
+    workers > 1, pairs are scored on a process pool (see matching.parallel).
+
+    Returns one row per candidate with the CANDIDATE_FIELDS columns.
+    """
+    pairs = candidate_pairs(blocking_keys(customers, passes), passes, changed_ids, max_block_size)
+    pairs = drop_decided(pairs, decided)
+    scored = score_pairs(customers, pairs) if workers <= 1 else score_pairs_parallel(customers, pairs, workers)
+    scored = tag_households(customers, scored[scored['MATCH_SCORE'] >= min_score].reset_index(drop=True))
+    scored['PRIORITY'] = scored['MATCH_SCORE'].map(lambda score: priority_for(score, high_priority, medium_priority))
+    scored.loc[scored['HOUSEHOLD_MATCH'], 'PRIORITY'] = 'LOW'
+    scored['CANDIDATE_ID'] = [str(uuid.uuid4()) for _ in range(len(scored))]
+    return scored[CANDIDATE_FIELDS]
+
+
+def write_candidates(session, candidates):
+    """Upsert candidates into DUPLICATE_CANDIDATES.
+
+    Pairs are keyed in canonical order (CUSTOMER_ID_1 < CUSTOMER_ID_2, as
+    generate_candidates produces them). New pairs are inserted as PENDING. A
+    pair already present only has its score, reason, priority and household flag
+    refreshed while it is still PENDING; decided pairs are never touched or
+    recreated, so a decision in AGENT_DECISIONS always stands. Returns
+    (inserted, updated).
+    """
+    if candidates.empty:
+        return 0, 0
+    stage_frame(session, candidates, CANDIDATE_STAGE)
+    result = session.sql(f"""
+    MERGE INTO {table('DUPLICATE_CANDIDATES')} dc
+    USING {CANDIDATE_STAGE} s
+    ON dc.CUSTOMER_ID_1 = s.CUSTOMER_ID_1 AND dc.CUSTOMER_ID_2 = s.CUSTOMER_ID_2
+    WHEN MATCHED AND dc.STATUS = 'PENDING' AND {CANDIDATE_CHANGED} THEN UPDATE SET
+        MATCH_SCORE = s.MATCH_SCORE,
+        MATCH_REASON = s.MATCH_REASON,
+        PRIORITY = s.PRIORITY,
+        HOUSEHOLD_MATCH = s.HOUSEHOLD_MATCH
+    WHEN NOT MATCHED THEN INSERT
+        (CANDIDATE_ID, CUSTOMER_ID_1, CUSTOMER_ID_2, MATCH_SCORE, MATCH_REASON, STATUS, PRIORITY, HOUSEHOLD_MATCH, CREATED_DATE)
+    VALUES
+        (s.CANDIDATE_ID, s.CUSTOMER_ID_1, s.CUSTOMER_ID_2, s.MATCH_SCORE, s.MATCH_REASON, 'PENDING', s.PRIORITY,
+         s.HOUSEHOLD_MATCH, CURRENT_TIMESTAMP())
+    """).collect()
+    session.sql(f"CALL {table('REFRESH_DASHBOARD_ROLLUPS')}()").collect()
+    return int(result[0][0]), int(result[0][1])
+
+
+# =============================================================================
+# Incremental runs
+# =============================================================================
+
+def read_watermark(session):
+    """CHANGED_AT of the newest customer already matched, or None before the first run."""
+    rows = Query(f"SELECT HIGH_WATER_MARK FROM {table('MATCHING_WATERMARK')} WHERE 1=1") \
+        .where_equals("JOB_NAME", WATERMARK_JOB).execute(session).collect()
+    return rows[0][0] if rows else None
+
+
+def save_watermark(session, mark):
+    Query(f"""
+    MERGE INTO {table('MATCHING_WATERMARK')} w
+    USING (SELECT ? AS JOB_NAME, TO_TIMESTAMP_NTZ(?) AS HIGH_WATER_MARK) s
+    ON w.JOB_NAME = s.JOB_NAME
+    WHEN MATCHED THEN UPDATE SET HIGH_WATER_MARK = s.HIGH_WATER_MARK, UPDATED_AT = CURRENT_TIMESTAMP()
+    WHEN NOT MATCHED THEN INSERT (JOB_NAME, HIGH_WATER_MARK, UPDATED_AT)
+    VALUES (s.JOB_NAME, s.HIGH_WATER_MARK, CURRENT_TIMESTAMP())
+    """, [WATERMARK_JOB, str(mark)]).execute(session).collect()
+
+
+def changed_customers(session, since, until):
+    """CUSTOMERS rows whose CHANGED_AT is in (since, until]; since=None means all."""
+    query = Query(f"SELECT c.* FROM {table('CUSTOMERS')} c WHERE {CHANGED_AT} <= TO_TIMESTAMP_NTZ(?)", [str(until)])
+    if since is not None:
+        query.where(f"{CHANGED_AT} > TO_TIMESTAMP_NTZ(?)", str(since))
+    return query.execute(session).to_pandas()
+
+
+def match_changes(session, full=False, min_score=MIN_CANDIDATE_SCORE, dry_run=False, workers=1,
+                  max_block_size=MAX_BLOCK_SIZE):
+    """Normalize and match customers changed since the watermark.
+
+    Returns (candidates, inserted, updated). The watermark only moves forward
+    after the candidates are written, so a failed run is simply retried.
+    """
+    since = None if full else read_watermark(session)
+    until = session.sql(f"SELECT MAX({CHANGED_AT}) FROM {table('CUSTOMERS')} c").collect()[0][0]
+    if until is None:
+        return pd.DataFrame(columns=CANDIDATE_FIELDS), 0, 0
+
+    changed = normalize_customers(changed_customers(session, since, until))
+    existing = load_normalized(session)
+    customers = pd.concat(
+        [existing[~existing['CUSTOMER_ID'].isin(changed['CUSTOMER_ID'])], changed],
+        ignore_index=True,
+    )
+    customers = customers[~customers['CUSTOMER_ID'].isin(merged_customer_ids(session))]
+    changed_ids = None if since is None else set(changed['CUSTOMER_ID'])
+    candidates = generate_candidates(
+        customers, min_score=min_score, changed_ids=changed_ids,
+        high_priority=threshold(session, 'HIGH_PRIORITY_THRESHOLD'),
+        medium_priority=threshold(session, 'MEDIUM_PRIORITY_THRESHOLD'),
+        workers=workers, decided=load_decided_pairs(session), max_block_size=max_block_size,
+    )
+    if dry_run:
+        return candidates, 0, 0
+
+    write_normalized(session, changed)
+    inserted, updated = write_candidates(session, candidates)
+    save_watermark(session, until)
+    return candidates, inserted, updated
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--dry-run', action='store_true', help="print candidates instead of loading them")
+    parser.add_argument('--full', action='store_true', help="ignore the watermark and rematch every customer")
+    parser.add_argument('--min-score', type=float, default=MIN_CANDIDATE_SCORE)
+    parser.add_argument('--workers', type=int, default=1, help="scoring processes (0 = one per core)")
+    parser.add_argument('--max-block-size', type=int, default=MAX_BLOCK_SIZE,
+                        help="split blocks with more customers than this by a secondary key")
+    args = parser.parse_args()
+    logging.basicConfig(format='%(levelname)s %(name)s: %(message)s')
+
+    session = connect()
+    candidates, inserted, updated = match_changes(
+        session, full=args.full, min_score=args.min_score, dry_run=args.dry_run,
+        workers=args.workers or os.cpu_count(), max_block_size=args.max_block_size,
+    )
+    if args.dry_run:
+        print(candidates.to_string(index=False))
+        return
+    print(f"{len(candidates)} candidates scored, {inserted} new pairs added, "
+          f"{updated} pending pairs rescored in DUPLICATE_CANDIDATES")
+    auto_matched, auto_rejected, reprioritized = resolve_candidates(session)
+    print(f"{auto_matched} pairs auto-matched, {auto_rejected} household pairs auto-rejected, "
+          f"{reprioritized} priorities updated")
+    clusters = refresh_clusters(session)
+    print(f"{len(clusters)} clusters rebuilt")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,141 @@
+"""
+Cluster builder: DUPLICATE_CANDIDATES pairs -> multi-record clusters.
+
+Pairs are edges between customers. Union-find over every PENDING or MATCHED
+pair gives the connected groups, so A~B, B~C and C~D become one four-record
+cluster that an agent reviews once instead of as separate pairs. NOT_MATCHED
+pairs are left out, so a rejected link splits a cluster on the next build.
+
+Results go to CUSTOMER_CLUSTERS (one row per cluster) and CLUSTER_MEMBERS
+(customer -> cluster). Both are rebuilt from scratch each run. Whether a
+cluster still needs review is read live from its pairs' STATUS, so decisions
+made between builds show up straight away.
+
+Usage:
+    python -m matching.clusters
+"""
+
+import argparse
+
+import numpy as np
+import pandas as pd
+
+from matching.warehouse import connect, stage_frame
+from query_builder import country_code, country_join, table
+
+MEMBER_STAGE = 'CLUSTER_MEMBERS_STAGE'
+CLUSTER_STAGE = 'CUSTOMER_CLUSTERS_STAGE'
+
+
+def connected_components(pairs):
+    """Component label per customer for a CUSTOMER_ID_1/CUSTOMER_ID_2 edge list.
+
+    Returns (customer_ids, labels): labels[i] is the index into customer_ids
+    of the representative of customer_ids[i]'s component.
+    """
+    codes, customer_ids = pd.factorize(
+        pd.concat([pairs['CUSTOMER_ID_1'], pairs['CUSTOMER_ID_2']], ignore_index=True)
+    )
+    left, right = codes[:len(pairs)], codes[len(pairs):]
+    parent = np.arange(len(customer_ids))
+
+    def find(node):
+        while parent[node] != node:
+            parent[node] = parent[parent[node]]  # path halving
+            node = parent[node]
+        return node
+
+    for a, b in zip(left.tolist(), right.tolist()):
+        root_a, root_b = find(a), find(b)
+        if root_a != root_b:
+            parent[max(root_a, root_b)] = min(root_a, root_b)
+
+    return customer_ids, np.array([find(node) for node in range(len(customer_ids))], dtype=np.int64)
+
+
+def build_clusters(pairs):
+    """Cluster the given pairs.
+
+    Returns (clusters, members). CLUSTER_ID is 'CL-' plus the cluster's
+    smallest CUSTOMER_ID, so an unchanged cluster keeps its id across builds.
+    """
+    if pairs.empty:
+        return (
+            pd.DataFrame(columns=['CLUSTER_ID', 'FIRST_CUSTOMER_ID', 'MEMBER_COUNT', 'PAIR_COUNT', 'MAX_MATCH_SCORE']),
+            pd.DataFrame(columns=['CLUSTER_ID', 'CUSTOMER_ID']),
+        )
+    customer_ids, labels = connected_components(pairs)
+    members = pd.DataFrame({'CUSTOMER_ID': np.asarray(customer_ids, dtype=object), 'LABEL': labels})
+    first_member = members.groupby('LABEL')['CUSTOMER_ID'].transform('min')
+    members['CLUSTER_ID'] = 'CL-' + first_member
+
+    edges = pairs.merge(members[['CUSTOMER_ID', 'CLUSTER_ID']], left_on='CUSTOMER_ID_1', right_on='CUSTOMER_ID')
+    clusters = (
+        members.groupby('CLUSTER_ID')
+        .agg(FIRST_CUSTOMER_ID=('CUSTOMER_ID', 'min'), MEMBER_COUNT=('CUSTOMER_ID', 'size'))
+        .join(edges.groupby('CLUSTER_ID').agg(PAIR_COUNT=('CUSTOMER_ID_1', 'size'), MAX_MATCH_SCORE=('MATCH_SCORE', 'max')))
+        .reset_index()
+    )
+    return clusters, members[['CLUSTER_ID', 'CUSTOMER_ID']]
+
+
+# =============================================================================
+# Warehouse
+# =============================================================================
+
+def load_cluster_pairs(session):
+    """Every pair that still links two customers (PENDING or MATCHED)."""
+    return session.sql(f"""
+    SELECT CUSTOMER_ID_1, CUSTOMER_ID_2, MATCH_SCORE
+    FROM {table('DUPLICATE_CANDIDATES')}
+    WHERE STATUS IN ('PENDING', 'MATCHED')
+    """).to_pandas()
+
+
+def write_clusters(session, clusters, members):
+    """Replace CUSTOMER_CLUSTERS and CLUSTER_MEMBERS in one transaction."""
+    if not clusters.empty:
+        stage_frame(session, clusters, CLUSTER_STAGE)
+        stage_frame(session, members, MEMBER_STAGE)
+    session.sql("BEGIN").collect()
+    try:
+        session.sql(f"DELETE FROM {table('CLUSTER_MEMBERS')}").collect()
+        session.sql(f"DELETE FROM {table('CUSTOMER_CLUSTERS')}").collect()
+        if clusters.empty:
+            session.sql("COMMIT").collect()
+            return
+        session.sql(f"""
+        INSERT INTO {table('CLUSTER_MEMBERS')} (CLUSTER_ID, CUSTOMER_ID)
+        SELECT CLUSTER_ID, CUSTOMER_ID FROM {MEMBER_STAGE}
+        """).collect()
+        session.sql(f"""
+        INSERT INTO {table('CUSTOMER_CLUSTERS')}
+            (CLUSTER_ID, COUNTRY_CODE, MEMBER_COUNT, PAIR_COUNT, MAX_MATCH_SCORE, BUILT_AT)
+        SELECT s.CLUSTER_ID, {country_code('cc')}, s.MEMBER_COUNT, s.PAIR_COUNT,
+               s.MAX_MATCH_SCORE, CURRENT_TIMESTAMP()
+        FROM {CLUSTER_STAGE} s
+        LEFT JOIN {table('CUSTOMERS')} c ON c.CUSTOMER_ID = s.FIRST_CUSTOMER_ID
+        {country_join('c', 'cc')}
+        """).collect()
+        session.sql("COMMIT").collect()
+    except Exception:
+        session.sql("ROLLBACK").collect()
+        raise
+
+
+def refresh_clusters(session):
+    """Rebuild the cluster tables from DUPLICATE_CANDIDATES. Returns the clusters frame."""
+    clusters, members = build_clusters(load_cluster_pairs(session))
+    write_clusters(session, clusters, members)
+    return clusters
+
+
+def main():
+    argparse.ArgumentParser(description=__doc__.splitlines()[1]).parse_args()
+    clusters = refresh_clusters(connect())
+    multi = int((clusters['MEMBER_COUNT'] > 2).sum())
+    print(f"{len(clusters)} clusters built ({multi} with more than two records)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,38 @@
+"""
+Workflow thresholds from WORKFLOW_CONFIG.
+
+The batch jobs read WORKFLOW_CONFIG once per session; DEFAULTS apply when a
+key is missing, e.g. for --dry-run against an older database.
+"""
+
+import functools
+
+from query_builder import table
+
+DEFAULTS = {
+    'AUTO_MATCH_THRESHOLD': 98.0,
+    'AUTO_REJECT_HOUSEHOLDS': 0.0,
+    'HIGH_PRIORITY_THRESHOLD': 90.0,
+    'MEDIUM_PRIORITY_THRESHOLD': 70.0,
+}
+
+
+@functools.lru_cache(maxsize=None)
+def workflow_config(session):
+    """WORKFLOW_CONFIG as {CONFIG_KEY: CONFIG_VALUE}, read once per session."""
+    rows = session.sql(f"SELECT CONFIG_KEY, CONFIG_VALUE FROM {table('WORKFLOW_CONFIG')}").collect()
+    return {row['CONFIG_KEY']: row['CONFIG_VALUE'] for row in rows}
+
+
+def threshold(session, key):
+    """A numeric WORKFLOW_CONFIG value, falling back to DEFAULTS."""
+    value = workflow_config(session).get(key)
+    return float(value) if value not in (None, '') else DEFAULTS[key]
+
+
+def priority_for(score, high=DEFAULTS['HIGH_PRIORITY_THRESHOLD'], medium=DEFAULTS['MEDIUM_PRIORITY_THRESHOLD']):
+    if score >= high:
+        return 'HIGH'
+    if score >= medium:
+        return 'MEDIUM'
+    return 'LOW'
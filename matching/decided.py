@@ -0,0 +1,50 @@
+"""
+Decided pairs: customer pairs an agent (or SYSTEM) has already ruled on.
+
+A pair is keyed canonically as (lower CUSTOMER_ID, higher CUSTOMER_ID),
+the order candidate_pairs() produces and DUPLICATE_CANDIDATES stores.
+load_decided_pairs() reads every pair with a MATCHED or NOT_MATCHED row in
+AGENT_DECISIONS into a set, and generate_candidates() drops blocked pairs
+found in it before scoring, one set lookup per pair. A rejected pair such as
+DC-009 is therefore never rescored or offered again, whatever the blocking
+passes or the scores do later. SKIPPED is not a decision, so skipped pairs
+stay eligible.
+
+The set is exact rather than a Bloom filter: a false positive would silently
+hide a real duplicate, and a few million string pairs fit in memory.
+"""
+
+import numpy as np
+
+from query_builder import Query, table
+
+# AGENT_DECISIONS values that settle a pair for good
+FINAL_DECISIONS = ('MATCHED', 'NOT_MATCHED')
+
+
+def pair_key(customer_id_1, customer_id_2):
+    """Canonical key of a pair: its two CUSTOMER_IDs, lower first."""
+    customer_id_1, customer_id_2 = str(customer_id_1), str(customer_id_2)
+    return (customer_id_1, customer_id_2) if customer_id_1 < customer_id_2 else (customer_id_2, customer_id_1)
+
+
+def load_decided_pairs(session):
+    """Set of pair_key()s with a final decision in AGENT_DECISIONS."""
+    query = Query(f"""
+    SELECT DISTINCT dc.CUSTOMER_ID_1, dc.CUSTOMER_ID_2
+    FROM {table('AGENT_DECISIONS')} ad
+    JOIN {table('DUPLICATE_CANDIDATES')} dc ON dc.CANDIDATE_ID = ad.CANDIDATE_ID
+    WHERE 1=1""").where_in("ad.DECISION", FINAL_DECISIONS)
+    rows = query.execute(session).collect()
+    return {pair_key(row[0], row[1]) for row in rows}
+
+
+def drop_decided(pairs, decided):
+    """Blocked pairs (CUSTOMER_ID_1 < CUSTOMER_ID_2) whose key is not in `decided`."""
+    if not decided or pairs.empty:
+        return pairs
+    keep = np.fromiter(
+        (pair not in decided for pair in zip(pairs['CUSTOMER_ID_1'], pairs['CUSTOMER_ID_2'])),
+        dtype=bool, count=len(pairs),
+    )
+    return pairs[keep].reset_index(drop=True)
@@ -0,0 +1,71 @@
+"""
+Household index: customers living at one address on one phone line.
+
+Family members share a street address and the home phone, and usually a
+last name, so as a pair they look like a duplicate (DC-008: Adi and Mereoni
+Vakacegu). Each customer's HOUSEHOLD_ID in CUSTOMER_NORMALIZED is a hash of
+the normalized address lines, postcode and E.164 phone. CUSTOMERS holds a
+single PHONE, so a shared number is taken to be the household landline.
+
+A pair is "same household, different person" when the two customers share
+a HOUSEHOLD_ID, their first names are not similar (after nickname mapping),
+and their dates of birth do not match at all, not even as a near miss.
+Such pairs are flagged HOUSEHOLD_MATCH in DUPLICATE_CANDIDATES, their
+MATCH_REASON says so, they are always LOW priority, and agents are leased
+them last. With AUTO_REJECT_HOUSEHOLDS = 1 in WORKFLOW_CONFIG, the SYSTEM
+agent also decides them NOT_MATCHED (see matching.auto_decisions).
+"""
+
+import hashlib
+
+import numpy as np
+import pandas as pd
+
+from matching.blocking import text
+from matching.scoring import SIMILAR_NAME
+
+# CUSTOMER_NORMALIZED columns that make up the household key
+HOUSEHOLD_FIELDS = ('ADDRESS_LINE1', 'ADDRESS_LINE2', 'POSTAL_CODE', 'PHONE')
+
+HOUSEHOLD_REASON = 'Same household, different person'
+
+
+def household_id(address_line1, address_line2, postal_code, phone):
+    """16-hex-digit household key, or None without both an address and a phone."""
+    if not text(address_line1) or not text(phone):
+        return None
+    key = '|'.join(text(value) for value in (address_line1, address_line2, postal_code, phone))
+    return hashlib.sha1(key.encode('utf-8')).hexdigest()[:16]
+
+
+def household_ids(normalized):
+    """HOUSEHOLD_ID for each row of a CUSTOMER_NORMALIZED-shaped frame."""
+    return [household_id(*values) for values in zip(*(normalized[field] for field in HOUSEHOLD_FIELDS))]
+
+
+def household_pairs(customers, scored):
+    """Boolean array: which scored pairs are the same household but different people.
+
+    `scored` is score_pairs() output (CUSTOMER_ID_1/2 and the *_SIM columns).
+    Customers without a HOUSEHOLD_ID column get one computed from their values.
+    """
+    households = customers['HOUSEHOLD_ID'] if 'HOUSEHOLD_ID' in customers else pd.Series(household_ids(customers))
+    by_id = pd.Series(households.to_numpy(), index=customers['CUSTOMER_ID'].astype(str))
+    first = scored['CUSTOMER_ID_1'].astype(str).map(by_id)
+    second = scored['CUSTOMER_ID_2'].astype(str).map(by_id)
+    same_household = (first == second).to_numpy() & first.notna().to_numpy()
+    different_person = (scored['FIRST_NAME_SIM'] < SIMILAR_NAME).to_numpy() & (scored['DATE_OF_BIRTH_SIM'] == 0).to_numpy()
+    return same_household & different_person
+
+
+def household_reason(reason):
+    """MATCH_REASON of a household pair: 'Same household, different person (same address, ...)'."""
+    return f"{HOUSEHOLD_REASON} ({reason[:1].lower()}{reason[1:]})"
+
+
+def tag_households(customers, scored):
+    """Add HOUSEHOLD_MATCH to scored pairs and prefix their MATCH_REASON."""
+    flagged = household_pairs(customers, scored)
+    scored = scored.assign(HOUSEHOLD_MATCH=flagged)
+    scored['MATCH_REASON'] = np.where(flagged, scored['MATCH_REASON'].map(household_reason), scored['MATCH_REASON'])
+    return scored
@@ -0,0 +1,316 @@
+"""
+Merge job: MATCHED pairs -> golden customer records, tracked in MERGE_ACTIONS.
+
+MATCHED pairs are joined into clusters with union-find (as in
+matching.clusters). Each cluster keeps one surviving record, the master,
+chosen by SURVIVORSHIP: most recent LAST_ACTIVITY_DATE (by day), then most
+TOTAL_TRANSACTIONS, then highest ACCOUNT_BALANCE, then the most trusted
+SOURCE_SYSTEM. A customer that is already a master stays the master when its
+cluster grows.
+
+The master becomes the golden record. Each field comes from the best-ranked
+record that has it filled in, and the address parts all come from one record.
+Transactions and balances are summed, CREATED_DATE is the earliest and
+LAST_ACTIVITY_DATE the latest. The other records get ACCOUNT_STATUS 'MERGED'
+and are no longer matched. Their transactions and balance now live on the
+master, so they are zeroed on the merged records and totals over CUSTOMERS
+do not count them twice. PENDING candidate pairs that involve a merged record
+are closed with STATUS 'MERGED' in the same transaction.
+
+Every merged record has a MERGE_ACTIONS row that starts PENDING. Clusters
+are applied in chunks, and each chunk is one transaction of set-based
+statements. A chunk's actions end up COMPLETED, or FAILED with the chunk
+rolled back. Failed merges are planned again on the next run, and PENDING
+actions an interrupted run left for the records being planned again are
+marked FAILED; other runs' actions are left alone.
+
+Usage:
+    python -m matching.merge
+    python -m matching.merge --dry-run   # print the plan without merging
+"""
+
+import argparse
+import uuid
+
+import numpy as np
+import pandas as pd
+
+from matching.auto_decisions import SYSTEM_AGENT
+from matching.clusters import connected_components
+from matching.warehouse import connect, stage_frame
+from query_builder import table
+
+MERGED_STATUS = 'MERGED'
+
+# Lower is more trusted; unlisted systems rank after these
+SOURCE_SYSTEM_RANK = {'BRANCH': 0, 'ONLINE': 1, 'MOBILE': 2}
+
+# Golden record field -> column a record must have filled in to supply it.
+# Address parts share ADDRESS_LINE1 so an address is never stitched together
+# from two records.
+SURVIVOR_FIELDS = {
+    'FIRST_NAME': 'FIRST_NAME',
+    'LAST_NAME': 'LAST_NAME',
+    'EMAIL': 'EMAIL',
+    'PHONE': 'PHONE',
+    'DATE_OF_BIRTH': 'DATE_OF_BIRTH',
+    'ADDRESS_LINE1': 'ADDRESS_LINE1',
+    'ADDRESS_LINE2': 'ADDRESS_LINE1',
+    'CITY': 'ADDRESS_LINE1',
+    'STATE': 'ADDRESS_LINE1',
+    'POSTAL_CODE': 'ADDRESS_LINE1',
+    'COUNTRY': 'COUNTRY',
+    'ACCOUNT_STATUS': 'ACCOUNT_STATUS',
+    'ACCOUNT_TYPE': 'ACCOUNT_TYPE',
+    'SOURCE_SYSTEM': 'SOURCE_SYSTEM',
+}
+
+# Golden record field -> aggregate over the cluster's records
+AGGREGATED_FIELDS = {
+    'CREATED_DATE': 'MIN',
+    'LAST_ACTIVITY_DATE': 'MAX',
+    'TOTAL_TRANSACTIONS': 'SUM',
+    'ACCOUNT_BALANCE': 'SUM',
+}
+
+# Summed fields move to the master, so merged records are zeroed
+MOVED_FIELDS = [field for field, aggregate in AGGREGATED_FIELDS.items() if aggregate == 'SUM']
+
+# Clusters per transaction
+MERGE_CHUNK_SIZE = 500
+
+PLAN_STAGE = 'MERGE_PLAN_STAGE'
+
+# One row per record taking part in a merge; the master's row has no MERGE_ID
+PLAN_COLUMNS = ['MERGE_ID', 'CANDIDATE_ID', 'MASTER_CUSTOMER_ID', 'CUSTOMER_ID', 'SURVIVOR_RANK', 'CHUNK_NO']
+
+
+def survivor_order(customers, masters=()):
+    """Sort CUSTOMERS rows best survivor first (see SURVIVORSHIP in the module docstring)."""
+    keys = pd.DataFrame({
+        'IS_MASTER': customers['CUSTOMER_ID'].isin(set(masters)),
+        'ACTIVITY_DAY': pd.to_datetime(customers['LAST_ACTIVITY_DATE']).dt.normalize(),
+        'TOTAL_TRANSACTIONS': customers['TOTAL_TRANSACTIONS'].astype(float),
+        'ACCOUNT_BALANCE': customers['ACCOUNT_BALANCE'].astype(float),
+        'SOURCE_RANK': customers['SOURCE_SYSTEM'].map(SOURCE_SYSTEM_RANK).fillna(len(SOURCE_SYSTEM_RANK)),
+        'CUSTOMER_ID': customers['CUSTOMER_ID'],
+    }, index=customers.index)
+    order = keys.sort_values(
+        ['IS_MASTER', 'ACTIVITY_DAY', 'TOTAL_TRANSACTIONS', 'ACCOUNT_BALANCE', 'SOURCE_RANK', 'CUSTOMER_ID'],
+        ascending=[False, False, False, False, True, True],
+        na_position='last',
+    ).index
+    return customers.loc[order]
+
+
+def plan_merges(pairs, customers, merged_ids=(), masters=(), chunk_size=MERGE_CHUNK_SIZE):
+    """Work out which records merge into which master.
+
+    `pairs` are MATCHED CUSTOMER_ID_1/CUSTOMER_ID_2/MATCH_SCORE/CANDIDATE_ID
+    rows, and `customers` are the CUSTOMERS rows they mention. Customers in
+    merged_ids were merged by an earlier run and are skipped. Customers in
+    masters already hold a golden record.
+
+    Returns PLAN_COLUMNS rows for every cluster that still has something to
+    merge. SURVIVOR_RANK orders each cluster's records (0 is the master).
+    CANDIDATE_ID is the best-scoring MATCHED pair behind each merged record.
+    """
+    if pairs.empty:
+        return pd.DataFrame(columns=PLAN_COLUMNS)
+    customer_ids, labels = connected_components(pairs)
+    members = pd.DataFrame({'CUSTOMER_ID': np.asarray(customer_ids, dtype=object), 'LABEL': labels})
+    members = members[~members['CUSTOMER_ID'].isin(set(merged_ids))]
+    members = survivor_order(members.merge(customers, on='CUSTOMER_ID'), masters)
+
+    members['SURVIVOR_RANK'] = members.groupby('LABEL').cumcount()
+    members['MASTER_CUSTOMER_ID'] = members.groupby('LABEL')['CUSTOMER_ID'].transform('first')
+    members = members[members.groupby('LABEL')['CUSTOMER_ID'].transform('size') > 1]
+
+    ends = pd.concat([
+        pairs[['CANDIDATE_ID', 'MATCH_SCORE']].assign(CUSTOMER_ID=pairs['CUSTOMER_ID_1']),
+        pairs[['CANDIDATE_ID', 'MATCH_SCORE']].assign(CUSTOMER_ID=pairs['CUSTOMER_ID_2']),
+    ])
+    best_pair = ends.sort_values(['MATCH_SCORE', 'CANDIDATE_ID'], ascending=[False, True]) \
+        .drop_duplicates('CUSTOMER_ID').set_index('CUSTOMER_ID')['CANDIDATE_ID']
+
+    merged = members['SURVIVOR_RANK'] > 0
+    members['CANDIDATE_ID'] = members['CUSTOMER_ID'].map(best_pair).where(merged, None)
+    members['MERGE_ID'] = [str(uuid.uuid4()) if is_merged else None for is_merged in merged]
+    chunk_of = {master: i // chunk_size for i, master in enumerate(members['MASTER_CUSTOMER_ID'].unique())}
+    members['CHUNK_NO'] = members['MASTER_CUSTOMER_ID'].map(chunk_of)
+    return members[PLAN_COLUMNS].reset_index(drop=True)
+
+
+def golden_record_sql():
+    """Select list building each master's golden record from its cluster's records."""
+    fields = [
+        f"MIN_BY(x.{field}, IFF(NULLIF(TRIM(x.{source}::VARCHAR), '') IS NULL, NULL, p.SURVIVOR_RANK)) AS {field}"
+        for field, source in SURVIVOR_FIELDS.items()
+    ]
+    fields += [f"{aggregate}(x.{field}) AS {field}" for field, aggregate in AGGREGATED_FIELDS.items()]
+    return ",\n            ".join(fields)
+
+
+# =============================================================================
+# Warehouse
+# =============================================================================
+
+def load_matched_pairs(session):
+    return session.sql(f"""
+    SELECT CANDIDATE_ID, CUSTOMER_ID_1, CUSTOMER_ID_2, MATCH_SCORE
+    FROM {table('DUPLICATE_CANDIDATES')}
+    WHERE STATUS = 'MATCHED'
+    """).to_pandas()
+
+
+def load_merge_customers(session):
+    """The survivorship columns of every customer in a MATCHED pair."""
+    return session.sql(f"""
+    SELECT CUSTOMER_ID, LAST_ACTIVITY_DATE, TOTAL_TRANSACTIONS, ACCOUNT_BALANCE, SOURCE_SYSTEM
+    FROM {table('CUSTOMERS')}
+    WHERE CUSTOMER_ID IN (
+        SELECT CUSTOMER_ID_1 FROM {table('DUPLICATE_CANDIDATES')} WHERE STATUS = 'MATCHED'
+        UNION
+        SELECT CUSTOMER_ID_2 FROM {table('DUPLICATE_CANDIDATES')} WHERE STATUS = 'MATCHED'
+    )
+    """).to_pandas()
+
+
+def load_completed_merges(session):
+    """(merged customer ids, master customer ids) from earlier COMPLETED merges."""
+    done = session.sql(f"""
+    SELECT MASTER_CUSTOMER_ID, MERGED_CUSTOMER_ID
+    FROM {table('MERGE_ACTIONS')}
+    WHERE MERGE_STATUS = 'COMPLETED'
+    """).to_pandas()
+    return set(done['MERGED_CUSTOMER_ID']), set(done['MASTER_CUSTOMER_ID'])
+
+
+def merged_customer_ids(session):
+    """Customers folded into a golden record; the candidate job skips them."""
+    rows = session.sql(
+        f"SELECT CUSTOMER_ID FROM {table('CUSTOMERS')} WHERE ACCOUNT_STATUS = '{MERGED_STATUS}'"
+    ).collect()
+    return {row['CUSTOMER_ID'] for row in rows}
+
+
+def record_pending(session, plan):
+    """Stage the plan and log its merges as PENDING in MERGE_ACTIONS.
+
+    PENDING rows for records this plan merges again were left by an
+    interrupted run, so they are marked FAILED first. PENDING rows for any
+    other record are left to the run that wrote them.
+    """
+    stage_frame(session, plan, PLAN_STAGE)
+    session.sql(f"""
+    UPDATE {table('MERGE_ACTIONS')} m
+    SET MERGE_STATUS = 'FAILED', MERGE_TIMESTAMP = CURRENT_TIMESTAMP()
+    FROM {PLAN_STAGE} p
+    WHERE m.MERGE_STATUS = 'PENDING' AND m.MERGED_CUSTOMER_ID = p.CUSTOMER_ID AND p.MERGE_ID IS NOT NULL
+    """).collect()
+    session.sql(f"""
+    INSERT INTO {table('MERGE_ACTIONS')}
+        (MERGE_ID, CANDIDATE_ID, MASTER_CUSTOMER_ID, MERGED_CUSTOMER_ID, MERGE_STATUS, MERGED_BY)
+    SELECT MERGE_ID, CANDIDATE_ID, MASTER_CUSTOMER_ID, CUSTOMER_ID, 'PENDING', '{SYSTEM_AGENT}'
+    FROM {PLAN_STAGE}
+    WHERE MERGE_ID IS NOT NULL
+    """).collect()
+
+
+def apply_chunk(session, chunk_no):
+    """Merge one chunk of clusters in a single transaction. Returns True if it committed."""
+    updates = ",\n        ".join(
+        f"{field} = g.{field}" for field in list(SURVIVOR_FIELDS) + list(AGGREGATED_FIELDS)
+    )
+    moved = ", ".join(f"{field} = 0" for field in MOVED_FIELDS)
+    session.sql("BEGIN").collect()
+    try:
+        session.sql(f"""
+        MERGE INTO {table('CUSTOMERS')} c
+        USING (
+            SELECT p.MASTER_CUSTOMER_ID,
+            {golden_record_sql()}
+            FROM {PLAN_STAGE} p
+            JOIN {table('CUSTOMERS')} x ON x.CUSTOMER_ID = p.CUSTOMER_ID
+            WHERE p.CHUNK_NO = ?
+            GROUP BY p.MASTER_CUSTOMER_ID
+        ) g
+        ON c.CUSTOMER_ID = g.MASTER_CUSTOMER_ID
+        WHEN MATCHED THEN UPDATE SET
+        {updates}
+        """, params=[chunk_no]).collect()
+        session.sql(f"""
+        UPDATE {table('CUSTOMERS')} c
+        SET ACCOUNT_STATUS = '{MERGED_STATUS}', {moved}
+        FROM {PLAN_STAGE} p
+        WHERE c.CUSTOMER_ID = p.CUSTOMER_ID AND p.MERGE_ID IS NOT NULL AND p.CHUNK_NO = ?
+        """, params=[chunk_no]).collect()
+        session.sql(f"""
+        UPDATE {table('DUPLICATE_CANDIDATES')} dc
+        SET STATUS = '{MERGED_STATUS}', ASSIGNED_TO = '{SYSTEM_AGENT}', LEASE_EXPIRES_AT = NULL
+        FROM {PLAN_STAGE} p
+        WHERE dc.STATUS = 'PENDING' AND p.MERGE_ID IS NOT NULL AND p.CHUNK_NO = ?
+          AND p.CUSTOMER_ID IN (dc.CUSTOMER_ID_1, dc.CUSTOMER_ID_2)
+        """, params=[chunk_no]).collect()
+        session.sql(f"""
+        UPDATE {table('MERGE_ACTIONS')} m
+        SET MERGE_STATUS = 'COMPLETED', MERGE_TIMESTAMP = CURRENT_TIMESTAMP()
+        FROM {PLAN_STAGE} p
+        WHERE m.MERGE_ID = p.MERGE_ID AND p.CHUNK_NO = ?
+        """, params=[chunk_no]).collect()
+        session.sql("COMMIT").collect()
+        return True
+    except Exception:
+        session.sql("ROLLBACK").collect()
+        session.sql(f"""
+        UPDATE {table('MERGE_ACTIONS')} m
+        SET MERGE_STATUS = 'FAILED', MERGE_TIMESTAMP = CURRENT_TIMESTAMP()
+        FROM {PLAN_STAGE} p
+        WHERE m.MERGE_ID = p.MERGE_ID AND p.CHUNK_NO = ?
+        """, params=[chunk_no]).collect()
+        return False
+
+
+def run_merges(session, chunk_size=MERGE_CHUNK_SIZE, dry_run=False):
+    """Plan and apply every outstanding merge.
+
+    Returns (plan, completed, failed), where completed and failed count
+    merged records.
+    """
+    merged_ids, masters = load_completed_merges(session)
+    plan = plan_merges(
+        load_matched_pairs(session), load_merge_customers(session),
+        merged_ids=merged_ids, masters=masters, chunk_size=chunk_size,
+    )
+    if dry_run or plan.empty:
+        return plan, 0, 0
+
+    record_pending(session, plan)
+    merges_per_chunk = plan[plan['MERGE_ID'].notna()].groupby('CHUNK_NO').size()
+    completed = failed = 0
+    for chunk_no, merges in merges_per_chunk.items():
+        if apply_chunk(session, int(chunk_no)):
+            completed += int(merges)
+        else:
+            failed += int(merges)
+    if completed:
+        # Closed candidates leave PENDING, so rebuild the status summary
+        session.sql(f"CALL {table('REFRESH_DASHBOARD_ROLLUPS')}()").collect()
+    return plan, completed, failed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--dry-run', action='store_true', help="print the merge plan without merging")
+    parser.add_argument('--chunk-size', type=int, default=MERGE_CHUNK_SIZE, help="clusters per transaction")
+    args = parser.parse_args()
+
+    plan, completed, failed = run_merges(connect(), chunk_size=args.chunk_size, dry_run=args.dry_run)
+    if args.dry_run:
+        print(plan.to_string(index=False))
+        return
+    print(f"{completed} records merged into golden records, {failed} failed (see MERGE_ACTIONS)")
+
+
+if __name__ == '__main__':
+    main()
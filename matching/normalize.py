@@ -0,0 +1,245 @@
+"""
+Field normalization for matching and for the compare views.
+
+Each customer is normalized once into CUSTOMER_NORMALIZED, which has the same
+column names as CUSTOMERS for the fields it covers. Matching reads that table
+in place of CUSTOMERS, and the apps compare its values to decide the ✅/⚠️
+indicators, so '+679-9234567' / '+679 923 4567', '45 Victoria Parade' /
+'45 Victoria Pde' and 'Sera' / 'Sarah' agree everywhere. Its COUNTRY_CODE
+(a PACIFIC_COUNTRIES code, or UNKNOWN_COUNTRY) comes from COUNTRY_NAMES; the
+apps get the same code in SQL from the COUNTRY_CODES table, so customers the
+job has not reached yet are still filed under their country.
+
+Usage:
+    python -m matching.normalize            # normalize customers not yet in the table
+    python -m matching.normalize --rebuild  # renormalize everyone (after editing the dictionaries)
+"""
+
+import argparse
+import re
+import unicodedata
+
+import pandas as pd
+
+from matching.blocking import date_key, text
+from matching.households import household_ids
+from matching.warehouse import connect, stage_frame
+from query_builder import NORMALIZED_COLUMNS, table
+
+# International calling codes for the PACIFIC_COUNTRIES set in streamlit_app_v2.py
+CALLING_CODES = {
+    'FJ': '679',
+    'NZ': '64',
+    'AS': '1684',
+    'CK': '682',
+    'SB': '677',
+    'TO': '676',
+    'VU': '678',
+    'WS': '685',
+}
+
+# CUSTOMERS.COUNTRY (folded) -> country code; the COUNTRY_CODES table in
+# 01_setup_database.sql must hold the same rows (check_country_codes())
+COUNTRY_NAMES = {
+    'fiji': 'FJ',
+    'new zealand': 'NZ',
+    'american samoa': 'AS',
+    'cook islands': 'CK',
+    'solomon islands': 'SB',
+    'tonga': 'TO',
+    'vanuatu': 'VU',
+    'samoa': 'WS',
+    'western samoa': 'WS',
+}
+
+# COUNTRY_CODE for a missing or unrecognised country
+UNKNOWN_COUNTRY = 'Unknown'
+
+# Shortest national number we trust to already carry a calling code
+MIN_NATIONAL_DIGITS = 7
+
+STREET_SUFFIXES = {
+    'ave': 'avenue',
+    'blvd': 'boulevard',
+    'cres': 'crescent',
+    'ct': 'court',
+    'dr': 'drive',
+    'hwy': 'highway',
+    'ln': 'lane',
+    'pde': 'parade',
+    'pl': 'place',
+    'rd': 'road',
+    'st': 'street',
+    'tce': 'terrace',
+}
+
+# Nickname / spelling variant -> canonical given name
+NICKNAMES = {
+    'sera': 'sarah',
+    'sara': 'sarah',
+    'joe': 'josefa',
+    'jo': 'josefa',
+    'josef': 'josefa',
+    'joseph': 'josefa',
+    'pita': 'peter',
+    'pete': 'peter',
+    'tevita': 'david',
+    'dave': 'david',
+    'sione': 'john',
+    'jone': 'john',
+    'mele': 'mary',
+    'mere': 'mary',
+    'meri': 'mary',
+    'viliami': 'william',
+    'bill': 'william',
+    'will': 'william',
+    'mohamed': 'mohammed',
+    'mohammad': 'mohammed',
+    'muhammad': 'mohammed',
+}
+
+
+def fold(value):
+    """Case- and diacritic-folded text with punctuation as single spaces."""
+    decomposed = unicodedata.normalize('NFKD', text(value))
+    stripped = ''.join(char for char in decomposed if not unicodedata.combining(char))
+    return ' '.join(re.sub(r'[^\w]+', ' ', stripped.casefold()).split())
+
+
+def country_code(country):
+    return COUNTRY_NAMES.get(fold(country))
+
+
+def e164_phone(phone, country=None):
+    """E.164 form ('+6799234567') using the customer's country for national numbers.
+
+    Numbers from outside the PACIFIC_COUNTRIES set without a '+' or '00'
+    prefix are returned as plain digits, since their calling code is unknown.
+    """
+    raw = text(phone).strip()
+    digits = re.sub(r'\D', '', raw)
+    if not digits:
+        return None
+    if raw.startswith('+'):
+        return '+' + digits
+    if digits.startswith('00'):
+        return '+' + digits[2:]
+
+    calling_code = CALLING_CODES.get(country_code(country))
+    if calling_code is None:
+        return digits
+    if digits.startswith(calling_code) and len(digits) - len(calling_code) >= MIN_NATIONAL_DIGITS:
+        return '+' + digits
+    # Drop the national trunk prefix, e.g. NZ 021... -> +6421...
+    if digits.startswith('0'):
+        digits = digits[1:]
+    return '+' + calling_code + digits
+
+
+def normalize_address(line):
+    """Folded address with street suffixes spelled out ('45 Victoria Pde' -> '45 victoria parade')."""
+    words = [STREET_SUFFIXES.get(word, word) for word in fold(line).split()]
+    return ' '.join(words) or None
+
+
+def normalize_given_name(name):
+    """Folded first name mapped through the nickname dictionary."""
+    folded = fold(name)
+    return NICKNAMES.get(folded, folded) or None
+
+
+def normalize_customers(customers):
+    """One CUSTOMER_NORMALIZED row per customer (NORMALIZED_COLUMNS)."""
+    countries = customers['COUNTRY'] if 'COUNTRY' in customers else [None] * len(customers)
+    normalized = pd.DataFrame({
+        'CUSTOMER_ID': customers['CUSTOMER_ID'].astype(str),
+        'FIRST_NAME': customers['FIRST_NAME'].map(normalize_given_name),
+        'LAST_NAME': customers['LAST_NAME'].map(lambda name: fold(name) or None),
+        'EMAIL': customers['EMAIL'].map(lambda email: text(email).strip().casefold() or None),
+        'PHONE': [e164_phone(phone, country) for phone, country in zip(customers['PHONE'], countries)],
+        'DATE_OF_BIRTH': customers['DATE_OF_BIRTH'].map(date_key),
+        'ADDRESS_LINE1': customers['ADDRESS_LINE1'].map(normalize_address),
+        'ADDRESS_LINE2': customers['ADDRESS_LINE2'].map(normalize_address),
+        'CITY': customers['CITY'].map(lambda city: fold(city) or None),
+        'POSTAL_CODE': customers['POSTAL_CODE'].map(lambda code: re.sub(r'\s', '', text(code)).upper() or None),
+        'COUNTRY_CODE': [country_code(country) or UNKNOWN_COUNTRY for country in countries],
+    })
+    normalized['HOUSEHOLD_ID'] = household_ids(normalized)
+    return normalized[list(NORMALIZED_COLUMNS)]
+
+
+# =============================================================================
+# Warehouse side table
+# =============================================================================
+
+NORMALIZED_STAGE = 'CUSTOMER_NORMALIZED_STAGE'
+
+
+def customers_to_normalize(session, rebuild=False):
+    """CUSTOMERS rows with no CUSTOMER_NORMALIZED row yet (or all of them)."""
+    sql = f"""
+    SELECT c.*
+    FROM {table('CUSTOMERS')} c
+    LEFT JOIN {table('CUSTOMER_NORMALIZED')} n ON n.CUSTOMER_ID = c.CUSTOMER_ID
+    """
+    if not rebuild:
+        sql += " WHERE n.CUSTOMER_ID IS NULL"
+    return session.sql(sql).to_pandas()
+
+
+def check_country_codes(session):
+    """Raise ValueError unless COUNTRY_CODES holds exactly COUNTRY_NAMES.
+
+    The apps and LEASE_CANDIDATES map CUSTOMERS.COUNTRY through that table in
+    SQL, so a name added on one side only would give one customer two codes.
+    """
+    rows = session.sql(f"SELECT COUNTRY_NAME, COUNTRY_CODE FROM {table('COUNTRY_CODES')}").collect()
+    stored = {row['COUNTRY_NAME']: row['COUNTRY_CODE'] for row in rows}
+    if stored != COUNTRY_NAMES:
+        differ = sorted(set(stored.items()) ^ set(COUNTRY_NAMES.items()))
+        raise ValueError(f"COUNTRY_CODES does not match matching.normalize.COUNTRY_NAMES: {differ}")
+
+
+def write_normalized(session, normalized):
+    """Upsert normalized rows into CUSTOMER_NORMALIZED. Returns rows written."""
+    if normalized.empty:
+        return 0
+    check_country_codes(session)
+    stage_frame(session, normalized, NORMALIZED_STAGE)
+    updates = ",\n        ".join(f"{column} = s.{column}" for column in NORMALIZED_COLUMNS[1:])
+    columns = ", ".join(NORMALIZED_COLUMNS)
+    values = ", ".join(f"s.{column}" for column in NORMALIZED_COLUMNS)
+    session.sql(f"""
+    MERGE INTO {table('CUSTOMER_NORMALIZED')} n
+    USING {NORMALIZED_STAGE} s
+    ON n.CUSTOMER_ID = s.CUSTOMER_ID
+    WHEN MATCHED THEN UPDATE SET
+        {updates},
+        NORMALIZED_AT = CURRENT_TIMESTAMP()
+    WHEN NOT MATCHED THEN INSERT ({columns}, NORMALIZED_AT)
+    VALUES ({values}, CURRENT_TIMESTAMP())
+    """).collect()
+    return len(normalized)
+
+
+def refresh_normalized(session, rebuild=False):
+    """Normalize every customer missing from CUSTOMER_NORMALIZED. Returns rows written."""
+    return write_normalized(session, normalize_customers(customers_to_normalize(session, rebuild)))
+
+
+def load_normalized(session):
+    """CUSTOMER_NORMALIZED as a DataFrame shaped like CUSTOMERS for matching."""
+    return session.table(table('CUSTOMER_NORMALIZED')).select(list(NORMALIZED_COLUMNS)).to_pandas()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--rebuild', action='store_true', help="renormalize every customer")
+    args = parser.parse_args()
+
+    written = refresh_normalized(connect(), rebuild=args.rebuild)
+    print(f"{written} customers normalized into CUSTOMER_NORMALIZED")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,154 @@
+"""
+Parallel pair scoring on a process pool.
+
+The customer feature arrays (see matching.scoring.customer_features) are
+encoded once in the parent and copied into shared memory. Worker processes
+attach to them at start-up, so tasks carry no DataFrames and no feature
+data. Each task is just a (start, stop) slice of the pair list. Pairs are
+sorted into shards by COUNTRY_CODE and the blocking pass that found them
+(BLOCKED_ON), and large shards are split into SHARD_SIZE slices, so a task's
+customers sit close together in the feature arrays. Workers write scores and
+per-field similarities straight into shared output arrays. The parent then
+builds MATCH_REASON and the scored frame exactly as score_pairs does.
+
+Used by matching.candidates with --workers; benchmarks.bench_parallel
+reports the speedup against core count.
+"""
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+import pandas as pd
+
+from matching.scoring import FIELD_WEIGHTS, customer_features, score_feature_pairs, scored_frame
+
+# Pairs per task; big enough to keep NumPy vectorized, small enough to balance
+SHARD_SIZE = 100_000
+
+# Worker-side views of the shared arrays, set by attach()
+_FEATURES = {}
+_PAIRS = {}
+_RESULTS = {}
+_BLOCKS = []
+
+
+# =============================================================================
+# Shared memory
+# =============================================================================
+
+def share(arrays):
+    """Copy arrays into SharedMemory blocks.
+
+    Returns (blocks, specs): the blocks must stay open in the parent until
+    the pool is done, and specs ({name: (block name, shape, dtype)}) is what
+    workers need to attach.
+    """
+    blocks, specs = [], {}
+    for name, array in arrays.items():
+        array = np.ascontiguousarray(array)
+        block = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+        np.ndarray(array.shape, array.dtype, buffer=block.buf)[...] = array
+        blocks.append(block)
+        specs[name] = (block.name, array.shape, array.dtype.str)
+    return blocks, specs
+
+
+def copy_out(blocks, specs):
+    """Private copies of shared arrays, so the blocks can be released."""
+    return {
+        name: np.ndarray(shape, np.dtype(dtype), buffer=block.buf).copy()
+        for block, (name, (_, shape, dtype)) in zip(blocks, specs.items())
+    }
+
+
+def views(specs, blocks):
+    """NumPy views over attached blocks, keeping the blocks referenced."""
+    arrays = {}
+    for name, (block_name, shape, dtype) in specs.items():
+        block = shared_memory.SharedMemory(name=block_name)
+        blocks.append(block)
+        arrays[name] = np.ndarray(shape, np.dtype(dtype), buffer=block.buf)
+    return arrays
+
+
+def release(blocks):
+    for block in blocks:
+        block.close()
+        block.unlink()
+
+
+def attach(feature_specs, pair_specs, result_specs):
+    """Pool initializer: map the parent's shared arrays into this worker."""
+    _FEATURES.update(views(feature_specs, _BLOCKS))
+    _PAIRS.update(views(pair_specs, _BLOCKS))
+    _RESULTS.update(views(result_specs, _BLOCKS))
+
+
+def score_shard(start, stop):
+    """Score pairs [start, stop) into the shared result arrays."""
+    score, similarities = score_feature_pairs(_FEATURES, _PAIRS['INDEX_1'][start:stop], _PAIRS['INDEX_2'][start:stop])
+    _RESULTS['MATCH_SCORE'][start:stop] = score
+    for field, values in similarities.items():
+        _RESULTS[field][start:stop] = values
+    return stop - start
+
+
+# =============================================================================
+# Sharding
+# =============================================================================
+
+def shard_order(customers, pairs):
+    """Pair order grouping each (COUNTRY_CODE, BLOCKED_ON) shard together, and each pair's shard code."""
+    countries = customers['COUNTRY_CODE'] if 'COUNTRY_CODE' in customers else pd.Series('', index=customers.index)
+    country = pairs['CUSTOMER_ID_1'].map(pd.Series(countries.to_numpy(), index=customers['CUSTOMER_ID'].astype(str)))
+    blocked_on = pairs['BLOCKED_ON'] if 'BLOCKED_ON' in pairs else pd.Series('', index=pairs.index)
+    shards = pd.DataFrame({'COUNTRY_CODE': country.fillna('').to_numpy(), 'BLOCKED_ON': blocked_on.to_numpy()})
+    codes = shards.groupby(['COUNTRY_CODE', 'BLOCKED_ON']).ngroup().to_numpy()
+    return np.argsort(codes, kind='stable'), codes
+
+
+def shard_slices(keys, shard_size=SHARD_SIZE):
+    """(start, stop) slices over sorted shard keys, at most shard_size pairs each."""
+    boundaries = np.flatnonzero(keys[1:] != keys[:-1]) + 1
+    starts = np.concatenate([[0], boundaries])
+    stops = np.concatenate([boundaries, [len(keys)]])
+    return [
+        (offset, min(offset + shard_size, stop))
+        for start, stop in zip(starts, stops)
+        for offset in range(start, stop, shard_size)
+    ]
+
+
+# =============================================================================
+# Scoring
+# =============================================================================
+
+def score_pairs_parallel(customers, pairs, workers=None, shard_size=SHARD_SIZE):
+    """score_pairs() on a pool of `workers` processes (default: one per core)."""
+    workers = workers or os.cpu_count() or 1
+    ids = pd.Index(customers['CUSTOMER_ID'].astype(str))
+    order, codes = shard_order(customers, pairs)
+    pairs = pairs.iloc[order].reset_index(drop=True)
+    keys = codes[order]
+
+    feature_blocks, feature_specs = share(customer_features(customers))
+    pair_blocks, pair_specs = share({
+        'INDEX_1': ids.get_indexer(pairs['CUSTOMER_ID_1'].astype(str)),
+        'INDEX_2': ids.get_indexer(pairs['CUSTOMER_ID_2'].astype(str)),
+    })
+    result_blocks, result_specs = share({
+        name: np.zeros(len(pairs)) for name in ['MATCH_SCORE', *FIELD_WEIGHTS]
+    })
+    try:
+        with ProcessPoolExecutor(workers, initializer=attach,
+                                 initargs=(feature_specs, pair_specs, result_specs)) as pool:
+            slices = shard_slices(keys, shard_size)
+            list(pool.map(score_shard, [start for start, _ in slices], [stop for _, stop in slices]))
+        results = copy_out(result_blocks, result_specs)
+    finally:
+        release(feature_blocks + pair_blocks + result_blocks)
+
+    score = results.pop('MATCH_SCORE')
+    return scored_frame(pairs, score, results)
@@ -0,0 +1,466 @@
+"""
+Set-based SQL scoring: candidate generation inside the warehouse.
+
+Instead of pulling CUSTOMER_NORMALIZED into Python, each blocking pass is one
+MERGE statement. It computes the blocking keys in SQL (SOUNDEX for last
+names) and self-joins CUSTOMER_NORMALIZED on the pass key. Names are scored
+with JAROWINKLER_SIMILARITY, phones by E.164 equality, dates of birth with
+the same day/month-swap and transposed-digit credit, and addresses by word
+overlap with array functions. MATCH_SCORE, MATCH_REASON, PRIORITY and the
+HOUSEHOLD_MATCH flag (see matching.households) are written straight into
+DUPLICATE_CANDIDATES with the same upsert rules as
+matching.candidates.write_candidates. A pair that shares an earlier pass's
+key is left to that pass, so every pair is scored exactly once, and pairs
+already decided in AGENT_DECISIONS are anti-joined away before they are
+scored (see matching.decided). Hub blocks are profiled, logged and split
+by the same secondary keys as in matching.blocking. No customer data leaves
+the warehouse.
+
+Weights, reason phrases and thresholds come from matching.scoring, so
+scores and reasons agree with the Python engine's up to how
+JAROWINKLER_SIMILARITY is computed. It returns whole percentages, which
+moves MATCH_SCORE by at most SCORE_TOLERANCE. Implementations also differ
+on low-similarity names (whether the Winkler prefix bonus applies below
+0.7, how half-transpositions round), which can move a dissimilar name by
+several points; Snowflake's is not reproduced locally.
+
+The same SQL runs on DuckDB for local tests: local_session() supplies
+SOUNDEX, JAROWINKLER_SIMILARITY (matching.scoring's, rounded like
+Snowflake's), the array functions and UUID_STRING under their Snowflake
+names, and loads customers from the Parquet files written by
+benchmarks.synthetic_customers. compare_with_python() checks a local run
+against the Python engine within SCORE_TOLERANCE.
+
+In Snowflake, new customers are normalized first (matching.normalize only
+reads the ones not yet in CUSTOMER_NORMALIZED). After the passes, pairs are
+auto-decided and clusters rebuilt as after matching.candidates.
+
+Usage:
+    python -m matching.pushdown                                # score every pass in Snowflake
+    python -m matching.pushdown --print-sql                    # show the statements
+    python -m matching.pushdown --local synthetic_data         # run on DuckDB against generated Parquet
+    python -m matching.pushdown --local synthetic_data --compare
+"""
+
+import argparse
+import logging
+import time
+
+import numpy as np
+import pandas as pd
+
+from matching.auto_decisions import PRIORITY_CASE, resolve_candidates
+from matching.blocking import BLOCKING_PASSES, HUB_COLUMNS, MAX_BLOCK_SIZE, log_hubs, soundex
+from matching.candidates import CANDIDATE_CHANGED, MIN_CANDIDATE_SCORE
+from matching.clusters import refresh_clusters
+from matching.config import DEFAULTS, threshold
+from matching.decided import FINAL_DECISIONS
+from matching.households import HOUSEHOLD_REASON
+from matching.merge import MERGED_STATUS
+from matching.scoring import (
+    DOB_DAY_MONTH_SWAP, DOB_DIGIT_TRANSPOSITION, FIELD_WEIGHTS, REASON_PHRASES, SIMILAR_ADDRESS, SIMILAR_NAME,
+    encode_strings, jaro_winkler,
+)
+from query_builder import Query, table
+
+# Most MATCH_SCORE can differ from the Python engine's: both name similarities
+# rounded to whole percentages (0.005 each), plus rounding both scores to 2 places
+SCORE_TOLERANCE = (FIELD_WEIGHTS['FIRST_NAME'] + FIELD_WEIGHTS['LAST_NAME']) * 0.005 + 0.01
+
+# Blocking pass -> key expression over keyed CUSTOMER_NORMALIZED columns (see BLOCKING_PASSES)
+PASS_KEYS = {
+    'DOB': "k.DOB",
+    'LAST_NAME': "NULLIF(SOUNDEX(k.LAST_NAME), '')",
+    'PHONE': "NULLIF(REPLACE(k.PHONE, '+', ''), '')",
+    'EMAIL': "NULLIF(REPLACE(SPLIT_PART(SPLIT_PART(k.EMAIL, '@', 1), '+', 1), '.', ''), '')",
+    'POSTCODE': "k.POSTAL_CODE",
+}
+
+# Blocking pass -> secondary key splitting its hub blocks (see blocking.SUB_BLOCK_KEYS)
+SUB_BLOCK_KEYS = {
+    'DOB': "NULLIF(SOUNDEX(k.LAST_NAME), '')",
+    'LAST_NAME': "NULLIF(LOWER(LEFT(TRIM(k.FIRST_NAME), 1)), '')",
+    'PHONE': "NULLIF(LOWER(LEFT(TRIM(k.FIRST_NAME), 1)), '')",
+    'EMAIL': "NULLIF(LOWER(LEFT(TRIM(k.FIRST_NAME), 1)), '')",
+    'POSTCODE': "NULLIF(SOUNDEX(k.LAST_NAME), '')",
+}
+
+
+def transposed(position):
+    """SQL: b's YYYYMMDD digits are a's with digits position and position + 1 swapped."""
+    return (
+        f"(SUBSTR(a.DOB, 1, {position - 1}) || SUBSTR(a.DOB, {position + 1}, 1) || SUBSTR(a.DOB, {position}, 1)"
+        f" || SUBSTR(a.DOB, {position + 2}) = b.DOB)"
+    )
+
+
+# Field -> similarity in [0, 1] for customers a and b
+SIMILARITIES = {
+    'FIRST_NAME': "COALESCE(JAROWINKLER_SIMILARITY(a.FIRST_NAME, b.FIRST_NAME), 0) / 100",
+    'LAST_NAME': "COALESCE(JAROWINKLER_SIMILARITY(a.LAST_NAME, b.LAST_NAME), 0) / 100",
+    'DATE_OF_BIRTH': f"""CASE
+            WHEN a.DOB = b.DOB THEN 1
+            WHEN SUBSTR(a.DOB, 1, 4) || SUBSTR(a.DOB, 7, 2) || SUBSTR(a.DOB, 5, 2) = b.DOB THEN {DOB_DAY_MONTH_SWAP}
+            WHEN {' OR '.join(transposed(position) for position in range(1, 8))} THEN {DOB_DIGIT_TRANSPOSITION}
+            ELSE 0 END""",
+    'PHONE': "CASE WHEN a.PHONE = b.PHONE THEN 1 ELSE 0 END",
+    'EMAIL': "CASE WHEN a.EMAIL = b.EMAIL THEN 1 WHEN a.K_EMAIL = b.K_EMAIL THEN 0.5 ELSE 0 END",
+    'ADDRESS_LINE1': """COALESCE(ARRAY_SIZE(ARRAY_INTERSECTION(a.ADDRESS_TOKENS, b.ADDRESS_TOKENS))
+            / NULLIF(ARRAY_SIZE(a.ADDRESS_TOKENS) + ARRAY_SIZE(b.ADDRESS_TOKENS)
+                     - ARRAY_SIZE(ARRAY_INTERSECTION(a.ADDRESS_TOKENS, b.ADDRESS_TOKENS)), 0), 0)""",
+    'POSTAL_CODE': "CASE WHEN a.POSTAL_CODE = b.POSTAL_CODE THEN 1 ELSE 0 END",
+}
+
+# Conditions choosing each REASON_PHRASES slot's phrase, in the same order (see scoring.reason_codes)
+REASON_CONDITIONS = (
+    ("FIRST_NAME_SIM = 1 AND LAST_NAME_SIM = 1",
+     f"FIRST_NAME_SIM >= {SIMILAR_NAME} AND LAST_NAME_SIM >= {SIMILAR_NAME}",
+     "LAST_NAME_SIM = 1",
+     f"FIRST_NAME_SIM = 1 AND LAST_NAME_SIM < {SIMILAR_NAME}"),
+    ("DATE_OF_BIRTH_SIM = 1", "DATE_OF_BIRTH_SIM > 0"),
+    ("PHONE_SIM = 1",),
+    ("EMAIL_SIM = 1", "EMAIL_SIM > 0"),
+    ("ADDRESS_LINE1_SIM = 1", f"ADDRESS_LINE1_SIM >= {SIMILAR_ADDRESS}"),
+)
+
+
+# =============================================================================
+# Statement generation
+# =============================================================================
+
+def reason_sql():
+    """MATCH_REASON built from the *_SIM columns, phrased like scoring.match_reasons."""
+    slots = []
+    for phrases, conditions in zip(REASON_PHRASES, REASON_CONDITIONS):
+        branches = ' '.join(f"WHEN {condition} THEN '{phrase}, '" for condition, phrase in zip(conditions, phrases))
+        slots.append(f"COALESCE(CASE {branches} END, '')")
+    joined = f"RTRIM({' || '.join(slots)}, ', ')"
+    return (
+        f"COALESCE(NULLIF(UPPER(SUBSTR({joined}, 1, 1)) || SUBSTR({joined}, 2), ''),"
+        " 'Shared blocking key only')"
+    )
+
+
+def household_reason_sql(reason):
+    """SQL: MATCH_REASON of a household pair, phrased like households.household_reason."""
+    return f"'{HOUSEHOLD_REASON} (' || LOWER(SUBSTR({reason}, 1, 1)) || SUBSTR({reason}, 2) || ')'"
+
+
+def normalized_sql():
+    """CTE body: CUSTOMER_NORMALIZED rows of unmerged customers. Binds: merged status."""
+    return f"""
+            SELECT n.CUSTOMER_ID, n.FIRST_NAME, n.LAST_NAME, n.EMAIL, n.PHONE,
+                   REPLACE(CAST(n.DATE_OF_BIRTH AS VARCHAR), '-', '') AS DOB,
+                   ARRAY_DISTINCT(STRTOK_TO_ARRAY(n.ADDRESS_LINE1, ' ')) AS ADDRESS_TOKENS,
+                   n.POSTAL_CODE, n.HOUSEHOLD_ID
+            FROM {table('CUSTOMER_NORMALIZED')} n
+            JOIN {table('CUSTOMERS')} c ON c.CUSTOMER_ID = n.CUSTOMER_ID
+            WHERE c.ACCOUNT_STATUS IS DISTINCT FROM ?"""
+
+
+def hub_sql(name, max_block_size=MAX_BLOCK_SIZE):
+    """Query profiling pass `name`'s hub blocks as HUB_COLUMNS rows. Binds: merged status."""
+    limit = int(max_block_size)
+    return f"""
+    WITH normalized AS ({normalized_sql()}
+    ),
+    sub_blocks AS (
+        SELECT {PASS_KEYS[name]} AS BLOCK_VALUE, {SUB_BLOCK_KEYS[name]} AS SUB_KEY, COUNT(*) AS SIZE
+        FROM normalized k
+        GROUP BY 1, 2
+    )
+    SELECT '{name}' AS PASS, BLOCK_VALUE AS VALUE, SUM(SIZE) AS CUSTOMERS, COUNT(SUB_KEY) AS SUB_BLOCKS,
+           COALESCE(MAX(CASE WHEN SUB_KEY IS NOT NULL THEN SIZE END), 0) AS LARGEST_SUB_BLOCK,
+           SUM(CASE WHEN SUB_KEY IS NULL OR SIZE > {limit} THEN SIZE ELSE 0 END) AS SKIPPED
+    FROM sub_blocks
+    WHERE BLOCK_VALUE IS NOT NULL
+    GROUP BY BLOCK_VALUE
+    HAVING SUM(SIZE) > {limit}
+    ORDER BY CUSTOMERS DESC
+    """
+
+
+def pass_sql(name, passes=None, max_block_size=MAX_BLOCK_SIZE):
+    """MERGE statement scoring the pairs that share pass `name`'s key.
+
+    Blocks of more than max_block_size customers are split by the pass's
+    SUB_BLOCK_KEYS key, and sub-blocks still that big are skipped. A pair is
+    left to an earlier pass only if that pass's (sub-)block really held it.
+
+    Binds: merged status, the FINAL_DECISIONS, HIGH and MEDIUM thresholds,
+    minimum score.
+    """
+    passes = passes or list(BLOCKING_PASSES)
+    earlier = passes[:passes.index(name)]
+    limit = int(max_block_size)
+    keys = ',\n            '.join(f"{sql} AS K_{key}" for key, sql in PASS_KEYS.items())
+    sub_keys = ',\n            '.join(f"{SUB_BLOCK_KEYS[key]} AS S_{key}" for key in [*earlier, name])
+    block_keys = ',\n                   '.join(
+        f"CASE WHEN COUNT(K_{key}) OVER (PARTITION BY K_{key}) > {limit} THEN K_{key} || '|' || S_{key}"
+        f" ELSE K_{key} END AS B_{key}"
+        for key in [*earlier, name]
+    )
+    block_sizes = ',\n                   '.join(
+        f"COUNT(B_{key}) OVER (PARTITION BY B_{key}) AS N_{key}" for key in [*earlier, name]
+    )
+    left_to_earlier = ''.join(
+        f"\n              AND NOT COALESCE(a.B_{other} = b.B_{other} AND a.N_{other} <= {limit}, FALSE)"
+        for other in earlier
+    )
+    similarities = ',\n            '.join(f"{sql} AS {field}_SIM" for field, sql in SIMILARITIES.items())
+    score = ' + '.join(f"{weight} * {field}_SIM" for field, weight in FIELD_WEIGHTS.items())
+    return f"""
+    MERGE INTO {table('DUPLICATE_CANDIDATES')} dc
+    USING (
+        WITH normalized AS ({normalized_sql()}
+        ),
+        decided AS (
+            SELECT DISTINCT dc.CUSTOMER_ID_1, dc.CUSTOMER_ID_2
+            FROM {table('AGENT_DECISIONS')} ad
+            JOIN {table('DUPLICATE_CANDIDATES')} dc ON dc.CANDIDATE_ID = ad.CANDIDATE_ID
+            WHERE ad.DECISION IN ({', '.join('?' for _ in FINAL_DECISIONS)})
+        ),
+        keyed AS (
+            SELECT k.*,
+            {keys},
+            {sub_keys}
+            FROM normalized k
+        ),
+        blocked AS (
+            SELECT keyed.*,
+                   {block_keys}
+            FROM keyed
+        ),
+        blocks AS (
+            SELECT blocked.*,
+                   {block_sizes}
+            FROM blocked
+        ),
+        compared AS (
+            SELECT a.CUSTOMER_ID AS CUSTOMER_ID_1, b.CUSTOMER_ID AS CUSTOMER_ID_2,
+                   COALESCE(a.HOUSEHOLD_ID = b.HOUSEHOLD_ID, FALSE) AS SAME_HOUSEHOLD,
+            {similarities}
+            FROM blocks a
+            JOIN blocks b ON a.B_{name} = b.B_{name} AND a.CUSTOMER_ID < b.CUSTOMER_ID AND a.N_{name} <= {limit}
+            LEFT JOIN decided d ON d.CUSTOMER_ID_1 = a.CUSTOMER_ID AND d.CUSTOMER_ID_2 = b.CUSTOMER_ID
+            WHERE d.CUSTOMER_ID_1 IS NULL{left_to_earlier}
+        ),
+        scored AS (
+            SELECT compared.*, ROUND({score}, 2) AS MATCH_SCORE,
+                   {reason_sql()} AS REASON,
+                   SAME_HOUSEHOLD AND FIRST_NAME_SIM < {SIMILAR_NAME} AND DATE_OF_BIRTH_SIM = 0 AS HOUSEHOLD_MATCH
+            FROM compared
+        )
+        SELECT CUSTOMER_ID_1, CUSTOMER_ID_2, MATCH_SCORE,
+               CASE WHEN HOUSEHOLD_MATCH THEN {household_reason_sql('REASON')} ELSE REASON END AS MATCH_REASON,
+               {PRIORITY_CASE} AS PRIORITY,
+               HOUSEHOLD_MATCH
+        FROM scored
+        WHERE MATCH_SCORE >= ?
+    ) s
+    ON dc.CUSTOMER_ID_1 = s.CUSTOMER_ID_1 AND dc.CUSTOMER_ID_2 = s.CUSTOMER_ID_2
+    WHEN MATCHED AND dc.STATUS = 'PENDING' AND {CANDIDATE_CHANGED} THEN UPDATE SET
+        MATCH_SCORE = s.MATCH_SCORE,
+        MATCH_REASON = s.MATCH_REASON,
+        PRIORITY = s.PRIORITY,
+        HOUSEHOLD_MATCH = s.HOUSEHOLD_MATCH
+    WHEN NOT MATCHED THEN INSERT
+        (CANDIDATE_ID, CUSTOMER_ID_1, CUSTOMER_ID_2, MATCH_SCORE, MATCH_REASON, STATUS, PRIORITY, HOUSEHOLD_MATCH,
+         CREATED_DATE)
+    VALUES
+        (UUID_STRING(), s.CUSTOMER_ID_1, s.CUSTOMER_ID_2, s.MATCH_SCORE, s.MATCH_REASON, 'PENDING', s.PRIORITY,
+         s.HOUSEHOLD_MATCH, CURRENT_TIMESTAMP)
+    """
+
+
+def hub_profile(session, passes=None, max_block_size=MAX_BLOCK_SIZE):
+    """Hub blocks of every pass, like blocking.hub_blocks."""
+    passes = passes or list(BLOCKING_PASSES)
+    frames = [
+        Query(hub_sql(name, max_block_size), [MERGED_STATUS]).execute(session).to_pandas() for name in passes
+    ]
+    return pd.concat(frames, ignore_index=True)[HUB_COLUMNS]
+
+
+def run_passes(session, passes=None, min_score=MIN_CANDIDATE_SCORE,
+               high_priority=DEFAULTS['HIGH_PRIORITY_THRESHOLD'],
+               medium_priority=DEFAULTS['MEDIUM_PRIORITY_THRESHOLD'], max_block_size=MAX_BLOCK_SIZE):
+    """Log the hub blocks, then run one MERGE per blocking pass. Returns {pass: rows merged}."""
+    passes = passes or list(BLOCKING_PASSES)
+    log_hubs(hub_profile(session, passes, max_block_size), max_block_size)
+    merged = {}
+    for name in passes:
+        params = [MERGED_STATUS, *FINAL_DECISIONS, high_priority, medium_priority, min_score]
+        rows = Query(pass_sql(name, passes, max_block_size), params).execute(session).collect()
+        merged[name] = sum(int(value) for value in rows[0])
+    return merged
+
+
+def match_in_warehouse(session, min_score=MIN_CANDIDATE_SCORE, max_block_size=MAX_BLOCK_SIZE):
+    """Score every pass in Snowflake with the configured priority bands, then refresh the rollups."""
+    merged = run_passes(
+        session, min_score=min_score,
+        high_priority=threshold(session, 'HIGH_PRIORITY_THRESHOLD'),
+        medium_priority=threshold(session, 'MEDIUM_PRIORITY_THRESHOLD'),
+        max_block_size=max_block_size,
+    )
+    session.sql(f"CALL {table('REFRESH_DASHBOARD_ROLLUPS')}()").collect()
+    return merged
+
+
+# =============================================================================
+# DuckDB stand-in
+# =============================================================================
+
+class LocalResult:
+    def __init__(self, relation):
+        self.relation = relation
+
+    def collect(self):
+        return self.relation.fetchall()
+
+    def to_pandas(self):
+        return self.relation.df()
+
+
+class LocalSession:
+    """The slice of a Snowpark session the matching SQL uses, backed by DuckDB."""
+
+    def __init__(self, connection):
+        self.connection = connection
+
+    def sql(self, query, params=None):
+        return LocalResult(self.connection.execute(query, params or []))
+
+
+def local_jarowinkler_similarity(names1, names2):
+    """JAROWINKLER_SIMILARITY for DuckDB: matching.scoring's Jaro-Winkler as a whole percentage."""
+    import pyarrow as pa
+
+    codes1, lengths1 = encode_strings(names1.to_pylist())
+    codes2, lengths2 = encode_strings(names2.to_pylist())
+    # Half up, like SQL ROUND
+    return pa.array(np.floor(jaro_winkler(codes1, lengths1, codes2, lengths2) * 100 + 0.5))
+
+
+def local_session(customers, normalized):
+    """In-memory DuckDB with CUSTOMERS, CUSTOMER_NORMALIZED and empty DUPLICATE_CANDIDATES and AGENT_DECISIONS."""
+    import duckdb
+
+    connection = duckdb.connect()
+    database, schema = table('').rstrip('.').split('.')
+    connection.execute(f"ATTACH ':memory:' AS {database}")
+    connection.execute(f"CREATE SCHEMA {database}.{schema}")
+    connection.create_function('SOUNDEX', soundex, ['VARCHAR'], 'VARCHAR')
+    connection.create_function(
+        'JAROWINKLER_SIMILARITY', local_jarowinkler_similarity, ['VARCHAR', 'VARCHAR'], 'DOUBLE', type='arrow'
+    )
+    connection.execute("CREATE MACRO STRTOK_TO_ARRAY(text, delimiter) AS string_split(text, delimiter)")
+    connection.execute("CREATE MACRO ARRAY_DISTINCT(list) AS list_distinct(list)")
+    connection.execute("CREATE MACRO ARRAY_INTERSECTION(list1, list2) AS list_intersect(list1, list2)")
+    connection.execute("CREATE MACRO ARRAY_SIZE(list) AS len(list)")
+    connection.execute("CREATE MACRO UUID_STRING() AS CAST(uuid() AS VARCHAR)")
+    for name, frame in [('CUSTOMERS', customers), ('CUSTOMER_NORMALIZED', normalized)]:
+        connection.register('frame', frame)
+        connection.execute(f"CREATE TABLE {table(name)} AS SELECT * FROM frame")
+        connection.unregister('frame')
+    connection.execute(f"""
+    CREATE TABLE {table('DUPLICATE_CANDIDATES')} (
+        CANDIDATE_ID VARCHAR PRIMARY KEY, CUSTOMER_ID_1 VARCHAR NOT NULL, CUSTOMER_ID_2 VARCHAR NOT NULL,
+        MATCH_SCORE DECIMAL(5,2), MATCH_REASON VARCHAR, STATUS VARCHAR DEFAULT 'PENDING',
+        PRIORITY VARCHAR DEFAULT 'MEDIUM', HOUSEHOLD_MATCH BOOLEAN DEFAULT FALSE,
+        CREATED_DATE TIMESTAMP DEFAULT CURRENT_TIMESTAMP, UNIQUE (CUSTOMER_ID_1, CUSTOMER_ID_2)
+    )""")
+    connection.execute(f"""
+    CREATE TABLE {table('AGENT_DECISIONS')} (
+        DECISION_ID VARCHAR PRIMARY KEY, CANDIDATE_ID VARCHAR NOT NULL, AGENT_NAME VARCHAR NOT NULL,
+        DECISION VARCHAR NOT NULL, DECISION_REASON VARCHAR, NOTES VARCHAR,
+        DECISION_TIMESTAMP TIMESTAMP DEFAULT CURRENT_TIMESTAMP, SESSION_ID VARCHAR
+    )""")
+    return LocalSession(connection)
+
+
+def compare_with_python(session, normalized, min_score=MIN_CANDIDATE_SCORE, max_block_size=MAX_BLOCK_SIZE):
+    """Summary of how the SQL candidates line up with matching.candidates on the same customers.
+
+    Raises ValueError if a score in both differs by more than SCORE_TOLERANCE,
+    or a pair found by only one side scored further than that from min_score.
+    """
+    from matching.candidates import generate_candidates
+
+    python = generate_candidates(normalized, min_score=min_score, max_block_size=max_block_size)
+    python = python.set_index(['CUSTOMER_ID_1', 'CUSTOMER_ID_2'])
+    sql = session.sql(
+        f"SELECT CUSTOMER_ID_1, CUSTOMER_ID_2, MATCH_SCORE, PRIORITY, HOUSEHOLD_MATCH"
+        f" FROM {table('DUPLICATE_CANDIDATES')}"
+    ).to_pandas().set_index(['CUSTOMER_ID_1', 'CUSTOMER_ID_2'])
+    sql['MATCH_SCORE'] = sql['MATCH_SCORE'].astype(float)
+    both = python.join(sql, how='inner', lsuffix='_PY', rsuffix='_SQL')
+    difference = (both['MATCH_SCORE_PY'] - both['MATCH_SCORE_SQL']).abs().round(2)
+    # A pair only one side kept must have scored within the tolerance of the cut-off
+    one_sided = pd.concat([
+        python.loc[python.index.difference(sql.index), 'MATCH_SCORE'],
+        sql.loc[sql.index.difference(python.index), 'MATCH_SCORE'],
+    ])
+    summary = (
+        f"python {len(python):,} pairs, sql {len(sql):,} pairs, {len(both):,} in both; "
+        f"score difference median {difference.median():.2f}, max {difference.max():.2f} "
+        f"(tolerance {SCORE_TOLERANCE:.3f}); "
+        f"same priority {(both['PRIORITY_PY'] == both['PRIORITY_SQL']).mean():.1%}, "
+        f"same household flag {(both['HOUSEHOLD_MATCH_PY'] == both['HOUSEHOLD_MATCH_SQL']).mean():.1%}"
+    )
+    if (difference > SCORE_TOLERANCE).any() or (one_sided >= min_score + SCORE_TOLERANCE).any():
+        raise ValueError(f"SQL scores disagree with the Python engine beyond SCORE_TOLERANCE: {summary}")
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--min-score', type=float, default=MIN_CANDIDATE_SCORE)
+    parser.add_argument('--print-sql', action='store_true', help="print each pass's statement and exit")
+    parser.add_argument('--local', metavar='DIR', help="run on DuckDB against customers_*.parquet in DIR")
+    parser.add_argument('--compare', action='store_true', help="with --local, compare with the Python engine")
+    parser.add_argument('--max-block-size', type=int, default=MAX_BLOCK_SIZE,
+                        help="split blocks with more customers than this by a secondary key")
+    args = parser.parse_args()
+    logging.basicConfig(format='%(levelname)s %(name)s: %(message)s')
+
+    if args.print_sql:
+        for name in BLOCKING_PASSES:
+            print(f"-- {name}{pass_sql(name, max_block_size=args.max_block_size)};")
+        return
+
+    if args.local:
+        import duckdb
+
+        from matching.normalize import normalize_customers
+
+        customers = duckdb.sql(f"SELECT * FROM read_parquet('{args.local}/customers_*.parquet')").df()
+        normalized = normalize_customers(customers)
+        session = local_session(customers, normalized)
+        start = time.perf_counter()
+        merged = run_passes(session, min_score=args.min_score, max_block_size=args.max_block_size)
+    else:
+        from matching.normalize import refresh_normalized
+        from matching.warehouse import connect
+
+        session = connect()
+        refresh_normalized(session)
+        start = time.perf_counter()
+        merged = match_in_warehouse(session, args.min_score, args.max_block_size)
+
+    for name, rows in merged.items():
+        print(f"{name:<10} {rows:>12,} rows merged")
+    print(f"{sum(merged.values()):,} rows merged into DUPLICATE_CANDIDATES in {time.perf_counter() - start:.2f}s")
+    if args.local:
+        if args.compare:
+            print(compare_with_python(session, normalized, args.min_score, args.max_block_size))
+        return
+    auto_matched, auto_rejected, reprioritized = resolve_candidates(session)
+    print(f"{auto_matched} pairs auto-matched, {auto_rejected} household pairs auto-rejected, "
+          f"{reprioritized} priorities updated")
+    print(f"{len(refresh_clusters(session))} clusters rebuilt")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,293 @@
+"""
+Pair scoring: turns blocked customer pairs into MATCH_SCORE and MATCH_REASON.
+
+Scoring is vectorized with NumPy. Each customer is encoded once into feature
+arrays (fixed-width code points for names, integer ids for phone/email,
+date digits, address token ids); a batch of pairs is then scored by gathering
+both sides' rows and comparing whole arrays at a time, with no per-pair
+Python loop.
+
+Only identity fields from the compare view's field list contribute (name,
+DOB, phone, email, address, postcode). Account status/type, source system,
+dates and balances describe the account rather than the person, so they are
+not evidence either way.
+"""
+
+import re
+
+import numpy as np
+import pandas as pd
+
+from matching.blocking import date_key, email_local_part, phone_digits, text
+
+# Points per field; they sum to 100
+FIELD_WEIGHTS = {
+    'FIRST_NAME': 15,
+    'LAST_NAME': 20,
+    'DATE_OF_BIRTH': 20,
+    'PHONE': 15,
+    'EMAIL': 15,
+    'ADDRESS_LINE1': 12,
+    'POSTAL_CODE': 3,
+}
+
+# Jaro-Winkler at or above which a name counts as "similar"
+SIMILAR_NAME = 0.9
+# Address token overlap (Jaccard) at or above which addresses are "similar"
+SIMILAR_ADDRESS = 0.5
+
+# Partial credit for near-miss dates of birth
+DOB_DAY_MONTH_SWAP = 0.8
+DOB_DIGIT_TRANSPOSITION = 0.7
+
+MAX_NAME_LENGTH = 32
+MAX_ADDRESS_TOKENS = 8
+
+
+# =============================================================================
+# Per-customer encoding
+# =============================================================================
+
+def encode_strings(values, width=MAX_NAME_LENGTH):
+    """Fixed-width uint32 code points (0-padded) and lengths for a string column."""
+    strings = np.array([text(value).strip().lower()[:width] for value in values], dtype=f'<U{width}')
+    codes = strings.view(np.uint32).reshape(len(strings), width)
+    lengths = np.char.str_len(strings).astype(np.int32)
+    # Trim unused trailing columns so the comparison loops stay short
+    used = max(int(lengths.max(initial=0)), 1)
+    return np.ascontiguousarray(codes[:, :used]), lengths
+
+
+def factorize(values):
+    """Integer id per distinct value, -1 for missing."""
+    codes, _ = pd.factorize(pd.Series(list(values), dtype=object), use_na_sentinel=True)
+    return codes.astype(np.int64)
+
+
+def encode_dates(values):
+    """(n, 8) YYYYMMDD digit codes and a validity mask."""
+    keys = [(date_key(value) or '').replace('-', '') for value in values]
+    digits = np.array(keys, dtype='<U8').view(np.uint32).reshape(len(keys), 8)
+    return np.ascontiguousarray(digits), np.array([len(key) == 8 for key in keys], dtype=bool)
+
+
+def encode_address_tokens(values, max_tokens=MAX_ADDRESS_TOKENS):
+    """(n, max_tokens) ids of each address's distinct word tokens, -1 padded."""
+    vocabulary = {}
+    tokens = np.full((len(values), max_tokens), -1, dtype=np.int64)
+    for row, value in enumerate(values):
+        words = sorted(set(re.findall(r'[a-z0-9]+', text(value).lower())))[:max_tokens]
+        for column, word in enumerate(words):
+            tokens[row, column] = vocabulary.setdefault(word, len(vocabulary))
+    return tokens
+
+
+def customer_features(customers):
+    """Encode every customer once into the arrays the pair scorer reads."""
+    first_codes, first_lengths = encode_strings(customers['FIRST_NAME'])
+    last_codes, last_lengths = encode_strings(customers['LAST_NAME'])
+    dob_digits, dob_valid = encode_dates(customers['DATE_OF_BIRTH'])
+    emails = [text(value).strip().lower() or None for value in customers['EMAIL']]
+    return {
+        'FIRST_NAME': first_codes,
+        'FIRST_NAME_LENGTH': first_lengths,
+        'LAST_NAME': last_codes,
+        'LAST_NAME_LENGTH': last_lengths,
+        'DOB': dob_digits,
+        'DOB_VALID': dob_valid,
+        'PHONE': factorize(phone_digits(value) for value in customers['PHONE']),
+        'EMAIL': factorize(emails),
+        'EMAIL_LOCAL': factorize(email_local_part(value) for value in customers['EMAIL']),
+        'ADDRESS_TOKENS': encode_address_tokens(customers['ADDRESS_LINE1']),
+        'POSTAL_CODE': factorize(text(value).replace(' ', '').upper() or None for value in customers['POSTAL_CODE']),
+    }
+
+
+# =============================================================================
+# Vectorized similarity functions (one row per pair)
+# =============================================================================
+
+def jaro_winkler(codes1, lengths1, codes2, lengths2, prefix_scale=0.1):
+    """Jaro-Winkler similarity for many string pairs at once.
+
+    Follows the textbook greedy matching: each character of the first string,
+    left to right, takes the first unmatched equal character of the second
+    string inside the match window. The loop runs over character positions
+    (at most MAX_NAME_LENGTH), never over pairs.
+    """
+    count = len(lengths1)
+    width = max(codes1.shape[1], codes2.shape[1])
+    codes1 = np.pad(codes1, ((0, 0), (0, width - codes1.shape[1])))
+    codes2 = np.pad(codes2, ((0, 0), (0, width - codes2.shape[1])))
+    positions = np.arange(width)
+
+    window = np.maximum(np.maximum(lengths1, lengths2) // 2 - 1, 0)
+    in_second = positions[None, :] < lengths2[:, None]
+    matched1 = np.zeros((count, width), dtype=bool)
+    matched2 = np.zeros((count, width), dtype=bool)
+    for i in range(width):
+        candidates = (
+            in_second
+            & ~matched2
+            & (np.abs(positions - i)[None, :] <= window[:, None])
+            & (codes2 == codes1[:, i:i + 1])
+            & (i < lengths1)[:, None]
+        )
+        rows = np.flatnonzero(candidates.any(axis=1))
+        matched1[rows, i] = True
+        matched2[rows, candidates[rows].argmax(axis=1)] = True
+
+    matches = matched1.sum(axis=1)
+    # Matched characters in order on each side; half the mismatches are transpositions
+    order1 = np.argsort(~matched1, axis=1, kind='stable')
+    order2 = np.argsort(~matched2, axis=1, kind='stable')
+    sequence1 = np.take_along_axis(codes1, order1, axis=1)
+    sequence2 = np.take_along_axis(codes2, order2, axis=1)
+    transpositions = ((sequence1 != sequence2) & (positions[None, :] < matches[:, None])).sum(axis=1) / 2
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        jaro = np.where(
+            matches > 0,
+            (matches / lengths1 + matches / lengths2 + (matches - transpositions) / matches) / 3,
+            0.0,
+        )
+
+    prefix_width = min(4, width)
+    common = np.minimum(lengths1, lengths2)
+    same_prefix = (codes1[:, :prefix_width] == codes2[:, :prefix_width]) & (positions[:prefix_width][None, :] < common[:, None])
+    prefix = np.cumprod(same_prefix, axis=1).sum(axis=1)
+    return jaro + prefix * prefix_scale * (1 - jaro)
+
+
+def ids_equal(ids1, ids2):
+    """Equality of factorized values; missing (-1) never matches."""
+    return (ids1 == ids2) & (ids1 >= 0)
+
+
+def dob_similarity(digits1, valid1, digits2, valid2):
+    """1 for the same date, partial credit for swapped day/month or one transposed digit."""
+    both = valid1 & valid2
+    same = (digits1 == digits2).all(axis=1)
+    # YYYY MM DD -> YYYY DD MM
+    swapped = np.concatenate([digits2[:, :4], digits2[:, 6:8], digits2[:, 4:6]], axis=1)
+    day_month_swap = (digits1 == swapped).all(axis=1)
+    differs = digits1 != digits2
+    adjacent = (
+        differs[:, :-1] & differs[:, 1:]
+        & (digits1[:, :-1] == digits2[:, 1:])
+        & (digits1[:, 1:] == digits2[:, :-1])
+    ).any(axis=1)
+    transposed = adjacent & (differs.sum(axis=1) == 2)
+    similarity = np.select(
+        [same, day_month_swap, transposed],
+        [1.0, DOB_DAY_MONTH_SWAP, DOB_DIGIT_TRANSPOSITION],
+        default=0.0,
+    )
+    return np.where(both, similarity, 0.0)
+
+
+def token_overlap(tokens1, tokens2):
+    """Jaccard overlap of two sets of token ids (-1 = padding)."""
+    present1 = tokens1 >= 0
+    present2 = tokens2 >= 0
+    shared = ((tokens1[:, :, None] == tokens2[:, None, :]) & present1[:, :, None]).any(axis=2).sum(axis=1)
+    union = present1.sum(axis=1) + present2.sum(axis=1) - shared
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.where(union > 0, shared / union, 0.0)
+
+
+# =============================================================================
+# Pair scoring
+# =============================================================================
+
+def field_similarities(features, index1, index2):
+    """Per-field similarity in [0, 1] for pairs given as customer row indexes."""
+    f, i, j = features, index1, index2
+    same_email = ids_equal(f['EMAIL'][i], f['EMAIL'][j])
+    same_mailbox = ids_equal(f['EMAIL_LOCAL'][i], f['EMAIL_LOCAL'][j])
+    return {
+        'FIRST_NAME': jaro_winkler(f['FIRST_NAME'][i], f['FIRST_NAME_LENGTH'][i], f['FIRST_NAME'][j], f['FIRST_NAME_LENGTH'][j]),
+        'LAST_NAME': jaro_winkler(f['LAST_NAME'][i], f['LAST_NAME_LENGTH'][i], f['LAST_NAME'][j], f['LAST_NAME_LENGTH'][j]),
+        'DATE_OF_BIRTH': dob_similarity(f['DOB'][i], f['DOB_VALID'][i], f['DOB'][j], f['DOB_VALID'][j]),
+        'PHONE': ids_equal(f['PHONE'][i], f['PHONE'][j]).astype(float),
+        'EMAIL': np.where(same_email, 1.0, np.where(same_mailbox, 0.5, 0.0)),
+        'ADDRESS_LINE1': token_overlap(f['ADDRESS_TOKENS'][i], f['ADDRESS_TOKENS'][j]),
+        'POSTAL_CODE': ids_equal(f['POSTAL_CODE'][i], f['POSTAL_CODE'][j]).astype(float),
+    }
+
+
+# Reason slots in display order; each slot picks at most one phrase
+REASON_PHRASES = (
+    ('exact name match', 'similar name', 'same last name', 'same first name, different last name'),
+    ('same DOB', 'DOB near match (possible typo)'),
+    ('phone number match after normalization',),
+    ('same email', 'same email name'),
+    ('same address', 'similar address'),
+)
+
+
+def reason_codes(similarities):
+    """(pairs, slots) array of 1-based phrase choices per REASON_PHRASES slot, 0 = none."""
+    first, last = similarities['FIRST_NAME'], similarities['LAST_NAME']
+    dob, email, address = similarities['DATE_OF_BIRTH'], similarities['EMAIL'], similarities['ADDRESS_LINE1']
+    slots = [
+        [(first == 1) & (last == 1), (first >= SIMILAR_NAME) & (last >= SIMILAR_NAME), last == 1,
+         (first == 1) & (last < SIMILAR_NAME)],
+        [dob == 1, dob > 0],
+        [similarities['PHONE'] == 1],
+        [email == 1, email > 0],
+        [address == 1, address >= SIMILAR_ADDRESS],
+    ]
+    return np.stack([
+        np.select(conditions, range(1, len(conditions) + 1), default=0) for conditions in slots
+    ], axis=1)
+
+
+def reason_text(codes):
+    reason = ', '.join(
+        phrases[code - 1] for phrases, code in zip(REASON_PHRASES, codes) if code
+    ) or 'shared blocking key only'
+    return reason[0].upper() + reason[1:]
+
+
+def match_reasons(similarities):
+    """Agent-facing MATCH_REASON built from the same similarities as the score.
+
+    Phrases always appear in the same order (name, DOB, phone, email, address)
+    so reasons read consistently across the queue. Only a few dozen phrase
+    combinations occur, so each is rendered once and broadcast to its pairs.
+    """
+    codes = reason_codes(similarities)
+    if not len(codes):
+        return []
+    # Pack each row's slot choices into one integer (3 bits per slot)
+    packed = (codes << (3 * np.arange(codes.shape[1]))).sum(axis=1)
+    _, first_rows, inverse = np.unique(packed, return_index=True, return_inverse=True)
+    texts = np.array([reason_text(codes[row]) for row in first_rows], dtype=object)
+    return texts[inverse].tolist()
+
+
+def score_feature_pairs(features, index1, index2):
+    """MATCH_SCORE array and per-field similarities for index-addressed pairs."""
+    similarities = field_similarities(features, index1, index2)
+    score = sum(FIELD_WEIGHTS[field] * values for field, values in similarities.items())
+    return np.round(score, 2), similarities
+
+
+def score_pairs(customers, pairs):
+    """Add MATCH_SCORE, MATCH_REASON and per-field *_SIM columns to a pair frame."""
+    ids = pd.Index(customers['CUSTOMER_ID'].astype(str))
+    index1 = ids.get_indexer(pairs['CUSTOMER_ID_1'].astype(str))
+    index2 = ids.get_indexer(pairs['CUSTOMER_ID_2'].astype(str))
+    score, similarities = score_feature_pairs(customer_features(customers), index1, index2)
+    return scored_frame(pairs, score, similarities)
+
+
+def scored_frame(pairs, score, similarities):
+    """`pairs` with MATCH_SCORE, MATCH_REASON and the *_SIM columns added."""
+    scored = pairs.copy()
+    scored['MATCH_SCORE'] = score
+    scored['MATCH_REASON'] = match_reasons(similarities)
+    for field, values in similarities.items():
+        scored[f'{field}_SIM'] = np.round(values, 3)
+    return scored
@@ -0,0 +1,37 @@
+"""
+Snowflake access for the batch matching jobs.
+
+The Streamlit apps get their session from Streamlit in Snowflake; batch jobs
+run outside it and connect with the same [snowflake] credentials used for
+local testing (.streamlit/secrets.toml).
+"""
+
+import tomllib
+
+from query_builder import SCHEMA
+
+SECRETS_PATH = '.streamlit/secrets.toml'
+
+
+def connect(secrets_path=SECRETS_PATH):
+    """Open a Snowpark session on the app database and schema."""
+    from snowflake.snowpark import Session
+
+    with open(secrets_path, 'rb') as secrets_file:
+        params = dict(tomllib.load(secrets_file)['snowflake'])
+    database, schema = SCHEMA.split('.')
+    params.setdefault('database', database)
+    params.setdefault('schema', schema)
+    return Session.builder.configs(params).create()
+
+
+def stage_frame(session, frame, name):
+    """Upload a DataFrame into a temporary table so it can be MERGEd set-based."""
+    session.write_pandas(
+        frame.reset_index(drop=True),
+        name,
+        auto_create_table=True,
+        overwrite=True,
+        table_type='temporary',
+    )
+    return name
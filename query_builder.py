@@ -0,0 +1,214 @@
+"""
+Parameterized SQL builder for the Dedupe Workflow apps.
+
+Every value goes to Snowflake as a bind variable (``?``) instead of being
+formatted into the statement text. Queries with the same shape therefore
+produce identical text, which lets the warehouse result cache and compiled
+plans be reused across agents, and user input can never change the SQL.
+
+Usage:
+    query = Query(f"SELECT * FROM {table('CUSTOMERS')} WHERE 1=1")
+    query.where_equals("CUSTOMER_ID", customer_id)
+    rows = query.execute(session).collect()
+"""
+
+SCHEMA = "DEDUPE_WORKFLOW_DB.DEDUPE_SCHEMA"
+
+# Work queue order; seek() continues strictly after a cursor in this order
+QUEUE_ORDER = ("dc.MATCH_SCORE DESC", "dc.CREATED_DATE", "dc.CANDIDATE_ID")
+
+# Cluster list order (clusters with pending pairs first); seek_cluster() pages through it
+CLUSTER_ORDER = ("HAS_PENDING DESC", "MEMBER_COUNT DESC", "POINTS DESC", "CLUSTER_ID")
+
+CUSTOMER_COLUMNS = (
+    "CUSTOMER_ID", "FIRST_NAME", "LAST_NAME", "EMAIL", "PHONE", "DATE_OF_BIRTH",
+    "ADDRESS_LINE1", "ADDRESS_LINE2", "CITY", "STATE", "POSTAL_CODE", "COUNTRY",
+    "ACCOUNT_STATUS", "ACCOUNT_TYPE", "CREATED_DATE", "LAST_ACTIVITY_DATE",
+    "TOTAL_TRANSACTIONS", "ACCOUNT_BALANCE", "SOURCE_SYSTEM",
+)
+
+# CUSTOMER_NORMALIZED: same names as CUSTOMERS, values normalized by matching.normalize,
+# plus the COUNTRY_CODE every country filter and breakdown keys on and the
+# HOUSEHOLD_ID of matching.households
+NORMALIZED_COLUMNS = (
+    "CUSTOMER_ID", "FIRST_NAME", "LAST_NAME", "EMAIL", "PHONE", "DATE_OF_BIRTH",
+    "ADDRESS_LINE1", "ADDRESS_LINE2", "CITY", "POSTAL_CODE", "COUNTRY_CODE", "HOUSEHOLD_ID",
+)
+
+CANDIDATE_COLUMNS = (
+    "CANDIDATE_ID", "CUSTOMER_ID_1", "CUSTOMER_ID_2", "MATCH_SCORE", "MATCH_REASON",
+    "STATUS", "PRIORITY", "CREATED_DATE", "ASSIGNED_TO",
+)
+
+
+def table(name):
+    """Fully qualified name of a table in the app schema."""
+    return f"{SCHEMA}.{name}"
+
+
+class Query:
+    """A SQL statement and its ordered bind parameters.
+
+    The base statement must already contain a WHERE clause (``WHERE 1=1`` if
+    there is no fixed predicate); the where_* methods append ``AND`` terms.
+    """
+
+    def __init__(self, sql, params=None):
+        self.sql = sql
+        self.params = list(params or [])
+
+    def where(self, predicate, *params):
+        """Append a raw predicate whose ``?`` markers match params in order."""
+        self.sql += f" AND {predicate}"
+        self.params.extend(params)
+        return self
+
+    def where_equals(self, column, value):
+        return self.where(f"{column} = ?", value)
+
+    def where_contains(self, columns, value):
+        """Substring match on one column, or on any of several columns."""
+        if isinstance(columns, str):
+            columns = [columns]
+        predicate = " OR ".join(f"{column} LIKE ?" for column in columns)
+        return self.where(f"({predicate})", *([f"%{value}%"] * len(columns)))
+
+    def where_in(self, column, values):
+        values = list(values)
+        if not values:
+            return self.where("1=0")
+        markers = ", ".join("?" * len(values))
+        return self.where(f"{column} IN ({markers})", *values)
+
+    def leased_to(self, agent_name):
+        """Only candidates currently leased to agent_name (see LEASE_CANDIDATES)."""
+        return self.where_equals("dc.ASSIGNED_TO", agent_name).where("dc.LEASE_EXPIRES_AT > CURRENT_TIMESTAMP()")
+
+    def not_leased_to_others(self, agent_name):
+        """Drop candidates currently leased to anyone but agent_name."""
+        return self.where(
+            "(dc.LEASE_EXPIRES_AT IS NULL OR dc.LEASE_EXPIRES_AT <= CURRENT_TIMESTAMP() OR dc.ASSIGNED_TO = ?)",
+            agent_name
+        )
+
+    def seek(self, cursor):
+        """Keyset predicate continuing after a (MATCH_SCORE, CREATED_DATE, CANDIDATE_ID) cursor.
+
+        Matches QUEUE_ORDER: MATCH_SCORE DESC, CREATED_DATE ASC, CANDIDATE_ID ASC.
+        """
+        if cursor is None:
+            return self
+        score, created, candidate_id = cursor
+        return self.where(
+            "(dc.MATCH_SCORE < ?"
+            " OR (dc.MATCH_SCORE = ? AND dc.CREATED_DATE > TO_TIMESTAMP_NTZ(?))"
+            " OR (dc.MATCH_SCORE = ? AND dc.CREATED_DATE = TO_TIMESTAMP_NTZ(?) AND dc.CANDIDATE_ID > ?))",
+            score, score, created, score, created, candidate_id
+        )
+
+    def seek_cluster(self, cursor):
+        """Keyset predicate continuing after a (HAS_PENDING, MEMBER_COUNT, POINTS, CLUSTER_ID) cursor.
+
+        Matches CLUSTER_ORDER; the columns are the cluster list's output names,
+        so the list query must be wrapped before seeking on its aggregates.
+        """
+        if cursor is None:
+            return self
+        has_pending, member_count, points, cluster_id = cursor
+        return self.where(
+            "(HAS_PENDING < ?"
+            " OR (HAS_PENDING = ? AND MEMBER_COUNT < ?)"
+            " OR (HAS_PENDING = ? AND MEMBER_COUNT = ? AND POINTS < ?)"
+            " OR (HAS_PENDING = ? AND MEMBER_COUNT = ? AND POINTS = ? AND CLUSTER_ID > ?))",
+            has_pending, has_pending, member_count, has_pending, member_count, points,
+            has_pending, member_count, points, cluster_id
+        )
+
+    def group_by(self, *columns):
+        self.sql += " GROUP BY " + ", ".join(columns)
+        return self
+
+    def order_by(self, *columns):
+        self.sql += " ORDER BY " + ", ".join(columns)
+        return self
+
+    def limit(self, count):
+        # Kept literal (as an int) so LIMIT never depends on bind support;
+        # callers only pass a handful of distinct page sizes.
+        self.sql += f" LIMIT {int(count)}"
+        return self
+
+    def execute(self, session):
+        """Bind the parameters and return the Snowpark DataFrame."""
+        return session.sql(self.sql, params=self.params)
+
+
+def pair_bundle(candidate_id):
+    """Candidate row plus both customer records as one joined, prefixed row.
+
+    Columns come back as DC__*, C1__* and C2__*; use unprefixed() to split them.
+    SAME__<column> flags whether the two customers agree on each column,
+    comparing CUSTOMER_NORMALIZED values where both customers have them.
+    """
+    return Query(f"""
+    SELECT
+        {prefixed_columns('dc', CANDIDATE_COLUMNS, 'DC__')},
+        {prefixed_columns('c1', CUSTOMER_COLUMNS, 'C1__')},
+        {prefixed_columns('c2', CUSTOMER_COLUMNS, 'C2__')},
+        {same_value_flags()}
+    FROM {table('DUPLICATE_CANDIDATES')} dc
+    JOIN {table('CUSTOMERS')} c1 ON dc.CUSTOMER_ID_1 = c1.CUSTOMER_ID
+    JOIN {table('CUSTOMERS')} c2 ON dc.CUSTOMER_ID_2 = c2.CUSTOMER_ID
+    LEFT JOIN {table('CUSTOMER_NORMALIZED')} n1 ON n1.CUSTOMER_ID = c1.CUSTOMER_ID
+    LEFT JOIN {table('CUSTOMER_NORMALIZED')} n2 ON n2.CUSTOMER_ID = c2.CUSTOMER_ID
+    WHERE 1=1
+    """).where_equals("dc.CANDIDATE_ID", candidate_id)
+
+
+def same_value_flags():
+    """SAME__* select list for pair_bundle(): normalized equality, else raw equality."""
+    flags = []
+    for column in CUSTOMER_COLUMNS:
+        raw = f"EQUAL_NULL(c1.{column}, c2.{column})"
+        if column in NORMALIZED_COLUMNS[1:]:
+            flag = (f"IFF(n1.CUSTOMER_ID IS NULL OR n2.CUSTOMER_ID IS NULL, {raw}, "
+                    f"EQUAL_NULL(n1.{column}, n2.{column}))")
+        else:
+            flag = raw
+        flags.append(f"{flag} AS SAME__{column}")
+    return ",\n        ".join(flags)
+
+
+def country_join(customer_alias, alias):
+    """LEFT JOIN of COUNTRY_CODES onto a CUSTOMERS alias by its folded COUNTRY.
+
+    Works for every customer, including ones the normalize job has not reached;
+    select the code with country_code(alias).
+    """
+    folded = f"TRIM(REGEXP_REPLACE(LOWER({customer_alias}.COUNTRY), '[^a-z0-9]+', ' '))"
+    return f"LEFT JOIN {table('COUNTRY_CODES')} {alias} ON {alias}.COUNTRY_NAME = {folded}"
+
+
+def country_code(alias):
+    """Country code from a country_join() alias, 'Unknown' when unmapped."""
+    return f"COALESCE({alias}.COUNTRY_CODE, 'Unknown')"
+
+
+def call(procedure, *args):
+    """CALL a procedure in the app schema with every argument bound."""
+    markers = ", ".join("?" * len(args))
+    return Query(f"CALL {table(procedure)}({markers})", args)
+
+
+def prefixed_columns(alias, columns, prefix):
+    """Select list that aliases each column with a prefix, e.g. c1.EMAIL AS C1__EMAIL.
+
+    Lets one joined row carry several same-shaped records without name clashes;
+    split them back apart with unprefixed().
+    """
+    return ",\n        ".join(f"{alias}.{column} AS {prefix}{column}" for column in columns)
+
+
+def unprefixed(row, prefix):
+    """Pull the columns carrying a prefix out of a row dict, dropping the prefix."""
+    return {key[len(prefix):]: value for key, value in row.items() if key.startswith(prefix)}
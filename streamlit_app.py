@@ -12,9 +12,12 @@ This app allows customer service agents to:
 import streamlit as st
 from snowflake.snowpark.context import get_active_session
 from snowflake.snowpark.functions import col, count, when, lit, current_timestamp
-from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime
 import uuid
 
+from query_builder import Query, QUEUE_ORDER, call, pair_bundle, table, unprefixed
+
 # =============================================================================
 # Tower Insurance Logo (SVG)
 # =============================================================================
@@ -471,27 +474,82 @@ def get_session():
 
 session = get_session()
 
+def get_prefetch_pool():
+    """This browser session's single worker thread for loading upcoming pairs.
+
+    Kept per session with one worker, so a session never has more than one
+    background query in flight on the Snowpark session, and one agent's
+    prefetches never queue behind another's.
+    """
+    if 'prefetch_pool' not in st.session_state:
+        st.session_state.prefetch_pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix='pair-prefetch')
+    return st.session_state.prefetch_pool
+
 # =============================================================================
 # Helper Functions
 # =============================================================================
+QUEUE_PAGE_SIZES = [10, 25, 50, 100]
+
+# Per-query cache lifetimes in seconds. record_decision() clears the queue and
+# the decided pair's reads; everything else (dashboard metrics, history,
+# consultants) catches up when its TTL runs out.
+METRICS_CACHE_TTL = 60
+QUEUE_CACHE_TTL = 30
+DETAIL_CACHE_TTL = 300
+CONSULTANT_CACHE_TTL = 300
+CACHE_MAX_ENTRIES = 500
+
+# Each agent works from their own lease (LEASE_CANDIDATES): topped up to
+# LEASE_BATCH_SIZE whenever fewer than LEASE_REFILL_AT are left
+LEASE_BATCH_SIZE = 25
+LEASE_REFILL_AT = 5
 
+# How many upcoming candidates to load in the background while reviewing
+PREFETCH_DEPTH = 3
+PREFETCH_WAIT_SECONDS = 10
+
+@st.cache_data(ttl=METRICS_CACHE_TTL, max_entries=CACHE_MAX_ENTRIES, show_spinner=False)
 def get_dashboard_metrics():
     """Get summary metrics for the dashboard."""
-    query = """
+    # Reads the CANDIDATE_STATUS_SUMMARY rollup (kept current by RECORD_DECISION)
+    # instead of scanning DUPLICATE_CANDIDATES.
+    query = f"""
     SELECT 
-        COUNT(*) as total_candidates,
-        SUM(CASE WHEN STATUS = 'PENDING' THEN 1 ELSE 0 END) as pending,
-        SUM(CASE WHEN STATUS = 'MATCHED' THEN 1 ELSE 0 END) as matched,
-        SUM(CASE WHEN STATUS = 'NOT_MATCHED' THEN 1 ELSE 0 END) as not_matched,
-        SUM(CASE WHEN PRIORITY = 'HIGH' AND STATUS = 'PENDING' THEN 1 ELSE 0 END) as high_priority_pending,
-        AVG(MATCH_SCORE) as avg_match_score
-    FROM DEDUPE_WORKFLOW_DB.DEDUPE_SCHEMA.DUPLICATE_CANDIDATES
+        COALESCE(SUM(CANDIDATE_COUNT), 0) as total_candidates,
+        COALESCE(SUM(IFF(STATUS = 'PENDING', CANDIDATE_COUNT, 0)), 0) as pending,
+        COALESCE(SUM(IFF(STATUS = 'MATCHED', CANDIDATE_COUNT, 0)), 0) as matched,
+        COALESCE(SUM(IFF(STATUS = 'NOT_MATCHED', CANDIDATE_COUNT, 0)), 0) as not_matched,
+        COALESCE(SUM(IFF(PRIORITY = 'HIGH' AND STATUS = 'PENDING', CANDIDATE_COUNT, 0)), 0) as high_priority_pending,
+        SUM(MATCH_SCORE_SUM) / NULLIF(SUM(CANDIDATE_COUNT), 0) as avg_match_score
+    FROM {table('CANDIDATE_STATUS_SUMMARY')}
     """
-    return session.sql(query).collect()[0]
+    return session.sql(query).collect()[0].as_dict()
 
-def get_pending_candidates(priority_filter=None, sort_by='MATCH_SCORE'):
-    """Get list of pending duplicate candidates."""
-    query = """
+def page_cursor(row):
+    """Cursor pointing just past the given queue row."""
+    return (float(row['MATCH_SCORE']), str(row['CREATED_DATE']), row['CANDIDATE_ID'])
+
+@st.cache_data(ttl=QUEUE_CACHE_TTL, max_entries=CACHE_MAX_ENTRIES, show_spinner=False)
+def count_pending_candidates(agent_name, priority_filter=None):
+    """Count the agent's leased pending candidates without joining customer records."""
+    query = Query(f"""
+    SELECT COUNT(*) as PENDING_COUNT
+    FROM {table('DUPLICATE_CANDIDATES')} dc
+    WHERE dc.STATUS = 'PENDING'
+    """).leased_to(agent_name)
+    if priority_filter:
+        query.where_equals("dc.PRIORITY", priority_filter)
+    
+    return int(query.execute(session).collect()[0]['PENDING_COUNT'])
+
+@st.cache_data(ttl=QUEUE_CACHE_TTL, max_entries=CACHE_MAX_ENTRIES, show_spinner=False)
+def get_pending_candidates(agent_name, priority_filter=None, page_size=25, cursor=None):
+    """Get one page of the pending duplicate candidates leased to the agent.
+
+    Returns up to page_size + 1 rows; the extra row only signals that a next
+    page exists and should not be rendered.
+    """
+    query = Query(f"""
     SELECT 
         dc.CANDIDATE_ID,
         dc.CUSTOMER_ID_1,
@@ -502,62 +560,151 @@ def get_pending_candidates(priority_filter=None, sort_by='MATCH_SCORE'):
         dc.CREATED_DATE,
         c1.FIRST_NAME || ' ' || c1.LAST_NAME as NAME_1,
         c2.FIRST_NAME || ' ' || c2.LAST_NAME as NAME_2
-    FROM DEDUPE_WORKFLOW_DB.DEDUPE_SCHEMA.DUPLICATE_CANDIDATES dc
-    JOIN DEDUPE_WORKFLOW_DB.DEDUPE_SCHEMA.CUSTOMERS c1 ON dc.CUSTOMER_ID_1 = c1.CUSTOMER_ID
-    JOIN DEDUPE_WORKFLOW_DB.DEDUPE_SCHEMA.CUSTOMERS c2 ON dc.CUSTOMER_ID_2 = c2.CUSTOMER_ID
+    FROM {table('DUPLICATE_CANDIDATES')} dc
+    JOIN {table('CUSTOMERS')} c1 ON dc.CUSTOMER_ID_1 = c1.CUSTOMER_ID
+    JOIN {table('CUSTOMERS')} c2 ON dc.CUSTOMER_ID_2 = c2.CUSTOMER_ID
     WHERE dc.STATUS = 'PENDING'
-    """
+    """).leased_to(agent_name)
     if priority_filter:
-        query += f" AND dc.PRIORITY = '{priority_filter}'"
-    
-    query += f" ORDER BY dc.{sort_by} DESC"
+        query.where_equals("dc.PRIORITY", priority_filter)
     
-    return session.sql(query).to_pandas()
+    query.seek(cursor).order_by(*QUEUE_ORDER).limit(page_size + 1)
+    return query.execute(session).to_pandas()
 
-def get_customer_details(customer_id):
-    """Get full customer details."""
-    query = f"""
-    SELECT * FROM DEDUPE_WORKFLOW_DB.DEDUPE_SCHEMA.CUSTOMERS 
-    WHERE CUSTOMER_ID = '{customer_id}'
+def refill_lease(agent_name):
+    """Lease the agent more candidates once their queue runs low.
+
+    Returns how many were newly leased; LEASE_CANDIDATES enforces
+    MAX_DAILY_ASSIGNMENTS and the agent's country assignment. Once it reports
+    the daily cap, the agent is not asked for again until tomorrow.
     """
-    result = session.sql(query).collect()
-    return result[0] if result else None
+    capped = (agent_name, date.today().isoformat())
+    if not agent_name or st.session_state.get('lease_capped') == capped:
+        return 0
+    if count_pending_candidates(agent_name) >= LEASE_REFILL_AT:
+        return 0
+    result = call('LEASE_CANDIDATES', agent_name, LEASE_BATCH_SIZE).execute(session).collect()
+    leased = int(result[0][0])
+    if leased < 0:
+        st.session_state.lease_capped = capped
+        return 0
+    if leased:
+        count_pending_candidates.clear()
+        get_pending_candidates.clear()
+    return leased
 
+def load_pair_bundle(candidate_id):
+    """Get the candidate and both customer records in a single query.
+
+    Returns (candidate, customer1, customer2, same) as dicts, or None if not found;
+    same maps each customer column to whether the two records agree on it.
+    Safe to call from prefetch threads: it touches no Streamlit state.
+    """
+    result = pair_bundle(candidate_id).execute(session).collect()
+    if not result:
+        return None
+    row = result[0].as_dict()
+    return unprefixed(row, 'DC__'), unprefixed(row, 'C1__'), unprefixed(row, 'C2__'), unprefixed(row, 'SAME__')
+
+@st.cache_data(ttl=DETAIL_CACHE_TTL, max_entries=CACHE_MAX_ENTRIES, show_spinner=False)
+def get_pair_bundle(candidate_id):
+    """Cached load_pair_bundle() for the script thread."""
+    return load_pair_bundle(candidate_id)
+
+def prefetch_next_pairs(candidate):
+    """Start loading the pair bundles queued after this candidate.
+
+    Runs while the agent is still reading the current pair, so the next review
+    page renders from memory. Futures live in session state; the worker
+    thread only runs queries.
+    """
+    upcoming = get_pending_candidates(
+        st.session_state.agent_name, page_size=PREFETCH_DEPTH, cursor=page_cursor(candidate)
+    )
+    next_ids = list(upcoming['CANDIDATE_ID'].head(PREFETCH_DEPTH))
+    keep = set(next_ids) | {candidate['CANDIDATE_ID']}
+    
+    prefetched = st.session_state.prefetched_pairs
+    for candidate_id in list(prefetched):
+        if candidate_id not in keep:
+            prefetched.pop(candidate_id).cancel()
+    pool = get_prefetch_pool()
+    for candidate_id in next_ids:
+        if candidate_id not in prefetched:
+            prefetched[candidate_id] = pool.submit(load_pair_bundle, candidate_id)
+    
+    st.session_state.next_candidate = next_ids[0] if next_ids else None
+
+def prefetched_pair_bundle(candidate_id):
+    """Bundle loaded in the background for this candidate, falling back to a query."""
+    future = st.session_state.prefetched_pairs.get(candidate_id)
+    if future is not None:
+        try:
+            bundle = future.result(timeout=PREFETCH_WAIT_SECONDS)
+            if bundle is not None:
+                return bundle
+        except Exception:
+            st.session_state.prefetched_pairs.pop(candidate_id, None)
+    return get_pair_bundle(candidate_id)
+
+@st.cache_data(ttl=DETAIL_CACHE_TTL, max_entries=CACHE_MAX_ENTRIES, show_spinner=False)
 def get_candidate_details(candidate_id):
     """Get duplicate candidate details."""
-    query = f"""
-    SELECT * FROM DEDUPE_WORKFLOW_DB.DEDUPE_SCHEMA.DUPLICATE_CANDIDATES 
-    WHERE CANDIDATE_ID = '{candidate_id}'
+    query = Query(f"SELECT * FROM {table('DUPLICATE_CANDIDATES')} WHERE 1=1")
+    query.where_equals("CANDIDATE_ID", candidate_id)
+    result = query.execute(session).collect()
+    return result[0].as_dict() if result else None
+
+def invalidate_decided(candidate_id):
+    """Drop the cached reads a decision on candidate_id makes stale.
+
+    Any queue page or count may hold the candidate, so those are cleared
+    whole; the pair's own reads, including a bundle prefetched for it, are
+    cleared for this candidate only.
     """
-    result = session.sql(query).collect()
-    return result[0] if result else None
+    count_pending_candidates.clear()
+    get_pending_candidates.clear()
+    get_pair_bundle.clear(candidate_id)
+    get_candidate_details.clear(candidate_id)
+    prefetched = st.session_state.prefetched_pairs.pop(candidate_id, None)
+    if prefetched is not None:
+        prefetched.cancel()
 
 def record_decision(candidate_id, agent_name, decision, reason, notes):
-    """Record agent's decision and update candidate status."""
+    """Record agent's decision and update candidate status in one round trip.
+
+    Returns the new decision id, or None if the candidate was no longer
+    PENDING (another agent decided it first) or is leased to another agent,
+    and nothing was written.
+    """
     decision_id = str(uuid.uuid4())[:36]
     session_id = st.session_state.get('session_id', str(uuid.uuid4())[:36])
     
-    # Insert decision record
-    insert_query = f"""
-    INSERT INTO DEDUPE_WORKFLOW_DB.DEDUPE_SCHEMA.AGENT_DECISIONS 
-    (DECISION_ID, CANDIDATE_ID, AGENT_NAME, DECISION, DECISION_REASON, NOTES, SESSION_ID)
-    VALUES ('{decision_id}', '{candidate_id}', '{agent_name}', '{decision}', '{reason}', '{notes}', '{session_id}')
-    """
-    session.sql(insert_query).collect()
-    
-    # Update candidate status
-    update_query = f"""
-    UPDATE DEDUPE_WORKFLOW_DB.DEDUPE_SCHEMA.DUPLICATE_CANDIDATES 
-    SET STATUS = '{decision}', ASSIGNED_TO = '{agent_name}'
-    WHERE CANDIDATE_ID = '{candidate_id}'
-    """
-    session.sql(update_query).collect()
+    result = call(
+        'RECORD_DECISION',
+        decision_id, candidate_id, agent_name, decision, reason or '', notes or '', session_id
+    ).execute(session).collect()
     
-    return decision_id
+    # Clear even on conflict: our cached view of this candidate was stale
+    invalidate_decided(candidate_id)
+    return decision_id if result[0][0] == 'RECORDED' else None
 
+def conflict_message(candidate_id):
+    """Explain who got to a candidate first after record_decision() lost the race."""
+    current = get_candidate_details(candidate_id)
+    if current is None:
+        return f"{candidate_id} no longer exists; your decision was not recorded."
+    if current['STATUS'] == 'PENDING':
+        return f"{candidate_id} is leased to {current['ASSIGNED_TO']}; your decision was not recorded."
+    return (
+        f"{candidate_id} was already marked {current['STATUS']} by "
+        f"{current['ASSIGNED_TO'] or 'another agent'}; your decision was not recorded."
+    )
+
+@st.cache_data(ttl=QUEUE_CACHE_TTL, max_entries=CACHE_MAX_ENTRIES, show_spinner=False)
 def get_decision_history(limit=50):
     """Get recent decision history."""
-    query = f"""
+    query = Query(f"""
     SELECT 
         ad.DECISION_TIMESTAMP,
         ad.AGENT_NAME,
@@ -567,12 +714,12 @@ def get_decision_history(limit=50):
         dc.CUSTOMER_ID_1,
         dc.CUSTOMER_ID_2,
         dc.MATCH_SCORE
-    FROM DEDUPE_WORKFLOW_DB.DEDUPE_SCHEMA.AGENT_DECISIONS ad
-    JOIN DEDUPE_WORKFLOW_DB.DEDUPE_SCHEMA.DUPLICATE_CANDIDATES dc ON ad.CANDIDATE_ID = dc.CANDIDATE_ID
-    ORDER BY ad.DECISION_TIMESTAMP DESC
-    LIMIT {limit}
-    """
-    return session.sql(query).to_pandas()
+    FROM {table('AGENT_DECISIONS')} ad
+    JOIN {table('DUPLICATE_CANDIDATES')} dc ON ad.CANDIDATE_ID = dc.CANDIDATE_ID
+    WHERE 1=1
+    """)
+    query.order_by("ad.DECISION_TIMESTAMP DESC").limit(limit)
+    return query.execute(session).to_pandas()
 
 def highlight_differences(val1, val2):
     """Return CSS class based on whether values match."""
@@ -580,6 +727,7 @@ def highlight_differences(val1, val2):
         return 'field-diff' if val1 != val2 else ''
     return 'field-match' if str(val1).strip().lower() == str(val2).strip().lower() else 'field-diff'
 
+@st.cache_data(ttl=CONSULTANT_CACHE_TTL, max_entries=CACHE_MAX_ENTRIES, show_spinner=False)
 def get_consultants():
     """Get list of consultants who have made decisions."""
     query = """
@@ -603,6 +751,15 @@ if 'selected_candidate' not in st.session_state:
     st.session_state.selected_candidate = None
 if 'current_view' not in st.session_state:
     st.session_state.current_view = 'dashboard'
+if 'queue_cursors' not in st.session_state:
+    # queue_cursors[i] is the seek cursor that starts page i (None = first page)
+    st.session_state.queue_cursors = [None]
+    st.session_state.queue_page = 0
+    st.session_state.queue_filter_key = None
+if 'prefetched_pairs' not in st.session_state:
+    # candidate_id -> Future of its pair bundle, filled by prefetch_next_pairs()
+    st.session_state.prefetched_pairs = {}
+    st.session_state.next_candidate = None
 
 # =============================================================================
 # Sidebar Navigation - Tower Branded
@@ -769,7 +926,8 @@ if st.session_state.current_view == 'dashboard':
         
         with col1:
             if st.button("▶️ Start High Priority Review", use_container_width=True, type="primary"):
-                pending = get_pending_candidates(priority_filter='HIGH')
+                refill_lease(agent_name)
+                pending = get_pending_candidates(agent_name, priority_filter='HIGH', page_size=1)
                 if len(pending) > 0:
                     st.session_state.selected_candidate = pending.iloc[0]['CANDIDATE_ID']
                     st.session_state.current_view = 'review'
@@ -815,52 +973,85 @@ elif st.session_state.current_view == 'work_queue':
     st.markdown("## 📋 Work Queue")
     
     # Filters
-    col1, col2 = st.columns([1, 3])
+    col1, col2, col3 = st.columns([1, 1, 2])
     with col1:
         priority_filter = st.selectbox(
             "Filter by Priority",
             options=[None, 'HIGH', 'MEDIUM', 'LOW'],
             format_func=lambda x: 'All Priorities' if x is None else x
         )
+    with col2:
+        page_size = st.selectbox("Page Size", options=QUEUE_PAGE_SIZES, index=1)
+    
+    # Start again from the first page whenever the agent, filter or page size changes
+    filter_key = (agent_name, priority_filter, page_size)
+    if st.session_state.queue_filter_key != filter_key:
+        st.session_state.queue_filter_key = filter_key
+        st.session_state.queue_cursors = [None]
+        st.session_state.queue_page = 0
     
     try:
-        pending = get_pending_candidates(priority_filter=priority_filter)
+        refill_lease(agent_name)
+        total_pending = count_pending_candidates(agent_name, priority_filter=priority_filter)
+        page = st.session_state.queue_page
+        pending = get_pending_candidates(
+            agent_name,
+            priority_filter=priority_filter,
+            page_size=page_size,
+            cursor=st.session_state.queue_cursors[page]
+        )
+        has_next = len(pending) > page_size
+        pending = pending.head(page_size)
         
         if len(pending) > 0:
-            st.markdown(f"**{len(pending)} records pending review**")
+            first_row = page * page_size + 1
+            st.markdown(f"**{total_pending} records pending review** · showing {first_row}–{first_row + len(pending) - 1}")
             
-            for _, row in pending.iterrows():
-                priority_class = f"priority-{row['PRIORITY'].lower()}"
-                score = row['MATCH_SCORE']
-                score_class = 'match-score-high' if score >= 85 else ('match-score-medium' if score >= 70 else 'match-score-low')
-                
-                with st.container():
-                    col1, col2, col3, col4 = st.columns([3, 2, 1, 1])
-                    
-                    with col1:
-                        st.markdown(f"""
-                        **{row['NAME_1']}** ↔ **{row['NAME_2']}**  
-                        <small><code>{row['CUSTOMER_ID_1']}</code> vs <code>{row['CUSTOMER_ID_2']}</code></small>
-                        """, unsafe_allow_html=True)
-                    
-                    with col2:
-                        st.markdown(f"<small>{row['MATCH_REASON'][:60]}...</small>", unsafe_allow_html=True)
-                    
-                    with col3:
-                        st.markdown(f"""
-                        <span class="{score_class}">{score}%</span>
-                        <span class="{priority_class}">{row['PRIORITY']}</span>
-                        """, unsafe_allow_html=True)
-                    
-                    with col4:
-                        if st.button("Review →", key=f"review_{row['CANDIDATE_ID']}"):
-                            st.session_state.selected_candidate = row['CANDIDATE_ID']
-                            st.session_state.current_view = 'review'
-                            st.rerun()
-                    
-                    st.markdown("---")
+            # One grid for the whole page; selecting a row opens the review
+            st.caption("Select a record pair to review it.")
+            event = st.dataframe(
+                pending.assign(
+                    NAMES=pending['NAME_1'] + ' ↔ ' + pending['NAME_2'],
+                    CUSTOMERS=pending['CUSTOMER_ID_1'] + ' vs ' + pending['CUSTOMER_ID_2']
+                )[['NAMES', 'CUSTOMERS', 'MATCH_REASON', 'MATCH_SCORE', 'PRIORITY']],
+                use_container_width=True,
+                hide_index=True,
+                on_select="rerun",
+                selection_mode="single-row",
+                key="queue_grid",
+                column_config={
+                    'NAMES': 'Names',
+                    'CUSTOMERS': 'Customers',
+                    'MATCH_REASON': 'Match Reason',
+                    'MATCH_SCORE': st.column_config.ProgressColumn('Score', format='%.0f%%', min_value=0, max_value=100),
+                    'PRIORITY': 'Priority'
+                }
+            )
+            if event.selection.rows:
+                st.session_state.selected_candidate = pending.iloc[event.selection.rows[0]]['CANDIDATE_ID']
+                st.session_state.current_view = 'review'
+                st.rerun()
+            
+            # Pager
+            col1, col2, col3 = st.columns([1, 2, 1])
+            with col1:
+                if page > 0 and st.button("← Previous", use_container_width=True):
+                    st.session_state.queue_page = page - 1
+                    st.rerun()
+            with col2:
+                st.markdown(f"<div style='text-align: center;'>Page {page + 1} of {max(1, -(-total_pending // page_size))}</div>", unsafe_allow_html=True)
+            with col3:
+                if has_next and st.button("Next →", use_container_width=True):
+                    del st.session_state.queue_cursors[page + 1:]
+                    st.session_state.queue_cursors.append(page_cursor(pending.iloc[-1]))
+                    st.session_state.queue_page = page + 1
+                    st.rerun()
+        elif page > 0:
+            # Page emptied out under us (other agents decided it); step back
+            st.session_state.queue_page = page - 1
+            st.rerun()
         else:
-            st.success("🎉 All caught up! No pending items to review.")
+            st.success("🎉 All caught up! No pending items in your queue.")
             
     except Exception as e:
         st.error(f"Error loading work queue: {str(e)}")
@@ -871,29 +1062,33 @@ elif st.session_state.current_view == 'work_queue':
 elif st.session_state.current_view == 'review':
     st.markdown("## 🔍 Record Comparison")
     
+    if st.session_state.get('decision_conflict'):
+        st.warning(st.session_state.decision_conflict)
+        st.session_state.decision_conflict = None
+    
     # Get candidate to review
     if st.session_state.selected_candidate is None:
         try:
-            pending = get_pending_candidates()
+            refill_lease(agent_name)
+            pending = get_pending_candidates(agent_name, page_size=1)
             if len(pending) > 0:
                 st.session_state.selected_candidate = pending.iloc[0]['CANDIDATE_ID']
             else:
-                st.success("🎉 All caught up! No pending items to review.")
+                st.success("🎉 All caught up! No pending items in your queue.")
                 st.stop()
         except Exception as e:
             st.error(f"Error: {str(e)}")
             st.stop()
     
     try:
-        candidate = get_candidate_details(st.session_state.selected_candidate)
+        bundle = prefetched_pair_bundle(st.session_state.selected_candidate)
         
-        if candidate is None:
+        if bundle is None:
             st.warning("Candidate not found. Please select from the work queue.")
             st.session_state.selected_candidate = None
             st.stop()
         
-        customer1 = get_customer_details(candidate['CUSTOMER_ID_1'])
-        customer2 = get_customer_details(candidate['CUSTOMER_ID_2'])
+        candidate, customer1, customer2, same = bundle
         
         # Match score header
         score = candidate['MATCH_SCORE']
@@ -945,12 +1140,10 @@ elif st.session_state.current_view == 'review':
                 """, unsafe_allow_html=True)
                 
                 for field_key, field_label in compare_fields:
-                    val1 = customer1[field_key]
-                    val2 = customer2[field_key]
                     current_val = customer[field_key]
                     
-                    # Check if values match
-                    match_indicator = "✅" if str(val1) == str(val2) else "⚠️"
+                    # Precomputed in pair_bundle() from normalized values
+                    match_indicator = "✅" if same[field_key] else "⚠️"
                     
                     st.markdown(f"**{field_label}** {match_indicator}")
                     st.text(str(current_val) if current_val else "—")
@@ -958,6 +1151,8 @@ elif st.session_state.current_view == 'review':
         render_customer_card(customer1, "Record A", col1)
         render_customer_card(customer2, "Record B", col2)
         
+        prefetch_next_pairs(candidate)
+        
         # Decision Panel
         st.markdown("---")
         st.markdown("### 📝 Make Decision")
@@ -984,31 +1179,31 @@ elif st.session_state.current_view == 'review':
                 st.markdown("<br>", unsafe_allow_html=True)
                 
                 if st.button("✅ MATCH - Same Person", use_container_width=True, type="primary"):
-                    record_decision(
+                    if not record_decision(
                         st.session_state.selected_candidate,
                         agent_name,
                         'MATCHED',
                         decision_reason,
                         notes
-                    )
-                    st.success("Decision recorded: MATCHED")
-                    st.session_state.selected_candidate = None
+                    ):
+                        st.session_state.decision_conflict = conflict_message(st.session_state.selected_candidate)
+                    st.session_state.selected_candidate = st.session_state.next_candidate
                     st.rerun()
                 
                 if st.button("❌ NOT MATCH - Different People", use_container_width=True):
-                    record_decision(
+                    if not record_decision(
                         st.session_state.selected_candidate,
                         agent_name,
                         'NOT_MATCHED',
                         decision_reason,
                         notes
-                    )
-                    st.success("Decision recorded: NOT MATCHED")
-                    st.session_state.selected_candidate = None
+                    ):
+                        st.session_state.decision_conflict = conflict_message(st.session_state.selected_candidate)
+                    st.session_state.selected_candidate = st.session_state.next_candidate
                     st.rerun()
                 
                 if st.button("⏭️ Skip for Now", use_container_width=True):
-                    st.session_state.selected_candidate = None
+                    st.session_state.selected_candidate = st.session_state.next_candidate
                     st.rerun()
         
         # Navigation
@@ -1102,46 +1297,18 @@ elif st.session_state.current_view == 'admin':
             
             st.markdown(f"**{len(consultants)} consultants found**")
             
-            # Table header
-            col1, col2, col3, col4, col5 = st.columns([3, 2, 2, 2, 1])
-            with col1:
-                st.markdown("**CONSULTANT**")
-            with col2:
-                st.markdown("**DECISIONS**")
-            with col3:
-                st.markdown("**MATCHED**")
-            with col4:
-                st.markdown("**LAST ACTIVE**")
-            with col5:
-                st.markdown("**ACTIONS**")
-            
-            st.markdown("---")
-            
-            for _, row in consultants.iterrows():
-                col1, col2, col3, col4, col5 = st.columns([3, 2, 2, 2, 1])
-                
-                with col1:
-                    st.markdown(f"**{row['CONSULTANT']}**")
-                
-                with col2:
-                    st.write(f"{int(row['TOTAL_DECISIONS'])} total")
-                
-                with col3:
-                    matched = int(row['MATCHED'])
-                    not_matched = int(row['NOT_MATCHED'])
-                    st.markdown(f"<span style='color: #22c55e;'>✓ {matched}</span> / <span style='color: #ef4444;'>✗ {not_matched}</span>", unsafe_allow_html=True)
-                
-                with col4:
-                    last_active = row['LAST_ACTIVE']
-                    if last_active:
-                        st.write(str(last_active)[:16])
-                    else:
-                        st.write("—")
-                
-                with col5:
-                    st.button("📊", key=f"stats_{row['CONSULTANT']}", help="View detailed stats")
-                
-                st.markdown("---")
+            st.dataframe(
+                consultants[['CONSULTANT', 'TOTAL_DECISIONS', 'MATCHED', 'NOT_MATCHED', 'LAST_ACTIVE']],
+                use_container_width=True,
+                hide_index=True,
+                column_config={
+                    'CONSULTANT': 'Consultant',
+                    'TOTAL_DECISIONS': st.column_config.NumberColumn('Decisions', format='%d'),
+                    'MATCHED': st.column_config.NumberColumn('✓ Matched', format='%d'),
+                    'NOT_MATCHED': st.column_config.NumberColumn('✗ Not Matched', format='%d'),
+                    'LAST_ACTIVE': st.column_config.DatetimeColumn('Last Active', format='YYYY-MM-DD HH:mm')
+                }
+            )
             
             # Summary statistics
             st.markdown("### 📈 Team Performance Summary")
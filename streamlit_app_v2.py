@@ -11,9 +11,12 @@ This app allows agents to:
 
 import streamlit as st
 from snowflake.snowpark.context import get_active_session
-from datetime import datetime, timedelta
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, timedelta
 import uuid
 
+from query_builder import Query, CLUSTER_ORDER, QUEUE_ORDER, call, country_code, country_join, pair_bundle, table, unprefixed
+
 # =============================================================================
 # Page Configuration
 # =============================================================================
@@ -514,6 +517,17 @@ def get_session():
 
 session = get_session()
 
+def get_prefetch_pool():
+    """This browser session's single worker thread for loading upcoming pairs.
+
+    Kept per session with one worker, so a session never has more than one
+    background query in flight on the Snowpark session, and one agent's
+    prefetches never queue behind another's.
+    """
+    if 'prefetch_pool' not in st.session_state:
+        st.session_state.prefetch_pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix='pair-prefetch')
+    return st.session_state.prefetch_pool
+
 # =============================================================================
 # Country Codes for Pacific Islands
 # =============================================================================
@@ -529,6 +543,48 @@ PACIFIC_COUNTRIES = {
     'Unknown': 'Multiple/No Country Code'
 }
 
+QUEUE_PAGE_SIZES = [10, 25, 50, 100]
+CLUSTER_PAGE_SIZE = 50
+
+# Fields shown when comparing records (compare and cluster views)
+COMPARE_FIELDS = [
+    ('CUSTOMER_ID', 'Customer ID'),
+    ('FIRST_NAME', 'First Name'),
+    ('LAST_NAME', 'Last Name'),
+    ('EMAIL', 'Email'),
+    ('PHONE', 'Phone'),
+    ('DATE_OF_BIRTH', 'Date of Birth'),
+    ('ADDRESS_LINE1', 'Address'),
+    ('CITY', 'City'),
+    ('POSTAL_CODE', 'Postal Code'),
+    ('ACCOUNT_STATUS', 'Account Status'),
+    ('ACCOUNT_TYPE', 'Account Type'),
+    ('SOURCE_SYSTEM', 'Source System'),
+    ('TOTAL_TRANSACTIONS', 'Transactions'),
+    ('ACCOUNT_BALANCE', 'Balance'),
+]
+
+# =============================================================================
+# Query Cache Settings
+# =============================================================================
+# Per-query lifetimes in seconds. Decisions clear the queue, the cluster list
+# and the decided pairs' reads; everything else (dashboard metrics, country
+# breakdown, consultants) catches up when its TTL runs out.
+METRICS_CACHE_TTL = 60
+QUEUE_CACHE_TTL = 30
+DETAIL_CACHE_TTL = 300
+CONSULTANT_CACHE_TTL = 300
+CACHE_MAX_ENTRIES = 500
+
+# Each agent works from their own lease (LEASE_CANDIDATES): topped up to
+# LEASE_BATCH_SIZE whenever fewer than LEASE_REFILL_AT are left
+LEASE_BATCH_SIZE = 25
+LEASE_REFILL_AT = 5
+
+# How many upcoming clusters to load in the background while comparing
+PREFETCH_DEPTH = 3
+PREFETCH_WAIT_SECONDS = 10
+
 # =============================================================================
 # Helper Functions
 # =============================================================================
@@ -547,71 +603,128 @@ def get_greeting():
     else:
         return "Bula! Good Evening"
 
+@st.cache_data(ttl=METRICS_CACHE_TTL, max_entries=CACHE_MAX_ENTRIES, show_spinner=False)
 def get_dashboard_metrics():
     """Get comprehensive metrics for dashboard."""
     today = datetime.now().date()
     week_start = today - timedelta(days=today.weekday())
     month_start = today.replace(day=1)
     
-    query = f"""
+    # Reads the pre-aggregated rollups maintained by RECORD_DECISION, so the
+    # cost is a handful of rows no matter how large the audit log grows.
+    query = Query(f"""
     WITH metrics AS (
         SELECT 
-            COUNT(*) as total,
-            SUM(CASE WHEN STATUS = 'PENDING' THEN 1 ELSE 0 END) as pending,
-            SUM(CASE WHEN STATUS = 'MATCHED' THEN 1 ELSE 0 END) as matched,
-            SUM(CASE WHEN STATUS = 'NOT_MATCHED' THEN 1 ELSE 0 END) as rejected,
-            SUM(CASE WHEN PRIORITY = 'HIGH' AND STATUS = 'PENDING' THEN 1 ELSE 0 END) as high_priority
-        FROM DEDUPE_WORKFLOW_DB.DEDUPE_SCHEMA.DUPLICATE_CANDIDATES
-    ),
-    today_stats AS (
-        SELECT 
-            COUNT(*) as today_completed,
-            SUM(CASE WHEN d.DECISION = 'MATCHED' THEN 1 ELSE 0 END) as today_matched,
-            SUM(CASE WHEN d.DECISION = 'NOT_MATCHED' THEN 1 ELSE 0 END) as today_rejected
-        FROM DEDUPE_WORKFLOW_DB.DEDUPE_SCHEMA.AGENT_DECISIONS d
-        WHERE DATE(d.DECISION_TIMESTAMP) = '{today}'
+            COALESCE(SUM(CANDIDATE_COUNT), 0) as total,
+            COALESCE(SUM(IFF(STATUS = 'PENDING', CANDIDATE_COUNT, 0)), 0) as pending,
+            COALESCE(SUM(IFF(STATUS = 'MATCHED', CANDIDATE_COUNT, 0)), 0) as matched,
+            COALESCE(SUM(IFF(STATUS = 'NOT_MATCHED', CANDIDATE_COUNT, 0)), 0) as rejected,
+            COALESCE(SUM(IFF(STATUS = 'PENDING' AND PRIORITY = 'HIGH', CANDIDATE_COUNT, 0)), 0) as high_priority
+        FROM {table('CANDIDATE_STATUS_SUMMARY')}
     ),
-    week_stats AS (
+    decision_stats AS (
         SELECT 
-            COUNT(*) as week_completed,
-            SUM(CASE WHEN d.DECISION = 'MATCHED' THEN 1 ELSE 0 END) as week_matched,
-            SUM(CASE WHEN d.DECISION = 'NOT_MATCHED' THEN 1 ELSE 0 END) as week_rejected
-        FROM DEDUPE_WORKFLOW_DB.DEDUPE_SCHEMA.AGENT_DECISIONS d
-        WHERE DATE(d.DECISION_TIMESTAMP) >= '{week_start}'
-    ),
-    month_stats AS (
-        SELECT 
-            COUNT(*) as month_completed,
-            SUM(CASE WHEN d.DECISION = 'MATCHED' THEN 1 ELSE 0 END) as month_matched,
-            SUM(CASE WHEN d.DECISION = 'NOT_MATCHED' THEN 1 ELSE 0 END) as month_rejected
-        FROM DEDUPE_WORKFLOW_DB.DEDUPE_SCHEMA.AGENT_DECISIONS d
-        WHERE DATE(d.DECISION_TIMESTAMP) >= '{month_start}'
+            COALESCE(SUM(IFF(DECISION_DATE = ?, DECISION_COUNT, 0)), 0) as today_completed,
+            COALESCE(SUM(IFF(DECISION_DATE = ? AND DECISION = 'MATCHED', DECISION_COUNT, 0)), 0) as today_matched,
+            COALESCE(SUM(IFF(DECISION_DATE = ? AND DECISION = 'NOT_MATCHED', DECISION_COUNT, 0)), 0) as today_rejected,
+            COALESCE(SUM(IFF(DECISION_DATE >= ?, DECISION_COUNT, 0)), 0) as week_completed,
+            COALESCE(SUM(IFF(DECISION_DATE >= ? AND DECISION = 'MATCHED', DECISION_COUNT, 0)), 0) as week_matched,
+            COALESCE(SUM(IFF(DECISION_DATE >= ? AND DECISION = 'NOT_MATCHED', DECISION_COUNT, 0)), 0) as week_rejected,
+            COALESCE(SUM(IFF(DECISION_DATE >= ?, DECISION_COUNT, 0)), 0) as month_completed,
+            COALESCE(SUM(IFF(DECISION_DATE >= ? AND DECISION = 'MATCHED', DECISION_COUNT, 0)), 0) as month_matched,
+            COALESCE(SUM(IFF(DECISION_DATE >= ? AND DECISION = 'NOT_MATCHED', DECISION_COUNT, 0)), 0) as month_rejected
+        FROM {table('DAILY_DECISION_ROLLUP')}
+        WHERE DECISION_DATE >= ?
     )
-    SELECT m.*, t.*, w.*, mo.*
-    FROM metrics m, today_stats t, week_stats w, month_stats mo
-    """
-    return session.sql(query).collect()[0]
+    SELECT m.*, d.*
+    FROM metrics m, decision_stats d
+    """,
+        [str(today)] * 3 + [str(week_start)] * 3 + [str(month_start)] * 3
+        + [str(min(week_start, month_start))]
+    )
+    return query.execute(session).collect()[0].as_dict()
 
+@st.cache_data(ttl=METRICS_CACHE_TTL, max_entries=CACHE_MAX_ENTRIES, show_spinner=False)
 def get_country_breakdown():
-    """Get pending clusters by country."""
-    query = """
+    """Get pending clusters per country code, one row per code."""
+    query = f"""
     SELECT 
-        COALESCE(c1.COUNTRY, 'Unknown') as COUNTRY,
+        {country_code('cc1')} as COUNTRY_CODE,
         COUNT(*) as COUNT
-    FROM DEDUPE_WORKFLOW_DB.DEDUPE_SCHEMA.DUPLICATE_CANDIDATES dc
-    JOIN DEDUPE_WORKFLOW_DB.DEDUPE_SCHEMA.CUSTOMERS c1 ON dc.CUSTOMER_ID_1 = c1.CUSTOMER_ID
+    FROM {table('DUPLICATE_CANDIDATES')} dc
+    JOIN {table('CUSTOMERS')} c1 ON dc.CUSTOMER_ID_1 = c1.CUSTOMER_ID
+    {country_join('c1', 'cc1')}
     WHERE dc.STATUS = 'PENDING'
-    GROUP BY c1.COUNTRY
-    ORDER BY COUNT DESC
+    GROUP BY 1
     """
     return session.sql(query).to_pandas()
 
-def get_pending_clusters(filters=None):
-    """Get pending duplicate candidates with optional filters."""
-    query = """
+def normalize_filters(filters):
+    """Turn a filters dict into a stable, hashable cache key.
+
+    Blank values are dropped and text is trimmed, so {} / None / {'customer': ' '}
+    all share one cache entry.
+    """
+    if not filters:
+        return ()
+    return tuple(sorted(
+        (key, str(value).strip())
+        for key, value in filters.items()
+        if value is not None and str(value).strip()
+    ))
+
+def apply_filters(query, filters):
+    """Add the cluster list filters to a Query as bound predicates."""
+    if filters.get('agent'):
+        query.leased_to(filters['agent'])
+    if filters.get('cluster_id'):
+        query.where_contains("dc.CANDIDATE_ID", filters['cluster_id'])
+    if filters.get('customer'):
+        query.where_contains(["dc.CUSTOMER_ID_1", "dc.CUSTOMER_ID_2"], filters['customer'])
+    if filters.get('country'):
+        query.where_equals(country_code('cc1'), filters['country'])
+    if filters.get('consultant'):
+        query.where_contains("dc.ASSIGNED_TO", filters['consultant'])
+    return query
+
+def page_cursor(row):
+    """Cursor pointing just past the given queue row."""
+    return (float(row['POINTS']), str(row['CREATED_DATE']), row['CLUSTER_ID'])
+
+def count_pending_clusters(filters=None):
+    """Count pending candidates for the queue header."""
+    return cached_pending_count(normalize_filters(filters))
+
+@st.cache_data(ttl=QUEUE_CACHE_TTL, max_entries=CACHE_MAX_ENTRIES, show_spinner=False)
+def cached_pending_count(filter_items):
+    filters = dict(filter_items)
+    # Only the country filter needs the country code join
+    join = ""
+    if filters.get('country'):
+        join = f"JOIN {table('CUSTOMERS')} c1 ON dc.CUSTOMER_ID_1 = c1.CUSTOMER_ID {country_join('c1', 'cc1')}"
+    query = Query(f"""
+    SELECT COUNT(*) as PENDING_COUNT
+    FROM {table('DUPLICATE_CANDIDATES')} dc
+    {join}
+    WHERE dc.STATUS = 'PENDING'
+    """)
+    apply_filters(query, filters)
+    return int(query.execute(session).collect()[0]['PENDING_COUNT'])
+
+def get_pending_clusters(filters=None, page_size=25, cursor=None):
+    """Get one page of pending duplicate candidates with optional filters.
+
+    Returns up to page_size + 1 rows; the extra row only signals that a next
+    page exists and should not be rendered.
+    """
+    return cached_pending_page(normalize_filters(filters), page_size, cursor)
+
+@st.cache_data(ttl=QUEUE_CACHE_TTL, max_entries=CACHE_MAX_ENTRIES, show_spinner=False)
+def cached_pending_page(filter_items, page_size, cursor):
+    query = Query(f"""
     SELECT 
         dc.CANDIDATE_ID as CLUSTER_ID,
-        COALESCE(c1.COUNTRY, 'Unknown') as CNTY,
+        {country_code('cc1')} as CNTY,
         dc.MATCH_SCORE as POINTS,
         dc.CUSTOMER_ID_1,
         dc.CUSTOMER_ID_2,
@@ -622,114 +735,370 @@ def get_pending_clusters(filters=None):
         dc.PRIORITY,
         dc.CREATED_DATE,
         dc.MATCH_REASON
-    FROM DEDUPE_WORKFLOW_DB.DEDUPE_SCHEMA.DUPLICATE_CANDIDATES dc
-    JOIN DEDUPE_WORKFLOW_DB.DEDUPE_SCHEMA.CUSTOMERS c1 ON dc.CUSTOMER_ID_1 = c1.CUSTOMER_ID
-    JOIN DEDUPE_WORKFLOW_DB.DEDUPE_SCHEMA.CUSTOMERS c2 ON dc.CUSTOMER_ID_2 = c2.CUSTOMER_ID
+    FROM {table('DUPLICATE_CANDIDATES')} dc
+    JOIN {table('CUSTOMERS')} c1 ON dc.CUSTOMER_ID_1 = c1.CUSTOMER_ID
+    JOIN {table('CUSTOMERS')} c2 ON dc.CUSTOMER_ID_2 = c2.CUSTOMER_ID
+    {country_join('c1', 'cc1')}
     WHERE dc.STATUS = 'PENDING'
+    """)
+    apply_filters(query, dict(filter_items))
+    query.seek(cursor).order_by(*QUEUE_ORDER).limit(page_size + 1)
+    return query.execute(session).to_pandas()
+
+def refill_lease(agent_name):
+    """Lease the agent more candidates once their queue runs low.
+
+    Returns how many were newly leased; LEASE_CANDIDATES enforces
+    MAX_DAILY_ASSIGNMENTS and the agent's country assignment. Once it reports
+    the daily cap, the agent is not asked for again until tomorrow.
     """
-    
-    if filters:
-        if filters.get('cluster_id'):
-            query += f" AND dc.CANDIDATE_ID LIKE '%{filters['cluster_id']}%'"
-        if filters.get('customer'):
-            query += f" AND (dc.CUSTOMER_ID_1 LIKE '%{filters['customer']}%' OR dc.CUSTOMER_ID_2 LIKE '%{filters['customer']}%')"
-        if filters.get('country'):
-            query += f" AND c1.COUNTRY = '{filters['country']}'"
-    
-    query += " ORDER BY dc.MATCH_SCORE DESC, dc.CREATED_DATE"
-    return session.sql(query).to_pandas()
+    capped = (agent_name, date.today().isoformat())
+    if not agent_name or st.session_state.get('lease_capped') == capped:
+        return 0
+    if count_pending_clusters({'agent': agent_name}) >= LEASE_REFILL_AT:
+        return 0
+    result = call('LEASE_CANDIDATES', agent_name, LEASE_BATCH_SIZE).execute(session).collect()
+    leased = int(result[0][0])
+    if leased < 0:
+        st.session_state.lease_capped = capped
+        return 0
+    if leased:
+        cached_pending_count.clear()
+        cached_pending_page.clear()
+    return leased
+
+def cluster_pair_joins():
+    """JOINs placing a dc pair in cluster m.CLUSTER_ID only if both customers are members.
 
-def get_all_clusters(filters=None):
-    """Get all clusters for review (including processed)."""
-    query = """
+    A pair linking two clusters (scored since the last cluster build) belongs
+    to neither until the cluster job rebuilds them.
+    """
+    return (
+        f"JOIN {table('CLUSTER_MEMBERS')} m ON m.CUSTOMER_ID = dc.CUSTOMER_ID_1"
+        f" JOIN {table('CLUSTER_MEMBERS')} m2 ON m2.CLUSTER_ID = m.CLUSTER_ID AND m2.CUSTOMER_ID = dc.CUSTOMER_ID_2"
+    )
+
+def apply_cluster_filters(query, filters):
+    """Add the cluster list filters to a Query as bound predicates.
+
+    Filters select whole clusters (via subqueries) so the pair counts shown
+    for a cluster never depend on the filter.
+    """
+    if filters.get('cluster_id'):
+        query.where_contains("cl.CLUSTER_ID", filters['cluster_id'])
+    if filters.get('customer'):
+        query.where(
+            f"cl.CLUSTER_ID IN (SELECT CLUSTER_ID FROM {table('CLUSTER_MEMBERS')} WHERE CUSTOMER_ID LIKE ?)",
+            f"%{filters['customer']}%"
+        )
+    if filters.get('country'):
+        query.where_equals("cl.COUNTRY_CODE", filters['country'])
+    if filters.get('consultant'):
+        query.where(
+            f"cl.CLUSTER_ID IN (SELECT m.CLUSTER_ID FROM {table('DUPLICATE_CANDIDATES')} dc"
+            f" {cluster_pair_joins()} WHERE dc.ASSIGNED_TO LIKE ?)",
+            f"%{filters['consultant']}%"
+        )
+    return query
+
+def cluster_cursor(row):
+    """Cursor pointing just past the given cluster list row."""
+    return (int(row['HAS_PENDING']), int(row['MEMBER_COUNT']), float(row['POINTS']), row['CLUSTER_ID'])
+
+def count_customer_clusters(filters=None):
+    """Count the clusters matching the cluster list filters."""
+    return cached_cluster_count(normalize_filters(filters))
+
+@st.cache_data(ttl=QUEUE_CACHE_TTL, max_entries=CACHE_MAX_ENTRIES, show_spinner=False)
+def cached_cluster_count(filter_items):
+    query = Query(f"""
+    SELECT COUNT(*) as CLUSTER_COUNT
+    FROM {table('CUSTOMER_CLUSTERS')} cl
+    WHERE 1=1
+    """)
+    apply_cluster_filters(query, dict(filter_items))
+    return int(query.execute(session).collect()[0]['CLUSTER_COUNT'])
+
+def get_customer_clusters(filters=None, page_size=CLUSTER_PAGE_SIZE, cursor=None):
+    """Get one page of multi-record clusters with their member ids and live pair counts.
+
+    Returns up to page_size + 1 rows; the extra row only signals that a next
+    page exists and should not be rendered.
+    """
+    return cached_customer_clusters(normalize_filters(filters), page_size, cursor)
+
+@st.cache_data(ttl=QUEUE_CACHE_TTL, max_entries=CACHE_MAX_ENTRIES, show_spinner=False)
+def cached_customer_clusters(filter_items, page_size, cursor):
+    # A pair counts towards a cluster only when both its customers are members
+    clusters = Query(f"""
     SELECT 
-        dc.CANDIDATE_ID as CLUSTER_ID,
-        COALESCE(c1.COUNTRY, 'Unknown') as CNTY,
-        dc.MATCH_SCORE as POINTS,
-        dc.CUSTOMER_ID_1,
-        dc.CUSTOMER_ID_2,
-        c1.FIRST_NAME || ' ' || c1.LAST_NAME as NAME_1,
-        c2.FIRST_NAME || ' ' || c2.LAST_NAME as NAME_2,
-        dc.ASSIGNED_TO as CONSULTANT,
-        dc.STATUS,
-        CASE WHEN dc.STATUS = 'MATCHED' THEN TRUE ELSE FALSE END as CONFIRMED,
-        CASE WHEN dc.STATUS != 'PENDING' THEN TRUE ELSE FALSE END as REVIEWED,
-        dc.PRIORITY,
-        dc.CREATED_DATE
-    FROM DEDUPE_WORKFLOW_DB.DEDUPE_SCHEMA.DUPLICATE_CANDIDATES dc
-    JOIN DEDUPE_WORKFLOW_DB.DEDUPE_SCHEMA.CUSTOMERS c1 ON dc.CUSTOMER_ID_1 = c1.CUSTOMER_ID
-    JOIN DEDUPE_WORKFLOW_DB.DEDUPE_SCHEMA.CUSTOMERS c2 ON dc.CUSTOMER_ID_2 = c2.CUSTOMER_ID
+        cl.CLUSTER_ID,
+        cl.COUNTRY_CODE as CNTY,
+        cl.MAX_MATCH_SCORE as POINTS,
+        cl.MEMBER_COUNT,
+        LISTAGG(DISTINCT m.CUSTOMER_ID, ', ') WITHIN GROUP (ORDER BY m.CUSTOMER_ID) as MEMBERS,
+        COUNT_IF(dc.STATUS = 'PENDING') as PENDING_PAIRS,
+        COUNT_IF(dc.STATUS = 'MATCHED') as MATCHED_PAIRS,
+        IFF(COUNT_IF(dc.STATUS = 'PENDING') > 0, 1, 0) as HAS_PENDING,
+        cl.PAIR_COUNT
+    FROM {table('CUSTOMER_CLUSTERS')} cl
+    JOIN {table('CLUSTER_MEMBERS')} m ON m.CLUSTER_ID = cl.CLUSTER_ID
+    LEFT JOIN (
+        SELECT m.CLUSTER_ID, dc.CUSTOMER_ID_1, dc.STATUS
+        FROM {table('DUPLICATE_CANDIDATES')} dc
+        {cluster_pair_joins()}
+    ) dc ON dc.CLUSTER_ID = m.CLUSTER_ID AND dc.CUSTOMER_ID_1 = m.CUSTOMER_ID
     WHERE 1=1
+    """)
+    apply_cluster_filters(clusters, dict(filter_items))
+    clusters.group_by("cl.CLUSTER_ID", "cl.COUNTRY_CODE", "cl.MAX_MATCH_SCORE", "cl.MEMBER_COUNT", "cl.PAIR_COUNT")
+    # Seek on the grouped rows, since HAS_PENDING is an aggregate
+    query = Query(f"SELECT * FROM ({clusters.sql}) WHERE 1=1", clusters.params)
+    query.seek_cluster(cursor).order_by(*CLUSTER_ORDER).limit(page_size + 1)
+    return query.execute(session).to_pandas()
+
+@st.cache_data(ttl=DETAIL_CACHE_TTL, max_entries=CACHE_MAX_ENTRIES, show_spinner=False)
+def get_cluster_members(cluster_id):
+    """Get the customer records in a cluster."""
+    query = Query(f"""
+    SELECT c.*
+    FROM {table('CLUSTER_MEMBERS')} m
+    JOIN {table('CUSTOMERS')} c ON c.CUSTOMER_ID = m.CUSTOMER_ID
+    WHERE 1=1
+    """)
+    query.where_equals("m.CLUSTER_ID", cluster_id).order_by("c.CUSTOMER_ID")
+    return query.execute(session).to_pandas()
+
+def load_cluster_pairs(cluster_id):
+    """Get the candidate pairs that make up a cluster, straight from the table.
+
+    LEASED_TO is the agent holding a live lease on the pair, else NULL.
     """
-    
-    if filters:
-        if filters.get('cluster_id'):
-            query += f" AND dc.CANDIDATE_ID LIKE '%{filters['cluster_id']}%'"
-        if filters.get('customer'):
-            query += f" AND (dc.CUSTOMER_ID_1 LIKE '%{filters['customer']}%' OR dc.CUSTOMER_ID_2 LIKE '%{filters['customer']}%')"
-        if filters.get('country'):
-            query += f" AND c1.COUNTRY = '{filters['country']}'"
-        if filters.get('consultant'):
-            query += f" AND dc.ASSIGNED_TO LIKE '%{filters['consultant']}%'"
-    
-    query += " ORDER BY dc.CREATED_DATE DESC"
-    return session.sql(query).to_pandas()
+    query = Query(f"""
+    SELECT dc.CANDIDATE_ID, dc.CUSTOMER_ID_1, dc.CUSTOMER_ID_2, dc.MATCH_SCORE,
+           dc.MATCH_REASON, dc.STATUS, dc.ASSIGNED_TO,
+           IFF(dc.LEASE_EXPIRES_AT > CURRENT_TIMESTAMP(), dc.ASSIGNED_TO, NULL) as LEASED_TO
+    FROM {table('DUPLICATE_CANDIDATES')} dc
+    {cluster_pair_joins()}
+    WHERE 1=1
+    """)
+    query.where_equals("m.CLUSTER_ID", cluster_id).order_by("dc.MATCH_SCORE DESC", "dc.CANDIDATE_ID")
+    return query.execute(session).to_pandas()
 
-def get_customer_details(customer_id):
-    """Get full customer details."""
-    query = f"""
-    SELECT * FROM DEDUPE_WORKFLOW_DB.DEDUPE_SCHEMA.CUSTOMERS 
-    WHERE CUSTOMER_ID = '{customer_id}'
+@st.cache_data(ttl=QUEUE_CACHE_TTL, max_entries=CACHE_MAX_ENTRIES, show_spinner=False)
+def get_cluster_pairs(cluster_id):
+    """Cached load_cluster_pairs() for rendering."""
+    return load_cluster_pairs(cluster_id)
+
+def load_pair_bundle(cluster_id):
+    """Get the cluster and both customer records in a single query.
+
+    Returns (cluster, customer1, customer2, same) as dicts, or None if not found;
+    same maps each customer column to whether the two records agree on it.
+    Safe to call from prefetch threads: it touches no Streamlit state.
     """
-    result = session.sql(query).collect()
-    return result[0] if result else None
+    result = pair_bundle(cluster_id).execute(session).collect()
+    if not result:
+        return None
+    row = result[0].as_dict()
+    return unprefixed(row, 'DC__'), unprefixed(row, 'C1__'), unprefixed(row, 'C2__'), unprefixed(row, 'SAME__')
 
+@st.cache_data(ttl=DETAIL_CACHE_TTL, max_entries=CACHE_MAX_ENTRIES, show_spinner=False)
+def get_pair_bundle(cluster_id):
+    """Cached load_pair_bundle() for the script thread."""
+    return load_pair_bundle(cluster_id)
+
+def prefetch_next_pairs(cluster):
+    """Start loading the pair bundles queued after this cluster.
+
+    Runs while the agent is still reading the current pair, so the next compare
+    page renders from memory. Futures live in session state; the worker
+    thread only runs queries.
+    """
+    cursor = (float(cluster['MATCH_SCORE']), str(cluster['CREATED_DATE']), cluster['CANDIDATE_ID'])
+    upcoming = get_pending_clusters({'agent': get_agent_name()}, page_size=PREFETCH_DEPTH, cursor=cursor)
+    next_ids = list(upcoming['CLUSTER_ID'].head(PREFETCH_DEPTH))
+    keep = set(next_ids) | {cluster['CANDIDATE_ID']}
+    
+    prefetched = st.session_state.prefetched_pairs
+    for cluster_id in list(prefetched):
+        if cluster_id not in keep:
+            prefetched.pop(cluster_id).cancel()
+    pool = get_prefetch_pool()
+    for cluster_id in next_ids:
+        if cluster_id not in prefetched:
+            prefetched[cluster_id] = pool.submit(load_pair_bundle, cluster_id)
+    
+    st.session_state.next_cluster = next_ids[0] if next_ids else None
+
+def advance_to_next_cluster():
+    """Move the compare view on to the prefetched next cluster, or back to the queue."""
+    st.session_state.selected_cluster = st.session_state.next_cluster
+    if st.session_state.selected_cluster is None:
+        st.session_state.current_view = 'review_matches'
+
+def prefetched_pair_bundle(cluster_id):
+    """Bundle loaded in the background for this cluster, falling back to a query."""
+    future = st.session_state.prefetched_pairs.get(cluster_id)
+    if future is not None:
+        try:
+            bundle = future.result(timeout=PREFETCH_WAIT_SECONDS)
+            if bundle is not None:
+                return bundle
+        except Exception:
+            st.session_state.prefetched_pairs.pop(cluster_id, None)
+    return get_pair_bundle(cluster_id)
+
+@st.cache_data(ttl=DETAIL_CACHE_TTL, max_entries=CACHE_MAX_ENTRIES, show_spinner=False)
 def get_cluster_details(cluster_id):
     """Get cluster/candidate details."""
-    query = f"""
-    SELECT * FROM DEDUPE_WORKFLOW_DB.DEDUPE_SCHEMA.DUPLICATE_CANDIDATES 
-    WHERE CANDIDATE_ID = '{cluster_id}'
+    query = Query(f"SELECT * FROM {table('DUPLICATE_CANDIDATES')} WHERE 1=1")
+    query.where_equals("CANDIDATE_ID", cluster_id)
+    result = query.execute(session).collect()
+    return result[0].as_dict() if result else None
+
+def invalidate_decided(candidate_ids):
+    """Drop the cached reads a decision on these candidates makes stale.
+
+    Any queue page, count, cluster list or cluster's pairs may hold a decided
+    candidate, so those are cleared whole; each pair's own reads, including a
+    bundle prefetched for it, are cleared for the decided candidates only.
     """
-    result = session.sql(query).collect()
-    return result[0] if result else None
+    for cached_read in (cached_pending_count, cached_pending_page, cached_customer_clusters, cached_cluster_count,
+                        get_cluster_pairs):
+        cached_read.clear()
+    for candidate_id in candidate_ids:
+        get_pair_bundle.clear(candidate_id)
+        get_cluster_details.clear(candidate_id)
+        prefetched = st.session_state.prefetched_pairs.pop(candidate_id, None)
+        if prefetched is not None:
+            prefetched.cancel()
 
 def record_decision(cluster_id, agent_name, decision, reason, notes=''):
-    """Record agent's decision."""
+    """Record agent's decision and update candidate status in one round trip.
+
+    Returns the new decision id, or None if the candidate was no longer
+    PENDING (another agent decided it first) or is leased to another agent,
+    and nothing was written.
+    """
     decision_id = str(uuid.uuid4())[:36]
     session_id = st.session_state.get('session_id', str(uuid.uuid4())[:36])
     
-    # Escape single quotes
-    reason = reason.replace("'", "''") if reason else ''
-    notes = notes.replace("'", "''") if notes else ''
-    agent_name = agent_name.replace("'", "''") if agent_name else ''
+    result = call(
+        'RECORD_DECISION',
+        decision_id, cluster_id, agent_name, decision, reason or '', notes or '', session_id
+    ).execute(session).collect()
     
-    insert_query = f"""
-    INSERT INTO DEDUPE_WORKFLOW_DB.DEDUPE_SCHEMA.AGENT_DECISIONS 
-    (DECISION_ID, CANDIDATE_ID, AGENT_NAME, DECISION, DECISION_REASON, NOTES, SESSION_ID)
-    VALUES ('{decision_id}', '{cluster_id}', '{agent_name}', '{decision}', '{reason}', '{notes}', '{session_id}')
+    # Clear even on conflict: our cached view of this candidate was stale
+    invalidate_decided([cluster_id])
+    return decision_id if result[0][0] == 'RECORDED' else None
+
+def conflict_message(cluster_id):
+    """Explain who got to a candidate first after record_decision() lost the race."""
+    current = get_cluster_details(cluster_id)
+    if current is None:
+        return f"{cluster_id} no longer exists; your decision was not recorded."
+    if current['STATUS'] == 'PENDING':
+        return f"{cluster_id} is leased to {current['ASSIGNED_TO']}; your decision was not recorded."
+    return (
+        f"{cluster_id} was already marked {current['STATUS']} by "
+        f"{current['ASSIGNED_TO'] or 'another agent'}; your decision was not recorded."
+    )
+
+def record_decisions(candidate_ids, agent_name, decision, reason, notes=''):
+    """Record the same decision for many candidates in one round trip.
+
+    RECORD_DECISIONS_BULK does one set-based UPDATE and one batched INSERT.
+    Returns how many were recorded; candidates that were no longer PENDING
+    are skipped.
     """
-    session.sql(insert_query).collect()
+    candidate_ids = list(candidate_ids)
+    if not candidate_ids:
+        return 0
+    session_id = st.session_state.get('session_id', str(uuid.uuid4())[:36])
     
-    update_query = f"""
-    UPDATE DEDUPE_WORKFLOW_DB.DEDUPE_SCHEMA.DUPLICATE_CANDIDATES 
-    SET STATUS = '{decision}', ASSIGNED_TO = '{agent_name}'
-    WHERE CANDIDATE_ID = '{cluster_id}'
-    """
-    session.sql(update_query).collect()
+    result = call(
+        'RECORD_DECISIONS_BULK',
+        ','.join(candidate_ids), agent_name, decision, reason or '', notes or '', session_id
+    ).execute(session).collect()
     
-    return decision_id
+    invalidate_decided(candidate_ids)
+    return int(result[0][0])
+
+def get_pending_pair_ids(cluster_ids, agent_name):
+    """Get the pending CANDIDATE_IDs in the given clusters that agent_name may decide.
+
+    Pairs leased to another agent are left to them.
+    """
+    query = Query(f"""
+    SELECT dc.CANDIDATE_ID
+    FROM {table('DUPLICATE_CANDIDATES')} dc
+    {cluster_pair_joins()}
+    WHERE dc.STATUS = 'PENDING'
+    """)
+    query.where_in("m.CLUSTER_ID", cluster_ids).not_leased_to_others(agent_name)
+    return [row['CANDIDATE_ID'] for row in query.execute(session).collect()]
+
+def record_cluster_decision(cluster_id, agent_name, same_person, reason, notes=''):
+    """Decide every pending pair in a cluster as one unit of work.
+
+    Pairs whose two customers are both in same_person are MATCHED, every other
+    pending pair is NOT_MATCHED. Pairs leased to another agent are left alone.
+    Returns how many pending pairs were skipped because another agent had
+    already decided them or holds their lease.
+    """
+    same_person = set(same_person)
+    pairs = load_cluster_pairs(cluster_id)
+    pending = pairs[pairs['STATUS'] == 'PENDING']
+    ours = pending[pending['LEASED_TO'].isna() | (pending['LEASED_TO'] == agent_name)]
+    both_same = ours['CUSTOMER_ID_1'].isin(same_person) & ours['CUSTOMER_ID_2'].isin(same_person)
+    recorded = (
+        record_decisions(ours.loc[both_same, 'CANDIDATE_ID'], agent_name, 'MATCHED', reason, notes)
+        + record_decisions(ours.loc[~both_same, 'CANDIDATE_ID'], agent_name, 'NOT_MATCHED', reason, notes)
+    )
+    return len(pending) - recorded
 
+@st.cache_data(ttl=CONSULTANT_CACHE_TTL, max_entries=CACHE_MAX_ENTRIES, show_spinner=False)
 def get_consultants():
-    """Get list of consultants who have made decisions."""
-    query = """
-    SELECT DISTINCT AGENT_NAME as CONSULTANT, 
-           MAX(DECISION_TIMESTAMP) as LAST_ACTIVE
-    FROM DEDUPE_WORKFLOW_DB.DEDUPE_SCHEMA.AGENT_DECISIONS
-    GROUP BY AGENT_NAME
-    ORDER BY LAST_ACTIVE DESC
+    """Get consultants with an assignment or past decisions, their country and open leases."""
+    query = f"""
+    SELECT 
+        a.AGENT_NAME as CONSULTANT,
+        asg.COUNTRY_CODE,
+        COALESCE(l.LEASED, 0) as LEASED,
+        d.LAST_ACTIVE
+    FROM (
+        SELECT AGENT_NAME FROM {table('AGENT_ASSIGNMENTS')}
+        UNION
+        SELECT AGENT_NAME FROM {table('AGENT_DECISIONS')} WHERE AGENT_NAME <> 'SYSTEM'
+    ) a
+    LEFT JOIN {table('AGENT_ASSIGNMENTS')} asg ON asg.AGENT_NAME = a.AGENT_NAME
+    LEFT JOIN (
+        SELECT AGENT_NAME, MAX(DECISION_TIMESTAMP) as LAST_ACTIVE
+        FROM {table('AGENT_DECISIONS')}
+        GROUP BY AGENT_NAME
+    ) d ON d.AGENT_NAME = a.AGENT_NAME
+    LEFT JOIN (
+        SELECT ASSIGNED_TO, COUNT(*) as LEASED
+        FROM {table('DUPLICATE_CANDIDATES')}
+        WHERE STATUS = 'PENDING' AND LEASE_EXPIRES_AT > CURRENT_TIMESTAMP()
+        GROUP BY ASSIGNED_TO
+    ) l ON l.ASSIGNED_TO = a.AGENT_NAME
+    ORDER BY d.LAST_ACTIVE DESC NULLS LAST, a.AGENT_NAME
     """
     return session.sql(query).to_pandas()
 
+def save_assignment(agent_name, country_code):
+    """Assign an agent to one country's candidates (country_code None = any country)."""
+    Query(f"""
+    MERGE INTO {table('AGENT_ASSIGNMENTS')} a
+    USING (SELECT ? as AGENT_NAME, ? as COUNTRY_CODE) s
+    ON a.AGENT_NAME = s.AGENT_NAME
+    WHEN MATCHED THEN UPDATE SET COUNTRY_CODE = s.COUNTRY_CODE, UPDATED_AT = CURRENT_TIMESTAMP()
+    WHEN NOT MATCHED THEN INSERT (AGENT_NAME, COUNTRY_CODE) VALUES (s.AGENT_NAME, s.COUNTRY_CODE)
+    """, [agent_name, country_code]).execute(session).collect()
+    get_consultants.clear()
+
 # =============================================================================
 # Initialize Session State
 # =============================================================================
@@ -739,6 +1108,23 @@ if 'current_view' not in st.session_state:
     st.session_state.current_view = 'dashboard'
 if 'selected_cluster' not in st.session_state:
     st.session_state.selected_cluster = None
+if 'open_cluster' not in st.session_state:
+    # CUSTOMER_CLUSTERS.CLUSTER_ID shown in the cluster view
+    st.session_state.open_cluster = None
+if 'queue_cursors' not in st.session_state:
+    # queue_cursors[i] is the seek cursor that starts page i (None = first page)
+    st.session_state.queue_cursors = [None]
+    st.session_state.queue_page = 0
+    st.session_state.queue_page_size = QUEUE_PAGE_SIZES[1]
+if 'cluster_cursors' not in st.session_state:
+    # Same paging as queue_cursors, for the cluster list; reset when its filters change
+    st.session_state.cluster_cursors = [None]
+    st.session_state.cluster_page = 0
+    st.session_state.cluster_filters = ()
+if 'prefetched_pairs' not in st.session_state:
+    # cluster_id -> Future of its pair bundle, filled by prefetch_next_pairs()
+    st.session_state.prefetched_pairs = {}
+    st.session_state.next_cluster = None
 if 'agent_name' not in st.session_state:
     st.session_state.agent_name = 'Agent'
 
@@ -792,6 +1178,9 @@ with st.expander("⚙️ Settings", expanded=False):
     agent_name = st.text_input("Your Name", value=st.session_state.agent_name)
     if agent_name != st.session_state.agent_name:
         st.session_state.agent_name = agent_name
+        # The queue is the new agent's lease; start it from the first page
+        st.session_state.queue_cursors = [None]
+        st.session_state.queue_page = 0
         st.rerun()
 
 # =============================================================================
@@ -896,15 +1285,12 @@ if st.session_state.current_view == 'dashboard':
         st.markdown('<div class="country-title">Clusters Left: Country Level</div>', unsafe_allow_html=True)
         
         country_data = get_country_breakdown()
+        country_counts = dict(zip(country_data['COUNTRY_CODE'], country_data['COUNT']))
         
         # Create country grid
         cols = st.columns(len(PACIFIC_COUNTRIES))
         for i, (code, name) in enumerate(PACIFIC_COUNTRIES.items()):
-            count = 0
-            if len(country_data) > 0:
-                matching = country_data[country_data['COUNTRY'].str.upper().str.contains(code.upper(), na=False)]
-                if len(matching) > 0:
-                    count = int(matching['COUNT'].sum())
+            count = int(country_counts.get(code, 0))
             
             with cols[i]:
                 color = "#0d1b4c" if count > 0 else "#94a3b8"
@@ -942,6 +1328,10 @@ elif st.session_state.current_view == 'review_clusters':
         st.session_state.current_view = 'dashboard'
         st.rerun()
     
+    if st.session_state.get('decision_conflict'):
+        st.warning(st.session_state.decision_conflict)
+        st.session_state.decision_conflict = None
+    
     st.markdown('<div class="main-card">', unsafe_allow_html=True)
     
     # Filters
@@ -954,7 +1344,11 @@ elif st.session_state.current_view == 'review_clusters':
     with col3:
         filter_consultant = st.text_input("Filter by CONSULTANT", placeholder="Enter consultant...")
     with col4:
-        filter_country = st.selectbox("Filter by Country", options=['All'] + list(PACIFIC_COUNTRIES.values()))
+        filter_country = st.selectbox(
+            "Filter by Country",
+            options=['All'] + list(PACIFIC_COUNTRIES.keys()),
+            format_func=lambda code: code if code == 'All' else f"{code} - {PACIFIC_COUNTRIES[code]}"
+        )
     with col5:
         st.markdown("<br>", unsafe_allow_html=True)
         clear_filters = st.button("Clear", use_container_width=True)
@@ -970,52 +1364,218 @@ elif st.session_state.current_view == 'review_clusters':
     if filter_country and filter_country != 'All' and not clear_filters:
         filters['country'] = filter_country
     
+    if normalize_filters(filters) != st.session_state.cluster_filters:
+        st.session_state.cluster_filters = normalize_filters(filters)
+        st.session_state.cluster_cursors = [None]
+        st.session_state.cluster_page = 0
+    
     try:
-        clusters = get_all_clusters(filters if filters else None)
+        total_clusters = count_customer_clusters(filters)
+        page = st.session_state.cluster_page
+        clusters = get_customer_clusters(filters, cursor=st.session_state.cluster_cursors[page])
+        has_next = len(clusters) > CLUSTER_PAGE_SIZE
+        clusters = clusters.head(CLUSTER_PAGE_SIZE)
         
         if len(clusters) > 0:
-            st.markdown(f"**{len(clusters)} clusters found**")
+            first_row = page * CLUSTER_PAGE_SIZE + 1
+            st.markdown(f"**{total_clusters} clusters found** · showing {first_row}–{first_row + len(clusters) - 1}")
             
-            # Display as interactive table
-            for _, row in clusters.iterrows():
-                col1, col2, col3, col4, col5, col6 = st.columns([2, 1, 1, 2, 2, 1])
-                
-                with col1:
-                    st.markdown(f"<span class='mono'>{row['CLUSTER_ID']}</span>", unsafe_allow_html=True)
-                
-                with col2:
-                    st.write(row['CNTY'][:2] if row['CNTY'] else 'N/A')
-                
-                with col3:
-                    st.write(f"{row['POINTS']:.0f}")
-                
-                with col4:
-                    st.markdown(f"<span class='mono'>{row['CUSTOMER_ID_1']}</span>", unsafe_allow_html=True)
-                
-                with col5:
-                    st.markdown(f"<span class='mono'>{row['CUSTOMER_ID_2']}</span>", unsafe_allow_html=True)
-                
-                with col6:
-                    status = row['STATUS']
-                    if status == 'MATCHED':
-                        st.markdown('<span class="badge badge-confirmed">✓ Confirmed</span>', unsafe_allow_html=True)
-                    elif status == 'NOT_MATCHED':
-                        st.markdown('<span class="badge badge-rejected">✗ Rejected</span>', unsafe_allow_html=True)
-                    else:
-                        if st.button("Review", key=f"rev_{row['CLUSTER_ID']}"):
-                            st.session_state.selected_cluster = row['CLUSTER_ID']
-                            st.session_state.current_view = 'compare'
-                            st.rerun()
-                
-                st.markdown("---")
-        else:
+            # One grid for the page; selected rows are opened or decided in bulk
+            st.caption("Select a cluster to review it, or several to decide them in bulk.")
+            grid = clusters[['CLUSTER_ID', 'CNTY', 'POINTS', 'MEMBER_COUNT', 'MEMBERS']].assign(
+                STATUS=[
+                    f"{pending} pending" if pending > 0 else ('✓ Confirmed' if matched > 0 else '✗ Rejected')
+                    for pending, matched in zip(clusters['PENDING_PAIRS'], clusters['MATCHED_PAIRS'])
+                ]
+            )
+            event = st.dataframe(
+                grid,
+                use_container_width=True,
+                hide_index=True,
+                on_select="rerun",
+                selection_mode="multi-row",
+                key="cluster_grid",
+                column_config={
+                    'CLUSTER_ID': 'Cluster',
+                    'CNTY': 'Country',
+                    'POINTS': st.column_config.NumberColumn('Points', format='%.0f'),
+                    'MEMBER_COUNT': st.column_config.NumberColumn('Records', format='%d'),
+                    'MEMBERS': 'Members',
+                    'STATUS': 'Status'
+                }
+            )
+            # The selection outlives a page change; ignore rows past this page's end
+            selected = clusters.iloc[[row for row in event.selection.rows if row < len(clusters)]]
+            
+            if len(selected) == 1 and st.button(f"🔍 Review {selected.iloc[0]['CLUSTER_ID']}", type="primary"):
+                st.session_state.open_cluster = selected.iloc[0]['CLUSTER_ID']
+                st.session_state.current_view = 'cluster'
+                st.rerun()
+            
+            # Bulk decision for obvious clusters without opening each one
+            bulk_selected = list(selected.loc[selected['PENDING_PAIRS'] > 0, 'CLUSTER_ID'])
+            if bulk_selected:
+                with st.expander(f"⚡ Bulk Decision ({len(bulk_selected)} pending clusters selected)", expanded=len(selected) > 1):
+                    bulk_reason = st.selectbox(
+                        "Decision Reason",
+                        options=[
+                            "Same person - confirmed match",
+                            "Different people - name coincidence",
+                            "Different people - family members",
+                            "Data quality issue",
+                            "Other"
+                        ],
+                        key="bulk_reason"
+                    )
+                    col_match, col_reject = st.columns(2)
+                    with col_match:
+                        bulk_match = st.button("✅ Match Selected", use_container_width=True, type="primary")
+                    with col_reject:
+                        bulk_reject = st.button("❌ Reject Selected", use_container_width=True)
+                    
+                    if bulk_match or bulk_reject:
+                        candidate_ids = get_pending_pair_ids(bulk_selected, get_agent_name())
+                        decision = 'MATCHED' if bulk_match else 'NOT_MATCHED'
+                        recorded = record_decisions(candidate_ids, get_agent_name(), decision, bulk_reason)
+                        if recorded < len(candidate_ids):
+                            st.session_state.decision_conflict = (
+                                f"{len(candidate_ids) - recorded} pair(s) were already decided by another agent "
+                                "and were left unchanged."
+                            )
+                        st.rerun()
+            
+            # Pager
+            col1, col2, col3 = st.columns([1, 2, 1])
+            with col1:
+                if page > 0 and st.button("← Previous", use_container_width=True):
+                    st.session_state.cluster_page = page - 1
+                    st.rerun()
+            with col2:
+                st.markdown(f"<div style='text-align: center;'>Page {page + 1} of {max(1, -(-total_clusters // CLUSTER_PAGE_SIZE))}</div>", unsafe_allow_html=True)
+            with col3:
+                if has_next and st.button("Next →", use_container_width=True):
+                    del st.session_state.cluster_cursors[page + 1:]
+                    st.session_state.cluster_cursors.append(cluster_cursor(clusters.iloc[-1]))
+                    st.session_state.cluster_page = page + 1
+                    st.rerun()
+        elif page > 0:
+            st.session_state.cluster_page = page - 1
+            st.rerun()
+        elif filters:
             st.info("No clusters found matching your criteria.")
+        else:
+            st.info(
+                "No clusters have been built yet. Run `python -m matching.clusters` "
+                "after the matching job to group candidate pairs into clusters."
+            )
             
     except Exception as e:
         st.error(f"Error loading clusters: {str(e)}")
     
     st.markdown('</div>', unsafe_allow_html=True)
 
+# =============================================================================
+# CLUSTER VIEW (All records in a cluster, decided as one unit)
+# =============================================================================
+elif st.session_state.current_view == 'cluster':
+    
+    # Back button
+    if st.button("← Back", type="secondary"):
+        st.session_state.current_view = 'review_clusters'
+        st.rerun()
+    
+    if st.session_state.get('decision_conflict'):
+        st.warning(st.session_state.decision_conflict)
+        st.session_state.decision_conflict = None
+    
+    if st.session_state.open_cluster is None:
+        st.warning("No cluster selected. Please select from the cluster list.")
+        st.stop()
+    
+    try:
+        cluster_id = st.session_state.open_cluster
+        members = get_cluster_members(cluster_id)
+        pairs = get_cluster_pairs(cluster_id)
+        pending = pairs[pairs['STATUS'] == 'PENDING']
+        
+        if members.empty:
+            st.warning("Cluster not found. Clusters are rebuilt by the matching job.")
+            st.session_state.open_cluster = None
+            st.stop()
+        
+        st.markdown(f"""
+        <div style="background: linear-gradient(135deg, rgba(13, 27, 76, 0.05) 0%, rgba(13, 27, 76, 0.1) 100%); padding: 1rem 1.5rem; border-radius: 8px; border-left: 4px solid #0d1b4c; margin-bottom: 1.5rem;">
+            <strong>Cluster {cluster_id}:</strong> {len(members)} records linked by {len(pairs)} candidate pairs
+            <br><br>
+            <span class="badge badge-pending">{len(pending)} pairs pending</span>
+        </div>
+        """, unsafe_allow_html=True)
+        
+        # One column per record, one row per field
+        fields = [field_key for field_key, _ in COMPARE_FIELDS if field_key != 'CUSTOMER_ID']
+        records = members.set_index('CUSTOMER_ID')[fields].rename(columns=dict(COMPARE_FIELDS))
+        st.dataframe(records.T.astype(str), use_container_width=True)
+        
+        st.markdown("#### Linked Pairs")
+        st.dataframe(
+            pairs[['CUSTOMER_ID_1', 'CUSTOMER_ID_2', 'MATCH_SCORE', 'MATCH_REASON', 'STATUS', 'ASSIGNED_TO', 'LEASED_TO']],
+            use_container_width=True,
+            hide_index=True
+        )
+        
+        if pending.empty:
+            st.success("🎉 Every pair in this cluster has been decided.")
+            st.stop()
+        
+        # Decision panel
+        st.markdown("---")
+        st.markdown("### 📝 Make Decision")
+        
+        col1, col2 = st.columns([2, 1])
+        
+        with col1:
+            same_person = st.multiselect(
+                "Records that are the same person",
+                options=list(members['CUSTOMER_ID']),
+                default=list(members['CUSTOMER_ID'])
+            )
+            decision_reason = st.selectbox(
+                "Decision Reason",
+                options=[
+                    "Same person - confirmed match",
+                    "Different people - name coincidence",
+                    "Different people - family members",
+                    "Insufficient information",
+                    "Data quality issue",
+                    "Other"
+                ]
+            )
+            notes = st.text_area("Notes (optional)", placeholder="Add any notes...")
+        
+        with col2:
+            st.markdown("<br>", unsafe_allow_html=True)
+            
+            if st.button("✅ CONFIRM CLUSTER", use_container_width=True, type="primary"):
+                conflicts = record_cluster_decision(cluster_id, get_agent_name(), same_person, decision_reason, notes)
+            elif st.button("❌ REJECT - No Matches", use_container_width=True):
+                conflicts = record_cluster_decision(cluster_id, get_agent_name(), [], decision_reason, notes)
+            else:
+                conflicts = None
+            
+            if conflicts is not None:
+                if conflicts:
+                    st.session_state.decision_conflict = (
+                        f"{conflicts} pair(s) in {cluster_id} were already decided by, or are leased to, "
+                        "another agent and were left unchanged."
+                    )
+                st.session_state.open_cluster = None
+                st.session_state.current_view = 'review_clusters'
+                st.rerun()
+                
+    except Exception as e:
+        st.error(f"Error: {str(e)}")
+        st.session_state.open_cluster = None
+
 # =============================================================================
 # REVIEW MATCHES VIEW (Work Queue)
 # =============================================================================
@@ -1029,40 +1589,75 @@ elif st.session_state.current_view == 'review_matches':
     st.markdown('<div class="main-card">', unsafe_allow_html=True)
     st.markdown("## 🔍 Pending Matches for Review")
     
+    col1, col2 = st.columns([1, 4])
+    with col1:
+        page_size = st.selectbox(
+            "Page Size",
+            options=QUEUE_PAGE_SIZES,
+            index=QUEUE_PAGE_SIZES.index(st.session_state.queue_page_size)
+        )
+    if page_size != st.session_state.queue_page_size:
+        st.session_state.queue_page_size = page_size
+        st.session_state.queue_cursors = [None]
+        st.session_state.queue_page = 0
+    
     try:
-        pending = get_pending_clusters()
+        queue_filters = {'agent': get_agent_name()}
+        refill_lease(get_agent_name())
+        total_pending = count_pending_clusters(queue_filters)
+        page = st.session_state.queue_page
+        pending = get_pending_clusters(queue_filters, page_size=page_size, cursor=st.session_state.queue_cursors[page])
+        has_next = len(pending) > page_size
+        pending = pending.head(page_size)
         
         if len(pending) > 0:
-            st.markdown(f"**{len(pending)} matches pending review**")
-            st.markdown("---")
+            first_row = page * page_size + 1
+            st.markdown(f"**{total_pending} matches pending review** · showing {first_row}–{first_row + len(pending) - 1}")
+            st.caption("Select a match to compare the records.")
             
-            for _, row in pending.iterrows():
-                col1, col2, col3, col4 = st.columns([3, 2, 1, 1])
-                
-                with col1:
-                    st.markdown(f"""
-                    **{row['NAME_1']}** ↔ **{row['NAME_2']}**  
-                    <small class="mono">{row['CUSTOMER_ID_1']} vs {row['CUSTOMER_ID_2']}</small>
-                    """, unsafe_allow_html=True)
-                
-                with col2:
-                    reason = row['MATCH_REASON'] if row['MATCH_REASON'] else ''
-                    st.markdown(f"<small>{reason[:50]}...</small>", unsafe_allow_html=True)
-                
-                with col3:
-                    score = row['POINTS']
-                    score_class = 'score-high' if score >= 85 else ('score-medium' if score >= 70 else 'score-low')
-                    st.markdown(f'<span class="match-score-pill {score_class}">{score:.0f}%</span>', unsafe_allow_html=True)
-                
-                with col4:
-                    if st.button("Review →", key=f"review_{row['CLUSTER_ID']}", type="primary"):
-                        st.session_state.selected_cluster = row['CLUSTER_ID']
-                        st.session_state.current_view = 'compare'
-                        st.rerun()
-                
-                st.markdown("---")
+            event = st.dataframe(
+                pending.assign(
+                    NAMES=pending['NAME_1'] + ' ↔ ' + pending['NAME_2'],
+                    CUSTOMERS=pending['CUSTOMER_ID_1'] + ' vs ' + pending['CUSTOMER_ID_2']
+                )[['NAMES', 'CUSTOMERS', 'MATCH_REASON', 'POINTS', 'PRIORITY']],
+                use_container_width=True,
+                hide_index=True,
+                on_select="rerun",
+                selection_mode="single-row",
+                key="match_grid",
+                column_config={
+                    'NAMES': 'Names',
+                    'CUSTOMERS': 'Customers',
+                    'MATCH_REASON': 'Match Reason',
+                    'POINTS': st.column_config.ProgressColumn('Score', format='%.0f%%', min_value=0, max_value=100),
+                    'PRIORITY': 'Priority'
+                }
+            )
+            if event.selection.rows:
+                st.session_state.selected_cluster = pending.iloc[event.selection.rows[0]]['CLUSTER_ID']
+                st.session_state.current_view = 'compare'
+                st.rerun()
+            
+            # Pager
+            col1, col2, col3 = st.columns([1, 2, 1])
+            with col1:
+                if page > 0 and st.button("← Previous", use_container_width=True):
+                    st.session_state.queue_page = page - 1
+                    st.rerun()
+            with col2:
+                st.markdown(f"<div style='text-align: center;'>Page {page + 1} of {max(1, -(-total_pending // page_size))}</div>", unsafe_allow_html=True)
+            with col3:
+                if has_next and st.button("Next →", use_container_width=True):
+                    del st.session_state.queue_cursors[page + 1:]
+                    st.session_state.queue_cursors.append(page_cursor(pending.iloc[-1]))
+                    st.session_state.queue_page = page + 1
+                    st.rerun()
+        elif page > 0:
+            # Page emptied out under us (other agents decided it); step back
+            st.session_state.queue_page = page - 1
+            st.rerun()
         else:
-            st.success("🎉 All caught up! No pending matches to review.")
+            st.success("🎉 All caught up! No pending matches in your queue.")
             
     except Exception as e:
         st.error(f"Error loading matches: {str(e)}")
@@ -1079,20 +1674,23 @@ elif st.session_state.current_view == 'compare':
         st.session_state.current_view = 'review_matches'
         st.rerun()
     
+    if st.session_state.get('decision_conflict'):
+        st.warning(st.session_state.decision_conflict)
+        st.session_state.decision_conflict = None
+    
     if st.session_state.selected_cluster is None:
         st.warning("No cluster selected. Please select from the review list.")
         st.stop()
     
     try:
-        cluster = get_cluster_details(st.session_state.selected_cluster)
+        bundle = prefetched_pair_bundle(st.session_state.selected_cluster)
         
-        if cluster is None:
+        if bundle is None:
             st.warning("Cluster not found.")
             st.session_state.selected_cluster = None
             st.stop()
         
-        customer1 = get_customer_details(cluster['CUSTOMER_ID_1'])
-        customer2 = get_customer_details(cluster['CUSTOMER_ID_2'])
+        cluster, customer1, customer2, same = bundle
         
         # Match score header
         score = cluster['MATCH_SCORE']
@@ -1111,23 +1709,6 @@ elif st.session_state.current_view == 'compare':
         # Side-by-side comparison
         col1, col2 = st.columns(2)
         
-        compare_fields = [
-            ('CUSTOMER_ID', 'Customer ID'),
-            ('FIRST_NAME', 'First Name'),
-            ('LAST_NAME', 'Last Name'),
-            ('EMAIL', 'Email'),
-            ('PHONE', 'Phone'),
-            ('DATE_OF_BIRTH', 'Date of Birth'),
-            ('ADDRESS_LINE1', 'Address'),
-            ('CITY', 'City'),
-            ('POSTAL_CODE', 'Postal Code'),
-            ('ACCOUNT_STATUS', 'Account Status'),
-            ('ACCOUNT_TYPE', 'Account Type'),
-            ('SOURCE_SYSTEM', 'Source System'),
-            ('TOTAL_TRANSACTIONS', 'Transactions'),
-            ('ACCOUNT_BALANCE', 'Balance'),
-        ]
-        
         with col1:
             st.markdown(f"""
             <div class="compare-card">
@@ -1138,12 +1719,11 @@ elif st.session_state.current_view == 'compare':
             </div>
             """, unsafe_allow_html=True)
             
-            for field_key, field_label in compare_fields:
-                val1 = customer1.get(field_key)
-                val2 = customer2.get(field_key)
-                match = "✅" if str(val1) == str(val2) else "⚠️"
+            for field_key, field_label in COMPARE_FIELDS:
+                value = customer1.get(field_key)
+                match = "✅" if same[field_key] else "⚠️"
                 st.markdown(f"**{field_label}** {match}")
-                st.text(str(val1) if val1 else "—")
+                st.text(str(value) if value else "—")
         
         with col2:
             st.markdown(f"""
@@ -1155,12 +1735,13 @@ elif st.session_state.current_view == 'compare':
             </div>
             """, unsafe_allow_html=True)
             
-            for field_key, field_label in compare_fields:
-                val1 = customer1.get(field_key)
-                val2 = customer2.get(field_key)
-                match = "✅" if str(val1) == str(val2) else "⚠️"
+            for field_key, field_label in COMPARE_FIELDS:
+                value = customer2.get(field_key)
+                match = "✅" if same[field_key] else "⚠️"
                 st.markdown(f"**{field_label}** {match}")
-                st.text(str(val2) if val2 else "—")
+                st.text(str(value) if value else "—")
+        
+        prefetch_next_pairs(cluster)
         
         # Decision panel
         st.markdown("---")
@@ -1186,20 +1767,19 @@ elif st.session_state.current_view == 'compare':
             st.markdown("<br>", unsafe_allow_html=True)
             
             if st.button("✅ CONFIRM MATCH", use_container_width=True, type="primary"):
-                record_decision(st.session_state.selected_cluster, get_agent_name(), 'MATCHED', decision_reason, notes)
-                st.success("✓ Match confirmed!")
-                st.session_state.selected_cluster = None
+                if not record_decision(st.session_state.selected_cluster, get_agent_name(), 'MATCHED', decision_reason, notes):
+                    st.session_state.decision_conflict = conflict_message(st.session_state.selected_cluster)
+                advance_to_next_cluster()
                 st.rerun()
             
             if st.button("❌ REJECT - Not a Match", use_container_width=True):
-                record_decision(st.session_state.selected_cluster, get_agent_name(), 'NOT_MATCHED', decision_reason, notes)
-                st.success("✗ Match rejected")
-                st.session_state.selected_cluster = None
+                if not record_decision(st.session_state.selected_cluster, get_agent_name(), 'NOT_MATCHED', decision_reason, notes):
+                    st.session_state.decision_conflict = conflict_message(st.session_state.selected_cluster)
+                advance_to_next_cluster()
                 st.rerun()
             
             if st.button("⏭️ Skip", use_container_width=True):
-                st.session_state.selected_cluster = None
-                st.session_state.current_view = 'review_matches'
+                advance_to_next_cluster()
                 st.rerun()
                 
     except Exception as e:
@@ -1224,7 +1804,7 @@ elif st.session_state.current_view == 'admin':
     with col1:
         filter_consultant = st.text_input("Filter by Consultant", placeholder="Search...")
     with col2:
-        filter_country_admin = st.selectbox("Filter by Country", options=['All'] + list(PACIFIC_COUNTRIES.values()), key="admin_country")
+        filter_country_admin = st.selectbox("Filter by Country", options=['All'] + list(PACIFIC_COUNTRIES.keys()), key="admin_country")
     with col3:
         st.markdown("<br>", unsafe_allow_html=True)
         st.button("Reset", use_container_width=True)
@@ -1235,40 +1815,30 @@ elif st.session_state.current_view == 'admin':
         if len(consultants) > 0:
             st.markdown("---")
             
-            # Table header
-            col1, col2, col3, col4 = st.columns([3, 1, 2, 1])
-            with col1:
-                st.markdown("**CONSULTANT**")
-            with col2:
-                st.markdown("**ADMIN**")
-            with col3:
-                st.markdown("**COUNTRY**")
-            with col4:
-                st.markdown("**ACTIONS**")
-            
-            st.markdown("---")
-            
-            for _, row in consultants.iterrows():
-                col1, col2, col3, col4 = st.columns([3, 1, 2, 1])
-                
-                with col1:
-                    st.write(row['CONSULTANT'])
-                
-                with col2:
-                    st.checkbox("", key=f"admin_{row['CONSULTANT']}", label_visibility="collapsed")
-                
-                with col3:
-                    st.selectbox(
-                        "Country",
-                        options=list(PACIFIC_COUNTRIES.keys()),
-                        key=f"country_{row['CONSULTANT']}",
-                        label_visibility="collapsed"
-                    )
-                
-                with col4:
-                    st.button("🗑️", key=f"delete_{row['CONSULTANT']}")
-                
-                st.markdown("---")
+            # One editable grid; changing a country re-targets that agent's next lease
+            grid = consultants[['CONSULTANT', 'COUNTRY_CODE', 'LEASED', 'LAST_ACTIVE']].assign(
+                COUNTRY_CODE=consultants['COUNTRY_CODE'].fillna('Any')
+            )
+            edited = st.data_editor(
+                grid,
+                use_container_width=True,
+                hide_index=True,
+                key="consultant_grid",
+                disabled=['CONSULTANT', 'LEASED', 'LAST_ACTIVE'],
+                column_config={
+                    'CONSULTANT': 'Consultant',
+                    'COUNTRY_CODE': st.column_config.SelectboxColumn(
+                        'Country', options=['Any'] + list(PACIFIC_COUNTRIES.keys()), required=True
+                    ),
+                    'LEASED': st.column_config.NumberColumn('Leased', format='%d'),
+                    'LAST_ACTIVE': st.column_config.DatetimeColumn('Last Active', format='YYYY-MM-DD HH:mm')
+                }
+            )
+            changed = edited['COUNTRY_CODE'] != grid['COUNTRY_CODE']
+            if changed.any():
+                for agent, code in zip(edited.loc[changed, 'CONSULTANT'], edited.loc[changed, 'COUNTRY_CODE']):
+                    save_assignment(agent, None if code == 'Any' else code)
+                st.rerun()
         else:
             st.info("No consultants found. Decisions will create consultant records.")
         
@@ -1278,11 +1848,16 @@ elif st.session_state.current_view == 'admin':
         with col1:
             new_consultant = st.text_input("Email/Name", placeholder="consultant@email.com")
         with col2:
-            new_country = st.selectbox("Assign Country", options=list(PACIFIC_COUNTRIES.keys()))
+            new_country = st.selectbox(
+                "Assign Country",
+                options=[None] + list(PACIFIC_COUNTRIES.keys()),
+                format_func=lambda code: 'Any' if code is None else code
+            )
         with col3:
             st.markdown("<br>", unsafe_allow_html=True)
             if st.button("Add", type="primary", use_container_width=True):
                 if new_consultant:
+                    save_assignment(new_consultant.strip(), new_country)
                     st.success(f"Added {new_consultant}")
                 else:
                     st.warning("Please enter a consultant name/email")
@@ -0,0 +1,39 @@
+"""Shared fixtures: a few CUSTOMERS rows from 02_load_sample_data.sql."""
+
+import pandas as pd
+import pytest
+
+from query_builder import CUSTOMER_COLUMNS
+
+SAMPLE_CUSTOMERS = [
+    # Set 1: clear duplicates
+    ('CUST-001', 'Apisai', 'Naiqama', 'apisai.naiqama@gmail.com', '+679-9234567', '1985-03-15', '45 Victoria Parade',
+     'Suite 12', 'Suva', 'Central', '99999', 'Fiji', 'ACTIVE', 'Premium', '2019-06-12 10:30:00', '2024-01-10 14:22:00',
+     234, 15420.50, 'ONLINE'),
+    ('CUST-002', 'Apisai', 'Naiqama', 'a.naiqama@gmail.com', '+679 923 4567', '1985-03-15', '45 Victoria Pde',
+     None, 'Suva', 'Central', '99999', 'Fiji', 'ACTIVE', 'Standard', '2021-02-28 09:15:00', '2024-01-08 11:45:00',
+     45, 2340.00, 'BRANCH'),
+    # Set 2: nickname and typos
+    ('CUST-003', 'Sera', 'Koroi', 'sera.koroi@hotmail.com', '+679-7891234', '1990-07-22', '123 Waimanu Road',
+     'Apt 4B', 'Suva', 'Central', '99998', 'Fiji', 'ACTIVE', 'Standard', '2020-01-15 08:00:00', '2024-01-12 16:30:00',
+     89, 5670.25, 'MOBILE'),
+    ('CUST-004', 'Sarah', 'Koroi', 'sera.koroi@hotmail.com', '+6797891234', '1990-07-22', '123 Waimanu Rd',
+     '4B', 'Suva', 'Central', '99998', 'Fiji', 'DORMANT', 'Standard', '2018-05-20 14:30:00', '2022-06-15 10:00:00',
+     12, 150.00, 'BRANCH'),
+    # Set 6: same household, different people
+    ('CUST-011', 'Adi', 'Vakacegu', 'adi.v@outlook.com', '+679-8901234', '1965-02-14', '89 Sunset Boulevard',
+     None, 'Nadi', 'Western', '99994', 'Fiji', 'ACTIVE', 'Premium', '2016-07-18 13:00:00', '2024-01-10 10:30:00',
+     890, 125000.00, 'BRANCH'),
+    ('CUST-012', 'Mereoni', 'Vakacegu', 'mereoni.v@outlook.com', '+679-8901234', '1968-09-03', '89 Sunset Boulevard',
+     None, 'Nadi', 'Western', '99994', 'Fiji', 'ACTIVE', 'Standard', '2018-02-25 15:45:00', '2024-01-09 12:15:00',
+     234, 18500.00, 'ONLINE'),
+    # Unrelated
+    ('CUST-017', 'Ana', 'Delai', 'ana.delai@gmail.com', '+679-4567890', '1995-01-10', '234 Grantham Road',
+     None, 'Suva', 'Central', '99990', 'Fiji', 'ACTIVE', 'Standard', '2022-05-15 09:00:00', '2024-01-11 10:00:00',
+     45, 3400.00, 'ONLINE'),
+]
+
+
+@pytest.fixture
+def customers():
+    return pd.DataFrame(SAMPLE_CUSTOMERS, columns=list(CUSTOMER_COLUMNS))
@@ -0,0 +1,105 @@
+import logging
+
+import pandas as pd
+import pytest
+
+from matching.blocking import (
+    blocking_keys, candidate_pairs, date_key, email_local_part, hub_blocks, phone_digits, postcode, soundex,
+)
+
+
+@pytest.mark.parametrize('name, code', [
+    ('Robert', 'R163'),
+    ('Rupert', 'R163'),
+    ('Rubin', 'R150'),
+    ('Ashcraft', 'A261'),   # H does not separate S and C
+    ('Tymczak', 'T522'),
+    ('Pfister', 'P236'),    # F shares the first letter's code
+    ('Honeyman', 'H555'),
+    ('Naiqama', 'N250'),
+    ('Lee', 'L000'),
+])
+def test_soundex_reference_values(name, code):
+    assert soundex(name) == code
+
+
+@pytest.mark.parametrize('name', [None, '', '123', float('nan')])
+def test_soundex_without_letters(name):
+    assert soundex(name) is None
+
+
+def test_key_functions():
+    assert phone_digits('+679-923 4567') == phone_digits('+6799234567') == '6799234567'
+    assert phone_digits(None) is None
+    assert email_local_part('Apisai.Naiqama+bank@gmail.com') == 'apisainaiqama'
+    assert postcode(' 99 999 ') == '99999'
+    assert date_key('1985-03-15 00:00:00') == '1985-03-15'
+    assert date_key(None) is None
+
+
+def people(rows):
+    """CUSTOMERS-shaped frame from (CUSTOMER_ID, FIRST_NAME, LAST_NAME, DATE_OF_BIRTH, POSTAL_CODE) rows."""
+    frame = pd.DataFrame(rows, columns=['CUSTOMER_ID', 'FIRST_NAME', 'LAST_NAME', 'DATE_OF_BIRTH', 'POSTAL_CODE'])
+    return frame.assign(PHONE=None, EMAIL=None)
+
+
+def pair_set(pairs):
+    return set(zip(pairs['CUSTOMER_ID_1'], pairs['CUSTOMER_ID_2']))
+
+
+def test_candidate_pairs_are_ordered_and_list_every_shared_pass():
+    keys = blocking_keys(people([
+        ('C3', 'Sera', 'Koroi', '1990-07-22', '99998'),
+        ('C1', 'Sarah', 'Koroi', '1990-07-22', '99998'),
+        ('C2', 'Ana', 'Delai', '1990-07-22', '99990'),
+        ('C4', 'Peni', 'Vuniwaqa', '1988-12-05', '99993'),
+    ]))
+    pairs = candidate_pairs(keys)
+
+    assert pair_set(pairs) == {('C1', 'C2'), ('C1', 'C3'), ('C2', 'C3')}
+    blocked_on = dict(zip(zip(pairs['CUSTOMER_ID_1'], pairs['CUSTOMER_ID_2']), pairs['BLOCKED_ON']))
+    assert blocked_on[('C1', 'C3')] == 'DOB,LAST_NAME,POSTCODE'
+    assert blocked_on[('C1', 'C2')] == 'DOB'
+
+
+def test_candidate_pairs_with_changed_ids_only_returns_their_pairs():
+    keys = blocking_keys(people([
+        (f'C{i}', 'Sera', 'Koroi' if i % 2 else 'Delai', '1990-07-22', f'9999{i % 3}') for i in range(9)
+    ]))
+    full = pair_set(candidate_pairs(keys))
+    changed = pair_set(candidate_pairs(keys, changed_ids={'C4', 'C7'}))
+
+    assert changed == {pair for pair in full if {'C4', 'C7'} & set(pair)}
+
+
+def hub_customers():
+    """Twelve customers on one placeholder postcode: two families of four and four loners."""
+    rows = [(f'H{i:02d}', 'Sera', 'Smith', None, '99999') for i in range(4)]
+    rows += [(f'H{i:02d}', 'Peni', 'Naiqama', None, '99999') for i in range(4, 8)]
+    rows += [(f'H{i:02d}', 'Ana', name, None, '99999') for i, name in zip(range(8, 12), ['Delai', 'Bogi', 'Cama', 'Khan'])]
+    return people(rows)
+
+
+def test_hub_block_is_split_by_last_name_soundex(caplog):
+    keys = blocking_keys(hub_customers(), ['POSTCODE'])
+    with caplog.at_level(logging.WARNING, logger='matching.blocking'):
+        pairs = candidate_pairs(keys, ['POSTCODE'], max_block_size=5)
+
+    # Only the two families are compared, each within itself: 2 x C(4, 2)
+    assert len(pairs) == 12
+    families = [{f'H{i:02d}' for i in range(4)}, {f'H{i:02d}' for i in range(4, 8)}]
+    assert all(any({first, second} <= family for family in families) for first, second in pair_set(pairs))
+    assert "POSTCODE block '99999' has 12 customers" in caplog.text
+
+
+def test_hub_blocks_reports_sub_blocks_and_skipped_customers():
+    keys = blocking_keys(hub_customers(), ['POSTCODE'])
+
+    hubs = hub_blocks(keys, ['POSTCODE'], max_block_size=5)
+    assert hubs.to_dict('records') == [{
+        'PASS': 'POSTCODE', 'VALUE': '99999', 'CUSTOMERS': 12, 'SUB_BLOCKS': 6, 'LARGEST_SUB_BLOCK': 4, 'SKIPPED': 0,
+    }]
+    # Sub-blocks still over the limit are skipped too
+    assert hub_blocks(keys, ['POSTCODE'], max_block_size=3)['SKIPPED'].tolist() == [8]
+    assert len(candidate_pairs(keys, ['POSTCODE'], max_block_size=3)) == 0
+    assert hub_blocks(keys, ['POSTCODE'], max_block_size=12).empty
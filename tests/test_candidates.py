@@ -0,0 +1,45 @@
+import pytest
+
+from matching.candidates import generate_candidates
+from matching.normalize import normalize_customers
+from query_builder import table
+
+
+def pairs_of(candidates):
+    return candidates.set_index(['CUSTOMER_ID_1', 'CUSTOMER_ID_2']).drop(columns='CANDIDATE_ID').sort_index()
+
+
+def test_changed_customers_get_the_same_pairs_as_a_full_run(customers):
+    normalized = normalize_customers(customers)
+    full = pairs_of(generate_candidates(normalized))
+    changed = pairs_of(generate_candidates(normalized, changed_ids={'CUST-004', 'CUST-012'}))
+
+    involved = [bool({'CUST-004', 'CUST-012'} & set(pair)) for pair in full.index]
+    assert changed.equals(full[involved])
+    assert list(changed.index) == [('CUST-003', 'CUST-004'), ('CUST-011', 'CUST-012')]
+
+
+def test_rerun_refreshes_a_pending_pair_whose_reason_changed(customers):
+    pytest.importorskip('duckdb')
+    from matching.pushdown import local_session, run_passes
+
+    normalized = normalize_customers(customers)
+    session = local_session(customers, normalized)
+    run_passes(session)
+    session.sql(f"""
+    UPDATE {table('DUPLICATE_CANDIDATES')} SET MATCH_REASON = 'stale', PRIORITY = 'LOW'
+    WHERE CUSTOMER_ID_1 = 'CUST-003'
+    """).collect()
+    session.sql(f"""
+    UPDATE {table('DUPLICATE_CANDIDATES')} SET MATCH_REASON = 'decided', STATUS = 'NOT_MATCHED'
+    WHERE CUSTOMER_ID_1 = 'CUST-001'
+    """).collect()
+
+    run_passes(session)
+    rows = session.sql(f"""
+    SELECT CUSTOMER_ID_1, MATCH_REASON, PRIORITY FROM {table('DUPLICATE_CANDIDATES')} ORDER BY CUSTOMER_ID_1
+    """).to_pandas().set_index('CUSTOMER_ID_1')
+    assert rows.loc['CUST-003', 'MATCH_REASON'] != 'stale'
+    assert rows.loc['CUST-003', 'PRIORITY'] == 'HIGH'
+    # Decided pairs are never touched
+    assert rows.loc['CUST-001', 'MATCH_REASON'] == 'decided'
@@ -0,0 +1,45 @@
+import pandas as pd
+
+from matching.clusters import build_clusters, connected_components
+
+
+def edges(*pairs, scores=None):
+    frame = pd.DataFrame(pairs, columns=['CUSTOMER_ID_1', 'CUSTOMER_ID_2'])
+    frame['MATCH_SCORE'] = scores or [80.0] * len(pairs)
+    return frame
+
+
+def groups(customer_ids, labels):
+    found = {}
+    for customer_id, label in zip(customer_ids, labels):
+        found.setdefault(label, set()).add(customer_id)
+    return sorted(found.values(), key=min)
+
+
+def test_connected_components_follow_transitive_links():
+    customer_ids, labels = connected_components(edges(('C', 'D'), ('A', 'B'), ('B', 'C'), ('X', 'Y'), ('Z', 'Y')))
+    assert groups(customer_ids, labels) == [{'A', 'B', 'C', 'D'}, {'X', 'Y', 'Z'}]
+
+
+def test_connected_components_labels_point_at_a_member():
+    customer_ids, labels = connected_components(edges(('A', 'B'), ('C', 'B')))
+    assert set(labels) == {labels[0]}
+    assert 0 <= labels[0] < len(customer_ids)
+
+
+def test_build_clusters_names_and_counts():
+    clusters, members = build_clusters(edges(('B', 'C'), ('A', 'B'), ('E', 'F'), scores=[70.0, 95.5, 60.0]))
+
+    assert clusters.sort_values('CLUSTER_ID').to_dict('records') == [
+        {'CLUSTER_ID': 'CL-A', 'FIRST_CUSTOMER_ID': 'A', 'MEMBER_COUNT': 3, 'PAIR_COUNT': 2, 'MAX_MATCH_SCORE': 95.5},
+        {'CLUSTER_ID': 'CL-E', 'FIRST_CUSTOMER_ID': 'E', 'MEMBER_COUNT': 2, 'PAIR_COUNT': 1, 'MAX_MATCH_SCORE': 60.0},
+    ]
+    assert dict(zip(members['CUSTOMER_ID'], members['CLUSTER_ID'])) == {
+        'A': 'CL-A', 'B': 'CL-A', 'C': 'CL-A', 'E': 'CL-E', 'F': 'CL-E',
+    }
+
+
+def test_build_clusters_without_pairs():
+    clusters, members = build_clusters(edges())
+    assert clusters.empty and members.empty
+    assert 'CLUSTER_ID' in clusters.columns
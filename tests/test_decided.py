@@ -0,0 +1,49 @@
+import pandas as pd
+import pytest
+
+from matching.candidates import generate_candidates
+from matching.decided import drop_decided, load_decided_pairs, pair_key
+from matching.normalize import normalize_customers
+from query_builder import table
+
+
+def test_pair_key_is_order_independent():
+    assert pair_key('CUST-004', 'CUST-003') == pair_key('CUST-003', 'CUST-004') == ('CUST-003', 'CUST-004')
+
+
+def test_drop_decided_keeps_undecided_pairs():
+    pairs = pd.DataFrame({'CUSTOMER_ID_1': ['A', 'A', 'B'], 'CUSTOMER_ID_2': ['B', 'C', 'C'], 'BLOCKED_ON': ['DOB'] * 3})
+
+    kept = drop_decided(pairs, {('A', 'C'), ('X', 'Y')})
+    assert list(zip(kept['CUSTOMER_ID_1'], kept['CUSTOMER_ID_2'])) == [('A', 'B'), ('B', 'C')]
+    assert list(kept.index) == [0, 1]
+    assert drop_decided(pairs, set()) is pairs
+
+
+def test_generate_candidates_never_rescores_decided_pairs(customers):
+    normalized = normalize_customers(customers)
+    decided = {pair_key('CUST-002', 'CUST-001')}
+
+    full = generate_candidates(normalized)
+    pairs = set(zip(full['CUSTOMER_ID_1'], full['CUSTOMER_ID_2']))
+    without = generate_candidates(normalized, decided=decided)
+    assert set(zip(without['CUSTOMER_ID_1'], without['CUSTOMER_ID_2'])) == pairs - decided
+    assert ('CUST-001', 'CUST-002') in pairs
+
+
+def test_load_decided_pairs_reads_final_decisions_only(customers):
+    pytest.importorskip('duckdb')
+    from matching.pushdown import local_session
+
+    session = local_session(customers, normalize_customers(customers))
+    session.sql(f"""
+    INSERT INTO {table('DUPLICATE_CANDIDATES')} (CANDIDATE_ID, CUSTOMER_ID_1, CUSTOMER_ID_2) VALUES
+        ('DC-1', 'CUST-001', 'CUST-002'), ('DC-2', 'CUST-003', 'CUST-004'), ('DC-3', 'CUST-011', 'CUST-012')
+    """).collect()
+    session.sql(f"""
+    INSERT INTO {table('AGENT_DECISIONS')} (DECISION_ID, CANDIDATE_ID, AGENT_NAME, DECISION) VALUES
+        ('AD-1', 'DC-1', 'Maria', 'MATCHED'), ('AD-2', 'DC-2', 'Maria', 'SKIPPED'),
+        ('AD-3', 'DC-3', 'Maria', 'NOT_MATCHED'), ('AD-4', 'DC-3', 'SYSTEM', 'NOT_MATCHED')
+    """).collect()
+
+    assert load_decided_pairs(session) == {('CUST-001', 'CUST-002'), ('CUST-011', 'CUST-012')}
@@ -0,0 +1,22 @@
+from matching.candidates import generate_candidates
+from matching.households import HOUSEHOLD_REASON, household_id
+from matching.normalize import normalize_customers
+
+
+def test_household_id_needs_an_address_and_a_phone():
+    assert household_id('89 sunset boulevard', None, '99994', '+6798901234') is not None
+    assert household_id('89 sunset boulevard', None, '99994', None) is None
+    assert household_id(None, None, '99994', '+6798901234') is None
+    assert household_id('1 a st', None, None, '+1') == household_id('1 a st', None, None, '+1')
+
+
+def test_same_household_different_people_are_flagged_low(customers):
+    candidates = generate_candidates(normalize_customers(customers)).set_index(['CUSTOMER_ID_1', 'CUSTOMER_ID_2'])
+
+    household = candidates.loc[('CUST-011', 'CUST-012')]
+    assert household['HOUSEHOLD_MATCH']
+    assert household['PRIORITY'] == 'LOW'
+    assert household['MATCH_REASON'].startswith(HOUSEHOLD_REASON)
+    # Re-entered records of one person share an address but are not a household pair
+    assert not candidates.loc[('CUST-003', 'CUST-004'), 'HOUSEHOLD_MATCH']
+    assert candidates['HOUSEHOLD_MATCH'].sum() == 1
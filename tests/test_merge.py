@@ -0,0 +1,60 @@
+import pandas as pd
+
+from matching.merge import PLAN_COLUMNS, plan_merges, survivor_order
+
+
+def matched(*pairs):
+    return pd.DataFrame(pairs, columns=['CUSTOMER_ID_1', 'CUSTOMER_ID_2', 'MATCH_SCORE', 'CANDIDATE_ID'])
+
+
+def by_customer(plan):
+    return plan.set_index('CUSTOMER_ID')
+
+
+def test_survivor_order_prefers_masters_then_recent_activity(customers):
+    trio = customers[customers['CUSTOMER_ID'].isin(['CUST-001', 'CUST-002', 'CUST-003'])]
+    assert list(survivor_order(trio)['CUSTOMER_ID']) == ['CUST-003', 'CUST-001', 'CUST-002']
+    assert list(survivor_order(trio, masters={'CUST-002'})['CUSTOMER_ID']) == ['CUST-002', 'CUST-003', 'CUST-001']
+
+
+def test_survivor_order_breaks_same_day_ties_on_transactions(customers):
+    pair = customers[customers['CUSTOMER_ID'].isin(['CUST-001', 'CUST-002'])].copy()
+    pair['LAST_ACTIVITY_DATE'] = ['2024-01-10 08:00:00', '2024-01-10 17:00:00']
+    # Same day: CUST-001's 234 transactions beat CUST-002's later time of day
+    assert list(survivor_order(pair)['CUSTOMER_ID']) == ['CUST-001', 'CUST-002']
+
+
+def test_plan_merges_folds_each_cluster_into_its_survivor(customers):
+    pairs = matched(
+        ('CUST-001', 'CUST-002', 95.0, 'DC-1'),
+        ('CUST-002', 'CUST-017', 60.0, 'DC-3'),
+        ('CUST-003', 'CUST-004', 90.0, 'DC-2'),
+    )
+    plan = plan_merges(pairs, customers, chunk_size=1)
+
+    assert list(plan.columns) == PLAN_COLUMNS
+    plan = by_customer(plan)
+    # CUST-017 was active most recently in its cluster
+    assert plan['MASTER_CUSTOMER_ID'].to_dict() == {
+        'CUST-017': 'CUST-017', 'CUST-001': 'CUST-017', 'CUST-002': 'CUST-017',
+        'CUST-003': 'CUST-003', 'CUST-004': 'CUST-003',
+    }
+    assert plan.loc[['CUST-017', 'CUST-001', 'CUST-002'], 'SURVIVOR_RANK'].tolist() == [0, 1, 2]
+    # Each merged record points at its best-scoring MATCHED pair; masters have none
+    assert plan['CANDIDATE_ID'].dropna().to_dict() == {'CUST-001': 'DC-1', 'CUST-002': 'DC-1', 'CUST-004': 'DC-2'}
+    assert plan['MERGE_ID'].isna().tolist() == [rank == 0 for rank in plan['SURVIVOR_RANK']]
+    assert plan.groupby('MASTER_CUSTOMER_ID')['CHUNK_NO'].nunique().eq(1).all()
+    assert sorted(plan['CHUNK_NO'].unique()) == [0, 1]
+
+
+def test_plan_merges_skips_already_merged_records_and_keeps_masters(customers):
+    pairs = matched(('CUST-001', 'CUST-002', 95.0, 'DC-1'), ('CUST-003', 'CUST-004', 90.0, 'DC-2'))
+
+    plan = by_customer(plan_merges(pairs, customers, merged_ids={'CUST-004'}, masters={'CUST-002'}))
+    # CUST-003 has nothing left to merge; CUST-002 already holds a golden record
+    assert plan['MASTER_CUSTOMER_ID'].to_dict() == {'CUST-002': 'CUST-002', 'CUST-001': 'CUST-002'}
+
+
+def test_plan_merges_without_pairs(customers):
+    plan = plan_merges(matched(), customers)
+    assert plan.empty and list(plan.columns) == PLAN_COLUMNS
@@ -0,0 +1,60 @@
+import re
+from pathlib import Path
+
+import pytest
+
+from matching.normalize import (
+    COUNTRY_NAMES, UNKNOWN_COUNTRY, country_code, e164_phone, fold, normalize_address, normalize_customers,
+    normalize_given_name,
+)
+
+SETUP_SQL = Path(__file__).resolve().parent.parent / '01_setup_database.sql'
+
+
+@pytest.mark.parametrize('phone, country, expected', [
+    ('+679-9234567', 'Fiji', '+6799234567'),
+    ('+679 923 4567', None, '+6799234567'),
+    ('9234567', 'Fiji', '+6799234567'),
+    ('679 9234567', 'Fiji', '+6799234567'),
+    ('021 555 1234', 'New Zealand', '+64215551234'),   # trunk 0 dropped
+    ('0064 21 555 1234', 'Fiji', '+64215551234'),
+    ('555 1234', 'Narnia', '5551234'),                  # unknown calling code
+    ('', 'Fiji', None),
+])
+def test_e164_phone(phone, country, expected):
+    assert e164_phone(phone, country) == expected
+
+
+def test_fold_and_fields():
+    assert fold('  Ratu  Sukuna-Rd. ') == 'ratu sukuna rd'
+    assert fold('Séra') == 'sera'
+    assert normalize_address('45 Victoria Pde') == '45 victoria parade'
+    assert normalize_given_name('Sera') == normalize_given_name('SARAH') == 'sarah'
+    assert normalize_given_name(None) is None
+
+
+def test_country_code_accepts_any_spelling():
+    assert country_code(' FIJI ') == country_code('fiji.') == 'FJ'
+    assert country_code('Western Samoa') == country_code('Samoa') == 'WS'
+    assert country_code('Narnia') is None
+
+
+def test_country_names_match_the_country_codes_seed():
+    seed = SETUP_SQL.read_text().split('INSERT INTO COUNTRY_CODES', 1)[1].split(';', 1)[0]
+    assert dict(re.findall(r"\('([^']+)', '([^']+)'\)", seed)) == COUNTRY_NAMES
+
+
+def test_country_names_are_folded_like_the_sql_join():
+    # COUNTRY_CODES is joined on TRIM(REGEXP_REPLACE(LOWER(COUNTRY), '[^a-z0-9]+', ' '))
+    for name in COUNTRY_NAMES:
+        assert name == fold(name) == re.sub(r'[^a-z0-9]+', ' ', name.lower()).strip()
+
+
+def test_normalize_customers(customers):
+    normalized = normalize_customers(customers).set_index('CUSTOMER_ID')
+
+    first, second = normalized.loc['CUST-001'], normalized.loc['CUST-002']
+    for column in ['FIRST_NAME', 'LAST_NAME', 'PHONE', 'ADDRESS_LINE1', 'POSTAL_CODE', 'COUNTRY_CODE']:
+        assert first[column] == second[column]
+    assert normalized.loc['CUST-003', 'FIRST_NAME'] == normalized.loc['CUST-004', 'FIRST_NAME'] == 'sarah'
+    assert normalize_customers(customers.assign(COUNTRY='Atlantis'))['COUNTRY_CODE'].eq(UNKNOWN_COUNTRY).all()
@@ -0,0 +1,51 @@
+import numpy as np
+import pytest
+
+from benchmarks.synthetic_customers import generate
+from matching.normalize import normalize_customers
+from matching.pushdown import compare_with_python, local_session, run_passes
+from matching.scoring import encode_strings, jaro_winkler
+from query_builder import table
+
+pytest.importorskip('duckdb')
+pytest.importorskip('pyarrow')
+
+
+@pytest.fixture
+def synthetic():
+    customers, _, _ = generate(400, seed=3)
+    normalized = normalize_customers(customers)
+    session = local_session(customers, normalized)
+    run_passes(session)
+    return session, normalized
+
+
+def test_local_jarowinkler_is_the_python_engines_rounded(synthetic):
+    # DuckDB's own jaro_winkler_similarity skips the prefix bonus below 0.7 (62 for wilson/williams)
+    session, _ = synthetic
+    names = [('wilson', 'williams'), ('martha', 'marhta'), ('laheemu', 'delai')]
+    got = [session.sql("SELECT JAROWINKLER_SIMILARITY(?, ?)", list(pair)).collect()[0][0] for pair in names]
+
+    codes1, lengths1 = encode_strings([a for a, _ in names])
+    codes2, lengths2 = encode_strings([b for _, b in names])
+    assert got == list(np.floor(jaro_winkler(codes1, lengths1, codes2, lengths2) * 100 + 0.5))
+    assert got[0] == 74
+
+
+def test_pushdown_agrees_with_python_engine(synthetic):
+    session, normalized = synthetic
+    count = session.sql(f"SELECT COUNT(*) FROM {table('DUPLICATE_CANDIDATES')}").collect()[0][0]
+    assert count > 50
+    assert compare_with_python(session, normalized).startswith(
+        f"python {count:,} pairs, sql {count:,} pairs, {count:,} in both;"
+    )
+
+
+def test_comparison_rejects_scores_outside_the_tolerance(synthetic):
+    session, normalized = synthetic
+    session.sql(f"""
+    UPDATE {table('DUPLICATE_CANDIDATES')} SET MATCH_SCORE = MATCH_SCORE + 1
+    WHERE CANDIDATE_ID = (SELECT MIN(CANDIDATE_ID) FROM {table('DUPLICATE_CANDIDATES')})
+    """).collect()
+    with pytest.raises(ValueError, match='SCORE_TOLERANCE'):
+        compare_with_python(session, normalized)
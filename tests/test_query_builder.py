@@ -0,0 +1,85 @@
+import duckdb
+
+from query_builder import CLUSTER_ORDER, Query, call, country_join, prefixed_columns, table, unprefixed
+
+
+def base():
+    return Query(f"SELECT * FROM {table('DUPLICATE_CANDIDATES')} dc WHERE 1=1")
+
+
+def test_where_methods_bind_every_value():
+    query = base().where_equals("dc.STATUS", 'PENDING').where_in("dc.PRIORITY", ['HIGH', 'LOW'])
+    query.where_contains(["dc.CUSTOMER_ID_1", "dc.CUSTOMER_ID_2"], "001")
+
+    assert query.sql.endswith(
+        " AND dc.STATUS = ? AND dc.PRIORITY IN (?, ?)"
+        " AND (dc.CUSTOMER_ID_1 LIKE ? OR dc.CUSTOMER_ID_2 LIKE ?)"
+    )
+    assert query.params == ['PENDING', 'HIGH', 'LOW', '%001%', '%001%']
+
+
+def test_where_in_without_values_matches_nothing():
+    query = base().where_in("dc.CANDIDATE_ID", iter([]))
+    assert query.sql.endswith(" AND 1=0")
+    assert query.params == []
+
+
+def test_seek_continues_after_the_cursor_in_queue_order():
+    assert base().seek(None).params == []
+
+    query = base().seek((95.5, '2024-01-13 08:00:00', 'DC-001')).limit('26')
+    assert "(dc.MATCH_SCORE < ? OR (dc.MATCH_SCORE = ? AND dc.CREATED_DATE > TO_TIMESTAMP_NTZ(?))" in query.sql
+    assert query.params == [95.5, 95.5, '2024-01-13 08:00:00', 95.5, '2024-01-13 08:00:00', 'DC-001']
+    assert query.sql.endswith(" LIMIT 26")
+
+
+def test_seek_cluster_pages_through_cluster_order():
+    clusters = [
+        (has_pending, members, points, f"CL-{index:02d}")
+        for index, (has_pending, members, points) in enumerate(
+            [(1, 3, 90.0), (1, 3, 90.0), (1, 2, 99.0), (0, 5, 70.0), (1, 3, 80.0), (0, 2, 70.0), (0, 2, 65.5)]
+        )
+    ]
+    connection = duckdb.connect()
+    connection.execute("CREATE TABLE clusters (HAS_PENDING INT, MEMBER_COUNT INT, POINTS DOUBLE, CLUSTER_ID VARCHAR)")
+    connection.executemany("INSERT INTO clusters VALUES (?, ?, ?, ?)", clusters)
+
+    seen, cursor = [], None
+    while True:
+        query = Query("SELECT * FROM clusters WHERE 1=1").seek_cluster(cursor).order_by(*CLUSTER_ORDER).limit(2)
+        page = connection.execute(query.sql, query.params).fetchall()
+        if not page:
+            break
+        seen.extend(page)
+        cursor = page[-1]
+
+    assert seen == sorted(clusters, key=lambda row: (-row[0], -row[1], -row[2], row[3]))
+
+
+def test_lease_predicates():
+    mine = base().leased_to('Maria Santos')
+    assert mine.params == ['Maria Santos']
+    assert "dc.LEASE_EXPIRES_AT > CURRENT_TIMESTAMP()" in mine.sql
+
+    free = base().not_leased_to_others('Maria Santos')
+    assert free.params == ['Maria Santos']
+    assert "dc.LEASE_EXPIRES_AT IS NULL OR dc.LEASE_EXPIRES_AT <= CURRENT_TIMESTAMP() OR dc.ASSIGNED_TO = ?" in free.sql
+
+
+def test_call_binds_every_argument():
+    query = call('RECORD_DECISION', 'DEC-1', 'DC-001', "O'Brien")
+    assert query.sql == f"CALL {table('RECORD_DECISION')}(?, ?, ?)"
+    assert query.params == ['DEC-1', 'DC-001', "O'Brien"]
+
+
+def test_country_join_folds_the_country_name():
+    assert country_join('c1', 'cc1') == (
+        f"LEFT JOIN {table('COUNTRY_CODES')} cc1 "
+        "ON cc1.COUNTRY_NAME = TRIM(REGEXP_REPLACE(LOWER(c1.COUNTRY), '[^a-z0-9]+', ' '))"
+    )
+
+
+def test_prefixed_columns_round_trip():
+    assert prefixed_columns('c1', ['EMAIL', 'PHONE'], 'C1__') == "c1.EMAIL AS C1__EMAIL,\n        c1.PHONE AS C1__PHONE"
+    row = {'C1__EMAIL': 'a@b', 'C2__EMAIL': 'c@d', 'DC__STATUS': 'PENDING'}
+    assert unprefixed(row, 'C1__') == {'EMAIL': 'a@b'}
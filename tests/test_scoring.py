@@ -0,0 +1,66 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from matching.scoring import (
+    DOB_DAY_MONTH_SWAP, DOB_DIGIT_TRANSPOSITION, FIELD_WEIGHTS, encode_address_tokens, encode_dates, encode_strings,
+    dob_similarity, jaro_winkler, score_pairs, token_overlap,
+)
+
+
+def similarity(first, second):
+    codes1, lengths1 = encode_strings(first)
+    codes2, lengths2 = encode_strings(second)
+    return jaro_winkler(codes1, lengths1, codes2, lengths2)
+
+
+@pytest.mark.parametrize('first, second, expected', [
+    ('MARTHA', 'MARHTA', 0.961111),
+    ('DWAYNE', 'DUANE', 0.84),
+    ('DIXON', 'DICKSONX', 0.813333),
+    ('Naiqama', 'naiqama', 1.0),
+    ('abc', 'xyz', 0.0),
+    ('', 'Sera', 0.0),
+])
+def test_jaro_winkler_reference_values(first, second, expected):
+    assert similarity([first], [second])[0] == pytest.approx(expected, abs=1e-6)
+
+
+def test_jaro_winkler_is_vectorized_over_mixed_lengths():
+    first = ['MARTHA', 'DWAYNE', 'DIXON', 'Apisai']
+    second = ['MARHTA', 'DUANE', 'DICKSONX', 'Apisai']
+    expected = [similarity([a], [b])[0] for a, b in zip(first, second)]
+    np.testing.assert_allclose(similarity(first, second), expected)
+
+
+def test_dob_similarity_gives_partial_credit_for_near_misses():
+    digits, valid = encode_dates(['1985-03-15', '1985-03-15', '1985-03-15', '1990-07-08', None])
+    other, other_valid = encode_dates(['1985-03-15', '1958-03-15', '1985-04-16', '1990-08-07', '1985-03-15'])
+
+    np.testing.assert_allclose(
+        dob_similarity(digits, valid, other, other_valid),
+        [1.0, DOB_DIGIT_TRANSPOSITION, 0.0, DOB_DAY_MONTH_SWAP, 0.0],
+    )
+
+
+def test_token_overlap_is_jaccard():
+    tokens = encode_address_tokens(['45 Victoria Parade', '45 victoria pde', '', ''])
+    np.testing.assert_allclose(token_overlap(tokens[[0, 0, 2]], tokens[[0, 1, 3]]), [1.0, 0.5, 0.0])
+
+
+def test_weights_sum_to_100():
+    assert sum(FIELD_WEIGHTS.values()) == 100
+
+
+def test_score_pairs(customers):
+    pairs = pd.DataFrame({'CUSTOMER_ID_1': ['CUST-003', 'CUST-001'], 'CUSTOMER_ID_2': ['CUST-003', 'CUST-017']})
+    scored = score_pairs(customers, pairs)
+
+    same, unrelated = scored.to_dict('records')
+    assert same['MATCH_SCORE'] == 100
+    assert same['MATCH_REASON'] == (
+        'Exact name match, same DOB, phone number match after normalization, same email, same address'
+    )
+    assert unrelated['MATCH_SCORE'] < 50
+    assert unrelated['MATCH_REASON'] == 'Shared blocking key only'
+    assert {f'{field}_SIM' for field in FIELD_WEIGHTS} <= set(scored.columns)
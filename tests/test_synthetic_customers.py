@@ -0,0 +1,47 @@
+import pandas as pd
+
+from benchmarks.synthetic_customers import TRAP_RATES, evaluate, generate, scenario_counts
+from query_builder import CUSTOMER_COLUMNS
+
+
+def test_generate_is_deterministic_per_seed():
+    first, second, other = generate(500, seed=7), generate(500, seed=7), generate(500, seed=8)
+    for frame, again in zip(first, second):
+        pd.testing.assert_frame_equal(frame, again)
+    assert not first[0].equals(other[0])
+
+
+def test_generate_injects_the_scenario_counts():
+    customers, ground_truth, truth_pairs = generate(1000, seed=0)
+
+    assert list(customers.columns) == list(CUSTOMER_COLUMNS)
+    assert len(customers) == 1000 and customers['CUSTOMER_ID'].is_unique
+    assert truth_pairs['SCENARIO'].value_counts().to_dict() == {
+        scenario: count for scenario, count in scenario_counts(1000).items() if count
+    }
+    assert set(ground_truth['CUSTOMER_ID']) == set(customers['CUSTOMER_ID'])
+
+
+def test_ground_truth_agrees_with_truth_pairs():
+    _, ground_truth, truth_pairs = generate(1000, seed=0)
+    person = ground_truth.set_index('CUSTOMER_ID')['PERSON_ID']
+    same_person = truth_pairs['CUSTOMER_ID_1'].map(person) == truth_pairs['CUSTOMER_ID_2'].map(person)
+
+    # Duplicates are the same person; household and namesake traps never are
+    assert (same_person == truth_pairs['IS_DUPLICATE']).all()
+    assert set(truth_pairs.loc[~truth_pairs['IS_DUPLICATE'], 'SCENARIO']) == set(TRAP_RATES)
+
+
+def test_evaluate_reports_precision_and_found_share():
+    _, ground_truth, truth_pairs = generate(1000, seed=0)
+    # A perfect matcher, listing each pair with its ids swapped
+    candidates = truth_pairs[truth_pairs['IS_DUPLICATE']].rename(
+        columns={'CUSTOMER_ID_1': 'CUSTOMER_ID_2', 'CUSTOMER_ID_2': 'CUSTOMER_ID_1'}
+    ).assign(PRIORITY='HIGH', HOUSEHOLD_MATCH=False)
+
+    lines = evaluate(candidates, ground_truth, truth_pairs).splitlines()
+    assert lines[0].startswith(f"candidates {len(candidates):>10,}  precision 100.0%")
+    found = {line.split()[0]: line.split()[3] for line in lines[1:-1]}
+    assert found == {scenario: '0.0%' if scenario in TRAP_RATES else '100.0%' for scenario in found}
+    assert len(found) == len(scenario_counts(1000))
+    assert lines[-1].startswith(f"flagged    {0:>10,}")